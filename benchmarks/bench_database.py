@@ -0,0 +1,146 @@
+"""
+Benchmark: student_app.database helpers on synthetic datasets.
+
+For each preset (see dataset.py) a fresh database is generated in a temp
+directory and every helper is timed (best and median of --repeat runs, read
+cache bypassed). sync_from_cloud runs against the in-process Supabase
+stand-in, seeded with the same data and an optional per-request latency.
+
+    python benchmarks/bench_database.py --presets term year --json bench.json
+    python benchmarks/bench_database.py --baseline bench.json   # exit 1 on regressions
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+from dataset import PRESETS, ROOT, generate, seed_cloud, use_database
+
+sys.path.insert(0, ROOT)
+
+from student_app import database
+from student_app.fake_supabase import FakeSupabase
+from student_app.template_catalog import load_catalog
+
+
+class _User:
+    id = "bench-user"
+    email = "bench@studentpro.local"
+
+
+def _timed(fn, repeat, setup=None):
+    times = []
+    for _ in range(repeat):
+        if setup: setup()
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return times
+
+
+def cases(tmp, latency):
+    """(name, fn, setup) for every benchmarked helper."""
+    uncached = lambda f: getattr(f, "uncached", f)
+    sub_id = database.get_all_subjects.uncached()[0].id
+    templates = load_catalog().templates[:1]
+
+    cloud = FakeSupabase(os.path.join(tmp, "cloud.db"), latency=latency)
+    seed_cloud(cloud, _User.id, database.get_db_path())
+    sync_path = os.path.join(tmp, "sync.db")
+    shutil.copy(database.get_db_path(), sync_path)
+
+    def run_sync():
+        main_path = database.get_db_path()
+        use_database(sync_path)
+        auth_state = (database._auth.user, database._auth.supabase)
+        database._auth.user, database._auth.supabase = _User(), cloud
+        try:
+            assert database.sync_from_cloud(), "sync_from_cloud failed"
+        finally:
+            database._auth.user, database._auth.supabase = auth_state
+            use_database(main_path)
+
+    return [
+        ("get_progress_stats", database.get_progress_stats, None),
+        ("get_study_streak", database.get_study_streak, None),
+        ("get_daily_study_stats", database.get_daily_study_stats, None),
+        ("get_detailed_stats", database.get_detailed_stats, None),
+        ("get_all_subjects", uncached(database.get_all_subjects), None),
+        ("get_chapters_by_subject", lambda: uncached(database.get_chapters_by_subject)(sub_id), None),
+        ("get_subject_progress", lambda: database.get_subject_progress(sub_id), database.read_cache.clear),
+        ("get_todo_chapters", uncached(database.get_todo_chapters), None),
+        ("get_subject_notes", lambda: database.get_subject_notes(sub_id), None),
+        ("search_content", lambda: database.search_content("integ"), None),
+        ("apply_template", lambda: database.apply_template(templates), None),
+        ("sync_from_cloud", run_sync, None),
+    ]
+
+
+def run(presets, repeat, latency):
+    results = {}
+    for preset in presets:
+        tmp = tempfile.mkdtemp(prefix=f"studentpro_bench_{preset}_")
+        try:
+            db_path = os.path.join(tmp, "data.db")
+            counts = generate(db_path, **PRESETS[preset])
+            rows = {}
+            for name, fn, setup in cases(tmp, latency):
+                times = _timed(fn, repeat, setup)
+                rows[name] = {"best_ms": round(min(times) * 1000, 3),
+                              "median_ms": round(statistics.median(times) * 1000, 3)}
+            results[preset] = {"rows": counts, "helpers": rows}
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Helpers whose median slowed by more than `tolerance` (e.g. 0.25 = 25%)."""
+    regressions = []
+    for preset, data in results.items():
+        old = baseline.get(preset, {}).get("helpers", {})
+        for name, row in data["helpers"].items():
+            prev = old.get(name)
+            # Ignore sub-millisecond noise
+            if prev and row["median_ms"] > prev["median_ms"] * (1 + tolerance) and row["median_ms"] - prev["median_ms"] > 1:
+                regressions.append((preset, name, prev["median_ms"], row["median_ms"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--presets", nargs="+", choices=sorted(PRESETS), default=["term", "year"])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="per-request latency of the stand-in")
+    parser.add_argument("--json", metavar="PATH", help="write results as JSON (usable as a baseline)")
+    parser.add_argument("--baseline", metavar="PATH", help="compare against an earlier --json file")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    results = run(args.presets, args.repeat, args.latency_ms / 1000)
+    for preset, data in results.items():
+        print(f"\n[{preset}] " + ", ".join(f"{v} {k}" for k, v in data["rows"].items()))
+        print(f"{'helper':<26} {'best ms':>10} {'median ms':>10}")
+        for name, row in data["helpers"].items():
+            print(f"{name:<26} {row['best_ms']:>10.2f} {row['median_ms']:>10.2f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for preset, name, old, new in regressions:
+            print(f"REGRESSION [{preset}] {name}: {old:.2f} ms -> {new:.2f} ms")
+        if regressions:
+            sys.exit(1)
+        print("\nNo regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Benchmark: time to first frame, per startup phase and per import.
+
+Launches `python run.py` headless (offscreen Qt, dummy audio, the Supabase
+stand-in) with a generated database and STUDENTPRO_STARTUP_PROFILE set, so
+the app writes its phase and import timings and quits after the first frame
+(see student_app/startup_profile.py). Time to first frame is measured from
+process spawn, so interpreter start-up is included.
+
+    python benchmarks/bench_startup.py --preset year --runs 5 --budget-ms 3000
+    python benchmarks/bench_startup.py --mode online   # resume a session and sync
+
+Exits with status 1 when the median time to first frame (or total import
+time, with --import-budget-ms) is over budget.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from dataset import PRESETS, ROOT, generate, seed_cloud
+
+from student_app.fake_supabase import FakeSupabase
+
+EMAIL = "bench@studentpro.local"
+
+
+def _prepare(tmp, preset, mode):
+    """App data dir with config and session/offline marker; returns the env for run.py."""
+    data_dir = os.path.join(tmp, "StudentPro" if os.name == "nt" else ".studentpro")
+    os.makedirs(data_dir)
+    db_path = os.path.join(tmp, "data.db")
+    generate(db_path, **PRESETS[preset])
+    with open(os.path.join(data_dir, "config.json"), "w", encoding="utf-8") as f:
+        json.dump({"db_path": db_path}, f)
+
+    cloud_path = os.path.join(tmp, "cloud.db")
+    if mode == "offline":
+        open(os.path.join(data_dir, ".offline"), "w").close()
+    else:
+        cloud = FakeSupabase(cloud_path)
+        user = cloud.auth.sign_in_with_password({"email": EMAIL, "password": "-"}).user
+        seed_cloud(cloud, user.id, db_path)
+        cloud.close()
+        with open(os.path.join(data_dir, ".session.json"), "w", encoding="utf-8") as f:
+            json.dump({"access_token": "bench", "refresh_token": EMAIL}, f)
+
+    env = dict(os.environ, HOME=tmp, LOCALAPPDATA=tmp, QT_QPA_PLATFORM="offscreen", SDL_AUDIODRIVER="dummy",
+               STUDENTPRO_FAKE_SUPABASE=cloud_path, STUDENTPRO_STARTUP_EXIT="1")
+    env.pop("STUDENTPRO_STARTUP_PROFILE", None)
+    return env
+
+
+def launch(env, profile_path, timeout=120):
+    spawned = time.time()
+    proc = subprocess.run([sys.executable, os.path.join(ROOT, "run.py")], cwd=ROOT, timeout=timeout,
+                          env=dict(env, STUDENTPRO_STARTUP_PROFILE=profile_path),
+                          stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    if not os.path.exists(profile_path):
+        raise RuntimeError(f"run.py exited with {proc.returncode} before its first frame:\n{proc.stdout[-2000:]}")
+    with open(profile_path, encoding="utf-8") as f:
+        profile = json.load(f)
+    os.remove(profile_path)
+    profile["ttff_ms"] = round((profile["started_at"] - spawned) * 1000 + profile["first_frame_ms"], 2)
+    return profile
+
+
+def run(preset, mode, runs):
+    tmp = tempfile.mkdtemp(prefix=f"studentpro_startup_{preset}_")
+    try:
+        env = _prepare(tmp, preset, mode)
+        profiles = [launch(env, os.path.join(tmp, "profile.json")) for _ in range(runs)]
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    med = statistics.median
+    phases = {}
+    for p in profiles:
+        for row in p["phases"]:
+            phases.setdefault(row["phase"], []).append(row["ms"])
+    imports = {}
+    for p in profiles:
+        for row in p["imports"]:
+            imports.setdefault(row["module"], []).append(row["self_ms"])
+    top = sorted(((m, med(v)) for m, v in imports.items()), key=lambda kv: kv[1], reverse=True)[:15]
+    return {
+        "ttff_ms": med(p["ttff_ms"] for p in profiles),
+        "ttff_max_ms": max(p["ttff_ms"] for p in profiles),
+        "import_ms": med(p["import_ms"] for p in profiles),
+        "phases": {name: round(med(v), 2) for name, v in phases.items()},
+        "top_imports": {m: round(v, 2) for m, v in top},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="year")
+    parser.add_argument("--mode", choices=("offline", "online"), default="offline")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("STUDENTPRO_TTFF_BUDGET_MS", "4000")),
+                        help="time-to-first-frame budget (default $STUDENTPRO_TTFF_BUDGET_MS or 4000)")
+    parser.add_argument("--import-budget-ms", type=float, help="budget for total top-level import time")
+    parser.add_argument("--json", metavar="PATH", help="also write results as JSON")
+    args = parser.parse_args()
+
+    r = run(args.preset, args.mode, args.runs)
+    print(f"\n[{args.preset}/{args.mode}] time to first frame: median {r['ttff_ms']:.0f} ms, "
+          f"max {r['ttff_max_ms']:.0f} ms (budget {args.budget_ms:.0f} ms); imports {r['import_ms']:.0f} ms")
+    print(f"{'phase':<26} {'median ms':>10}")
+    for name, ms in r["phases"].items():
+        print(f"{name:<26} {ms:>10.1f}")
+    print(f"\n{'import (self time)':<44} {'median ms':>10}")
+    for module, ms in r["top_imports"].items():
+        print(f"{module:<44} {ms:>10.1f}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({f"{args.preset}/{args.mode}": r}, f, indent=2)
+
+    over = []
+    if r["ttff_ms"] > args.budget_ms:
+        over.append(f"time to first frame {r['ttff_ms']:.0f} ms > {args.budget_ms:.0f} ms")
+    if args.import_budget_ms is not None and r["import_ms"] > args.import_budget_ms:
+        over.append(f"imports {r['import_ms']:.0f} ms > {args.import_budget_ms:.0f} ms")
+    for line in over:
+        print(f"OVER BUDGET: {line}")
+    if over:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark: single-pass templates.js parser vs. the old regex → json pipeline.
+
+The real webversion/js/templates.js is scaled by repeating its template list
+N times (comments and formatting included), then both parsers are timed on
+the same text and their outputs compared.
+
+    python benchmarks/bench_templates_parser.py --scales 1 10 100
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from student_app.templates_js import parse_js
+
+TEMPLATES_JS = os.path.join(ROOT, "webversion", "js", "templates.js")
+
+
+def legacy_parse(content):
+    """The former templates_editor.parse_js_file() body, kept for comparison."""
+    content = re.sub(r'^\s*const\s+TEMPLATES\s*=\s*', '', content, flags=re.MULTILINE)
+    content = content.strip().rstrip(';').strip()
+    pattern = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')|//.*')
+    content = pattern.sub(lambda m: m.group(1) or "", content)
+    content = re.sub(r'/\*.*?\*/', '', content, flags=re.DOTALL)
+    content = re.sub(
+        r'(?<!["\'\w])([a-zA-Z_][a-zA-Z0-9_]*)\s*:(?!:)',
+        lambda m: f'"{m.group(1)}":',
+        content
+    )
+    content = re.sub(r',\s*([}\]])', r'\1', content)
+    return json.loads(content)
+
+
+def scaled_source(text, factor):
+    """Repeat the body of the top-level array `factor` times."""
+    start, end = text.index("[") + 1, text.rindex("]")
+    body = text[start:end].rstrip().rstrip(",")
+    return text[:start] + ",\n".join([body] * factor) + "\n" + text[end:]
+
+
+def best_of(fn, arg, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn(arg)
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def run(scales, repeat):
+    with open(TEMPLATES_JS, "r", encoding="utf-8") as f:
+        base = f.read()
+    rows = []
+    for factor in scales:
+        src = scaled_source(base, factor)
+        t_new, new = best_of(parse_js, src, repeat)
+        t_old, old = best_of(legacy_parse, src, repeat)
+        rows.append({
+            "scale": factor,
+            "bytes": len(src.encode("utf-8")),
+            "templates": len(new),
+            "single_pass_ms": round(t_new * 1000, 3),
+            "regex_ms": round(t_old * 1000, 3),
+            "speedup": round(t_old / t_new, 2) if t_new else None,
+            "same_result": new == old,
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", metavar="PATH", help="also write results as JSON")
+    args = parser.parse_args()
+
+    rows = run(args.scales, args.repeat)
+    print(f"{'scale':>6} {'KiB':>9} {'single-pass ms':>15} {'regex ms':>10} {'speedup':>8}  same")
+    for r in rows:
+        print(f"{r['scale']:>6} {r['bytes'] / 1024:>9.1f} {r['single_pass_ms']:>15.2f} "
+              f"{r['regex_ms']:>10.2f} {r['speedup']:>7}x  {r['same_result']}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
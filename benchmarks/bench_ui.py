@@ -0,0 +1,164 @@
+"""
+Benchmark: Qt handler latency, headless.
+
+Drives the real widgets under QT_QPA_PLATFORM=offscreen against a generated
+database (see dataset.py) and reports p50/p95/max latency per scenario:
+
+    tab_switch:<tab>     MainWindow.switch_tab + event processing + paint
+    dashboard_refresh    Dashboard.refresh_data + paint
+    chapter_toggle       a SubjectWindow chapter checkbox (DB write + refresh_data)
+    analytics_refresh    Analytics.refresh_semesters + chart paint
+
+Each scenario also reports how many live widgets it leaves behind and, from
+one extra tracemalloc'd run, how many blocks/bytes a single run allocates.
+
+    python benchmarks/bench_ui.py --presets term year --repeat 30 --json ui.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from dataset import PRESETS, generate
+
+from PyQt5.QtCore import QEvent
+from PyQt5.QtWidgets import QApplication
+
+from student_app import database
+from student_app.auth_manager import OfflineUser
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[k]
+
+
+def _settle(app, widget=None):
+    app.processEvents()
+    if widget is not None:
+        widget.grab()  # forces a full paint of the widget tree into a pixmap
+
+
+def scenarios(app, window):
+    from student_app.ui.subject_window import SubjectWindow
+
+    names = ["dashboard", "planner", "pomodoro", "analytics", "leaderboard", "settings"]
+    out = []
+    for i, name in enumerate(names):
+        def switch(i=i):
+            window.switch_tab(i)
+            _settle(app, window.content_stack.currentWidget())
+        out.append((f"tab_switch:{name}", switch))
+
+    def dashboard_refresh():
+        window.dashboard_tab.refresh_data()
+        _settle(app, window.dashboard_tab)
+    out.append(("dashboard_refresh", dashboard_refresh))
+
+    subject = database.get_all_subjects()[0]
+    sub_win = SubjectWindow(subject.id, subject.name)
+    sub_win.resize(900, 700)
+    sub_win.show()
+    _settle(app)
+
+    def chapter_toggle():
+        chap = sub_win.chapter_layout.itemAt(0).widget()
+        chap.video_check.setChecked(not chap.video_check.isChecked())
+        _settle(app, sub_win)
+    out.append(("chapter_toggle", chapter_toggle))
+
+    def analytics_refresh():
+        window.analytics_tab.refresh_semesters()
+        _settle(app, window.analytics_tab)
+    out.append(("analytics_refresh", analytics_refresh))
+    return out, sub_win
+
+
+def measure(app, fn, repeat, warmup=2):
+    for _ in range(warmup):
+        fn()
+    gc.collect()
+    widgets_before = len(app.allWidgets())
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    gc.collect()
+    app.processEvents()
+    widgets_after = len(app.allWidgets())
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    fn()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    diff = after.compare_to(before, "filename")
+    return {
+        "p50_ms": round(percentile(times, 50), 3),
+        "p95_ms": round(percentile(times, 95), 3),
+        "max_ms": round(max(times), 3),
+        "widgets": widgets_after,
+        "widgets_leaked_per_run": round((widgets_after - widgets_before) / repeat, 2),
+        "alloc_blocks": sum(max(0, d.count_diff) for d in diff),
+        "alloc_kib": round(sum(max(0, d.size_diff) for d in diff) / 1024, 1),
+    }
+
+
+def run(preset, repeat):
+    from student_app.main import MainWindow
+
+    tmp = tempfile.mkdtemp(prefix=f"studentpro_ui_{preset}_")
+    try:
+        counts = generate(os.path.join(tmp, "data.db"), **PRESETS[preset])
+        app = QApplication.instance() or QApplication(sys.argv)
+        window = MainWindow(OfflineUser())
+        window.resize(1100, 750)
+        window.show()
+        _settle(app, window)
+        cases, sub_win = scenarios(app, window)
+        results = {name: measure(app, fn, repeat) for name, fn in cases}
+        sub_win.close()
+        window.tray_icon.hide()
+        window.close()
+        # Drop this preset's widgets so the next preset's counts start clean
+        for w in (sub_win, window):
+            w.deleteLater()
+        app.sendPostedEvents(None, QEvent.DeferredDelete)
+        return {"rows": counts, "scenarios": results}
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--presets", nargs="+", choices=sorted(PRESETS), default=["term", "year"])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--json", metavar="PATH", help="also write results as JSON")
+    args = parser.parse_args()
+
+    results = {preset: run(preset, args.repeat) for preset in args.presets}
+    for preset, result in results.items():
+        print(f"\n[{preset}] " + ", ".join(f"{v} {k}" for k, v in result["rows"].items()))
+        print(f"{'scenario':<24} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'widgets':>8} {'leak/run':>9} {'blocks':>8} {'KiB':>8}")
+        for name, r in result["scenarios"].items():
+            print(f"{name:<24} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['max_ms']:>8.2f} {r['widgets']:>8} "
+                  f"{r['widgets_leaked_per_run']:>9} {r['alloc_blocks']:>8} {r['alloc_kib']:>8}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
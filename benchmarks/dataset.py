@@ -0,0 +1,150 @@
+"""
+Synthetic StudentPro databases for benchmarks.
+
+Builds a database with the app's own schema (init_db) and fills it with
+semesters, subjects, chapters, notes and a history of daily study sessions.
+Presets range from a single term to a decade of daily use; every count can
+be overridden. Generation is seeded, so the same arguments give the same data.
+
+    python benchmarks/dataset.py --preset year --out /tmp/year.db
+    python benchmarks/dataset.py --preset term --chapters 40 --out /tmp/wide.db
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# Benchmarks never talk to the real backend
+os.environ.setdefault("STUDENTPRO_FAKE_SUPABASE", os.path.join(tempfile.gettempdir(), "studentpro_bench_cloud.db"))
+
+from student_app import database
+
+PRESETS = {
+    # semesters, subjects per semester, chapters per subject, days of history, sessions per day
+    "term":   dict(semesters=1,  subjects=6, chapters=12, days=120,  sessions_per_day=2),
+    "year":   dict(semesters=2,  subjects=8, chapters=15, days=365,  sessions_per_day=3),
+    "decade": dict(semesters=20, subjects=8, chapters=15, days=3650, sessions_per_day=4),
+}
+
+WORDS = ("integral derivative matrix vector entropy enzyme protein theorem lemma proof "
+         "series limit kinetics optics circuit voltage genome cell market demand supply").split()
+
+
+def use_database(path):
+    """Point the app's data layer at `path` for the rest of the process."""
+    database.get_db_path = lambda: path
+    database.read_cache.clear()
+
+
+def _text(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def generate(path, semesters, subjects, chapters, days, sessions_per_day,
+             notes_words=400, done_ratio=0.6, seed=1):
+    """Create a fresh database at `path`; returns row counts per table."""
+    if os.path.exists(path):
+        os.remove(path)
+    use_database(path)
+    database.init_db()
+    rng = random.Random(seed)
+    today = datetime.now().replace(hour=18, minute=0, second=0, microsecond=0)
+
+    conn = database.get_db_connection()
+    subject_ids = []
+    with conn:
+        c = conn.cursor()
+        for s in range(semesters):
+            c.execute("INSERT INTO semesters (name) VALUES (?)", (f"Semester {s + 1}",))
+            sem_id = c.lastrowid
+            for j in range(subjects):
+                exam = (today + timedelta(days=rng.randint(-30, 120))).strftime("%Y-%m-%d")
+                c.execute("INSERT INTO subjects (semester_id, name, exam_date, has_exercises) VALUES (?, ?, ?, ?)",
+                          (sem_id, f"{_text(rng, 1).title()} {s + 1}.{j + 1}", exam, int(rng.random() > 0.2)))
+                subject_ids.append(c.lastrowid)
+        c.executemany(
+            "INSERT INTO chapters (subject_id, name, video_completed, exercises_completed, is_completed, youtube_url) VALUES (?, ?, ?, ?, ?, ?)",
+            [(sid, f"Chapter {k + 1}: {_text(rng, 3)}", v, e, int(v and e),
+              f"https://youtu.be/{rng.getrandbits(40):010x}" if rng.random() < 0.7 else None)
+             for sid in subject_ids for k in range(chapters)
+             for v, e in [(int(rng.random() < done_ratio), int(rng.random() < done_ratio))]])
+        sessions = []
+        for d in range(days):
+            day = today - timedelta(days=d)
+            for _ in range(sessions_per_day if rng.random() < 0.9 else 0):
+                ts = day - timedelta(minutes=rng.randint(0, 600))
+                sessions.append((rng.choice(subject_ids), rng.choice((25, 25, 50, 15)), ts.strftime("%Y-%m-%d %H:%M:%S")))
+        c.executemany("INSERT INTO study_sessions (subject_id, duration_minutes, timestamp) VALUES (?, ?, ?)", sessions)
+        minutes = sum(s[1] for s in sessions)
+        c.execute("UPDATE user_profile SET xp=?, level=?, total_sessions=?", (minutes * 2, 1 + minutes * 2 // 500, len(sessions)))
+        if notes_words:
+            for sid in subject_ids:
+                database._write_notes(c, sid, _text(rng, rng.randint(notes_words // 2, notes_words * 2)))
+    counts = {t: conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0]
+              for t in ("semesters", "subjects", "chapters", "study_sessions")}
+    conn.close()
+    database.read_cache.clear()
+    return counts
+
+
+def seed_cloud(client, uid, path):
+    """Copy the database at `path` into a Supabase(-like) client, one insert per table."""
+    use_database(path)
+    conn = database.get_db_connection()
+    try:
+        for t in ("study_sessions", "chapters", "subjects", "semesters", "user_profile"):
+            client.table(t).delete().eq("user_id", uid).execute()
+        client.table("semesters").insert([
+            {"id": r['id'], "name": r['name'], "user_id": uid}
+            for r in conn.execute("SELECT id, name FROM semesters")]).execute()
+        client.table("subjects").insert([
+            {"id": r['id'], "name": r['name'], "semester_id": r['semester_id'], "exam_date": r['exam_date'],
+             "notes": database._read_notes(conn, r['id']) or None, "has_exercises": bool(r['has_exercises']), "user_id": uid}
+            for r in conn.execute("SELECT id, semester_id, name, exam_date, has_exercises FROM subjects").fetchall()]).execute()
+        client.table("chapters").insert([
+            {"id": r['id'], "subject_id": r['subject_id'], "name": r['name'], "video_completed": bool(r['video_completed']),
+             "exercises_completed": bool(r['exercises_completed']), "is_completed": bool(r['is_completed']),
+             "youtube_url": r['youtube_url'], "user_id": uid}
+            for r in conn.execute("SELECT * FROM chapters")]).execute()
+        client.table("study_sessions").insert([
+            {"id": r['id'], "subject_id": r['subject_id'], "duration_minutes": r['duration_minutes'],
+             "timestamp": r['timestamp'], "user_id": uid}
+            for r in conn.execute("SELECT * FROM study_sessions")]).execute()
+        p = conn.execute("SELECT * FROM user_profile LIMIT 1").fetchone()
+        client.table("user_profile").insert({"user_id": uid, "xp": p['xp'], "level": p['level'],
+                                             "total_sessions": p['total_sessions'], "display_name": p['display_name']}).execute()
+    finally:
+        conn.close()
+
+
+def preset_args(name, **overrides):
+    args = dict(PRESETS[name])
+    args.update({k: v for k, v in overrides.items() if v is not None})
+    return args
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="term")
+    parser.add_argument("--out", required=True, help="database file to create (overwritten)")
+    for key in ("semesters", "subjects", "chapters", "days", "sessions_per_day"):
+        parser.add_argument("--" + key.replace("_", "-"), type=int, dest=key)
+    parser.add_argument("--notes-words", type=int, default=400)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    sizes = preset_args(args.preset, **{k: getattr(args, k) for k in PRESETS["term"]})
+    t0 = time.perf_counter()
+    counts = generate(args.out, notes_words=args.notes_words, seed=args.seed, **sizes)
+    print(f"{args.out}: " + ", ".join(f"{v} {k}" for k, v in counts.items())
+          + f" in {time.perf_counter() - t0:.2f}s ({os.path.getsize(args.out) / 1024:.0f} KiB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,9 @@ import os
 # Add the current directory to sys.path to ensure imports work. now is this work
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+from student_app import startup_profile
+startup_profile.begin()  # before the app's imports, so they are timed
+
 from student_app.main import main
 
 if __name__ == "__main__":
@@ -0,0 +1,109 @@
+"""
+On-demand cProfile capture for UI actions.
+
+Widget classes decorated with @profile_actions have their switch_tab,
+refresh_* and handle_* methods wrapped. While profiling is on, each call runs
+under a cProfile.Profile kept per action ("Dashboard.refresh_data"), so
+repeated clicks accumulate into one set of stats. Nested actions are
+attributed to the outermost one. While off, the wrapper is a flag check.
+
+Turn it on with STUDENTPRO_PROFILE_ACTIONS=1, the "profile_actions" setting,
+or the switch in Settings > Diagnostics (Ctrl+Shift+D shows it).
+
+    action_profiler.summary("StudyPlanner.refresh_data", top=20)
+    action_profiler.dump()   # one .pstats file per action
+"""
+
+import cProfile
+import inspect
+import io
+import os
+import pstats
+import re
+import threading
+import time
+from functools import wraps
+
+from student_app.settings import get_app_data_dir, get_profile_actions_enabled
+
+ACTION_PATTERN = re.compile(r"^(switch_tab|refresh_\w+|handle_\w+)$")
+
+enabled = os.getenv("STUDENTPRO_PROFILE_ACTIONS", "").lower() in ("1", "true", "yes") or get_profile_actions_enabled()
+
+_profiles = {}  # action -> [Profile, calls, seconds]
+_running = threading.local()
+
+
+def set_enabled(on):
+    global enabled
+    enabled = bool(on)
+
+
+def reset():
+    _profiles.clear()
+
+
+def actions():
+    """[(action, calls, total_ms)], slowest first."""
+    rows = [(name, calls, seconds * 1000) for name, (_, calls, seconds) in _profiles.items()]
+    return sorted(rows, key=lambda r: r[2], reverse=True)
+
+
+def summary(action, top=25, sort="cumulative"):
+    entry = _profiles.get(action)
+    if entry is None:
+        return f"No profile recorded for {action}."
+    out = io.StringIO()
+    stats = pstats.Stats(entry[0], stream=out)
+    stats.strip_dirs().sort_stats(sort).print_stats(top)
+    return f"{action}: {entry[1]} calls, {entry[2] * 1000:.1f} ms total\n" + out.getvalue().strip()
+
+
+def profiles_dir():
+    path = os.path.join(get_app_data_dir(), "profiles")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def dump(directory=None):
+    """Write <action>.pstats for every recorded action; returns the directory."""
+    directory = directory or profiles_dir()
+    for name, (profile, _, _) in _profiles.items():
+        profile.dump_stats(os.path.join(directory, f"{name}.pstats"))
+    return directory
+
+
+def _wrap(fn, action):
+    params = inspect.signature(fn).parameters.values()
+    takes_varargs = any(p.kind == p.VAR_POSITIONAL for p in params)
+    n_positional = sum(p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD) for p in params)
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        # PyQt may pass signal arguments the slot doesn't take (e.g. `checked`)
+        if not takes_varargs:
+            args = args[:n_positional]
+        if not enabled or getattr(_running, "active", False) or threading.current_thread() is not threading.main_thread():
+            return fn(*args, **kwargs)
+        entry = _profiles.get(action)
+        if entry is None:
+            entry = _profiles[action] = [cProfile.Profile(), 0, 0.0]
+        _running.active = True
+        t0 = time.perf_counter()
+        entry[0].enable()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            entry[0].disable()
+            entry[1] += 1
+            entry[2] += time.perf_counter() - t0
+            _running.active = False
+    return wrapper
+
+
+def profile_actions(cls):
+    """Class decorator: wrap the class's own action methods."""
+    for attr, value in list(vars(cls).items()):
+        if ACTION_PATTERN.match(attr) and inspect.isfunction(value):
+            setattr(cls, attr, _wrap(value, f"{cls.__name__}.{attr}"))
+    return cls
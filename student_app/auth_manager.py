@@ -23,13 +23,22 @@ class OfflineUser:
 
 from student_app.settings import get_app_data_dir
 
+def _fake_supabase_enabled():
+    # "1" or a path to the fake's .db file; "0", "false", "no" and "off" leave the real client on
+    return os.getenv("STUDENTPRO_FAKE_SUPABASE", "").strip().lower() not in ("", "0", "false", "no", "off")
+
 class AuthManager:
     def __init__(self):
         self.SESSION_FILE = os.path.join(get_app_data_dir(), ".session.json")
         self.OFFLINE_MARKER = os.path.join(get_app_data_dir(), ".offline")
-        url = os.getenv("SUPABASE_URL")
-        key = os.getenv("SUPABASE_KEY")
-        self.supabase: Client = create_client(url, key)
+        if _fake_supabase_enabled():
+            # Local SQLite stand-in for offline testing/benchmarks (see fake_supabase.py)
+            from student_app.fake_supabase import get_shared_client
+            self.supabase = get_shared_client()
+        else:
+            url = os.getenv("SUPABASE_URL")
+            key = os.getenv("SUPABASE_KEY")
+            self.supabase: Client = create_client(url, key)
         self.user = None
         self._load_session()
 
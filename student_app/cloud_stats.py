@@ -0,0 +1,180 @@
+"""
+Request accounting for the Supabase client.
+
+get_supabase() hands out the client wrapped in InstrumentedClient. Every
+table(...) request built through it is recorded on execute(): count, errors,
+latency and rows per table and operation, plus approximate payload bytes (JSON
+size of what was sent and of the rows returned) while a sync is collecting, so
+other calls don't pay for the serialization. sync_from_cloud/push_to_cloud
+return a SyncResult that is truthy on success and carries the requests they
+made (or is marked skipped when offline); Settings > Diagnostics shows the
+running totals and the last sync.
+
+Auth calls and anything else on the client pass straight through.
+"""
+
+import json
+import threading
+import time
+
+_OPS = ("select", "insert", "upsert", "update", "delete")
+_FIELDS = ("requests", "errors", "total_ms", "max_ms", "bytes_sent", "bytes_received", "rows")
+
+_stats = {}  # (table, op) -> {field: value}
+_collectors = []  # extra stats dicts filled while a sync is running
+_lock = threading.Lock()
+last_sync = None
+
+
+def _size(data):
+    if data is None or not _collectors:
+        return 0
+    try:
+        return len(json.dumps(data, default=str, separators=(",", ":")))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _record(table, op, elapsed, sent=0, received=0, rows=0, error=False):
+    with _lock:
+        for stats in [_stats] + _collectors:
+            s = stats.get((table, op))
+            if s is None:
+                s = stats[(table, op)] = dict.fromkeys(_FIELDS, 0)
+            s["requests"] += 1
+            s["errors"] += int(error)
+            s["total_ms"] += elapsed * 1000
+            s["max_ms"] = max(s["max_ms"], elapsed * 1000)
+            s["bytes_sent"] += sent
+            s["bytes_received"] += received
+            s["rows"] += rows
+
+
+def snapshot():
+    with _lock:
+        return {key: dict(s) for key, s in _stats.items()}
+
+
+def reset():
+    with _lock:
+        _stats.clear()
+
+
+def totals(stats):
+    out = dict.fromkeys(_FIELDS, 0)
+    for s in stats.values():
+        for f in _FIELDS:
+            out[f] = max(out[f], s[f]) if f == "max_ms" else out[f] + s[f]
+    return out
+
+
+def report(stats=None):
+    stats = snapshot() if stats is None else stats
+    lines = [f"{'table':<18} {'op':<7} {'reqs':>5} {'errs':>4} {'total ms':>9} {'max ms':>8} {'sent KiB':>9} {'recv KiB':>9} {'rows':>7}"]
+    for (table, op), s in sorted(stats.items(), key=lambda kv: kv[1]["total_ms"], reverse=True):
+        lines.append(f"{table:<18} {op:<7} {s['requests']:>5} {s['errors']:>4} {s['total_ms']:>9.1f} {s['max_ms']:>8.1f} "
+                     f"{s['bytes_sent'] / 1024:>9.1f} {s['bytes_received'] / 1024:>9.1f} {s['rows']:>7}")
+    return "\n".join(lines)
+
+
+class SyncResult:
+    """Outcome of a sync; truthy when it succeeded."""
+
+    def __init__(self, ok, direction, stats, seconds, skipped=False):
+        self.ok = ok
+        self.skipped = skipped
+        self.direction = direction
+        self.stats = stats
+        self.totals = totals(stats)
+        self.seconds = seconds
+
+    def __bool__(self):
+        return self.ok
+
+    def summary(self):
+        if self.skipped:
+            return f"{self.direction} skipped (offline or signed out)"
+        t = self.totals
+        return (f"{self.direction} {'ok' if self.ok else 'failed'} in {self.seconds * 1000:.0f} ms: "
+                f"{t['requests']} requests ({t['errors']} failed), {t['total_ms']:.0f} ms waiting, "
+                f"{t['bytes_sent'] / 1024:.1f} KiB sent, {t['bytes_received'] / 1024:.1f} KiB received")
+
+    def __repr__(self):
+        return f"<SyncResult {self.summary()}>"
+
+
+def collect():
+    """Start collecting requests for a sync; pass the result to sync_result()."""
+    stats = {}
+    with _lock:
+        _collectors.append(stats)
+    return stats, time.perf_counter()
+
+
+def skipped(direction):
+    """Result for a sync that didn't run; falsy, and not remembered as last_sync."""
+    return SyncResult(False, direction, {}, 0.0, skipped=True)
+
+
+def sync_result(ok, direction, collector):
+    """Stop `collector` and build (and remember) the SyncResult from it."""
+    global last_sync
+    stats, started = collector
+    with _lock:
+        _collectors.remove(stats)
+    last_sync = SyncResult(ok, direction, stats, time.perf_counter() - started)
+    print(f"[Sync] {last_sync.summary()}")
+    return last_sync
+
+
+class _Request:
+    """Wraps a postgrest request builder until execute()."""
+
+    def __init__(self, builder, table, op="select", sent=0):
+        self._builder = builder
+        self._table = table
+        self._op = op
+        self._sent = sent
+
+    def __getattr__(self, attr):
+        value = getattr(self._builder, attr)
+        if not callable(value):
+            return value
+
+        def call(*args, **kwargs):
+            result = value(*args, **kwargs)
+            if result is None or not hasattr(result, "execute"):
+                return result
+            op = attr if attr in _OPS else self._op
+            sent = _size(args[0] if args else kwargs.get("json")) if attr in ("insert", "upsert", "update") else self._sent
+            return _Request(result, self._table, op, sent)
+        return call
+
+    def execute(self):
+        t0 = time.perf_counter()
+        try:
+            response = self._builder.execute()
+        except Exception:
+            _record(self._table, self._op, time.perf_counter() - t0, self._sent, error=True)
+            raise
+        data = getattr(response, "data", None)
+        rows = len(data) if isinstance(data, list) else int(bool(data))
+        _record(self._table, self._op, time.perf_counter() - t0, self._sent, _size(data), rows)
+        return response
+
+
+class InstrumentedClient:
+    def __init__(self, client):
+        self._client = client
+
+    def table(self, name):
+        return _Request(self._client.table(name), name)
+
+    def __getattr__(self, attr):
+        return getattr(self._client, attr)
+
+
+def instrument(client):
+    if client is None or isinstance(client, InstrumentedClient):
+        return client
+    return InstrumentedClient(client)
@@ -1,8 +1,19 @@
 import sqlite3
 import os
+import re
+import html
+import zlib
+import hashlib
+import unicodedata
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from student_app.settings import get_db_path, get_sync_mode
 from student_app.auth_manager import AuthManager
+from student_app.records import Semester, Subject, Chapter, TodoChapter, columns, fetch_all, fetch_one
+from student_app import cloud_stats, read_cache, sql_stats
+from student_app.read_cache import cached, invalidates
 
 _auth = AuthManager()
 
@@ -15,15 +26,16 @@ def is_offline_mode():
     return uid == "local_user" or uid is None
 
 def get_supabase():
-    return _auth.supabase
+    return cloud_stats.instrument(_auth.supabase)
 
 def get_db_connection():
     db_path = get_db_path()
-    conn = sqlite3.connect(db_path)
+    conn = sql_stats.connect(db_path) if sql_stats.enabled else sqlite3.connect(db_path)
     conn.row_factory = sqlite3.Row
     return conn
 
 def init_db():
+    read_cache.clear()
     conn = get_db_connection()
     c = conn.cursor()
     
@@ -44,6 +56,11 @@ def init_db():
     c.execute('CREATE TABLE IF NOT EXISTS chapters (id INTEGER PRIMARY KEY, subject_id INTEGER, name TEXT NOT NULL, video_completed BOOLEAN DEFAULT 0, exercises_completed BOOLEAN DEFAULT 0, is_completed BOOLEAN DEFAULT 0, due_date DATE, cloud_id BIGINT, youtube_url TEXT)')
     c.execute('CREATE TABLE IF NOT EXISTS user_profile (id TEXT PRIMARY KEY, xp INTEGER DEFAULT 0, level INTEGER DEFAULT 1, total_sessions INTEGER DEFAULT 0, display_name TEXT)')
     c.execute('CREATE TABLE IF NOT EXISTS study_sessions (id INTEGER PRIMARY KEY, subject_id INTEGER, duration_minutes INTEGER, timestamp DATETIME DEFAULT CURRENT_TIMESTAMP, cloud_id BIGINT)')
+    # Notes live outside subjects as zlib-compressed chunks (see _write_notes)
+    c.execute('CREATE TABLE IF NOT EXISTS notes (subject_id INTEGER PRIMARY KEY, rev INTEGER NOT NULL DEFAULT 0, size INTEGER NOT NULL DEFAULT 0, chunks INTEGER NOT NULL DEFAULT 0)')
+    c.execute('CREATE TABLE IF NOT EXISTS notes_chunks (subject_id INTEGER NOT NULL, seq INTEGER NOT NULL, rev INTEGER NOT NULL, digest BLOB, data BLOB, PRIMARY KEY (subject_id, seq))')
+    # Single-row checkpoint of the running Pomodoro session (see session_journal.py)
+    c.execute('CREATE TABLE IF NOT EXISTS session_journal (id INTEGER PRIMARY KEY CHECK (id = 1), subject_id INTEGER, mode TEXT, planned_seconds INTEGER, elapsed_seconds REAL DEFAULT 0, started_at DATETIME, updated_at DATETIME)')
     
     # Migration: Add cloud_id if missing
     for table in ['semesters', 'subjects', 'chapters', 'study_sessions']:
@@ -57,6 +74,18 @@ def init_db():
     # Migration: Add has_exercises if missing
     try: c.execute('ALTER TABLE subjects ADD COLUMN has_exercises BOOLEAN DEFAULT 1')
     except: pass
+
+    c.execute('''CREATE TRIGGER IF NOT EXISTS subjects_notes_ad AFTER DELETE ON subjects BEGIN
+        DELETE FROM notes WHERE subject_id = old.id;
+        DELETE FROM notes_chunks WHERE subject_id = old.id;
+    END''')
+
+    _init_search_index(c)
+
+    # Migration: move inline subjects.notes into the chunk store
+    for row in c.execute("SELECT id, notes FROM subjects WHERE notes IS NOT NULL").fetchall():
+        if row['notes']: _write_notes(c, row['id'], row['notes'])
+    c.execute("UPDATE subjects SET notes = NULL WHERE notes IS NOT NULL")
     
     c.execute('SELECT count(*) FROM user_profile')
     if c.fetchone()[0] == 0:
@@ -64,67 +93,321 @@ def init_db():
         c.execute('INSERT INTO user_profile (id, xp, level, total_sessions) VALUES (?, 0, 1, 0)', (uid,))
     conn.commit(); conn.close()
 
+# --- Notes storage ---
+# Notes are split into fixed-size character chunks, each zlib-compressed and
+# stamped with the revision that last wrote it. A save only rewrites chunks
+# whose digest changed, and the `notes` head row carries the current revision.
+NOTES_CHUNK_CHARS = 1 << 15
+
+def _write_notes(c, sid, text):
+    """Store `text` for subject `sid` and return the new revision (0 if the subject is gone)."""
+    if not c.execute("SELECT 1 FROM subjects WHERE id=?", (sid,)).fetchone(): return 0
+    text = text or ""
+    head = c.execute("SELECT rev FROM notes WHERE subject_id=?", (sid,)).fetchone()
+    rev = (head[0] if head else 0) + 1
+    stored = {r[0]: r[1] for r in c.execute("SELECT seq, digest FROM notes_chunks WHERE subject_id=?", (sid,))}
+    old = None  # previous text, read only if something changed (the search index needs it)
+    count = 0
+    for count, start in enumerate(range(0, len(text), NOTES_CHUNK_CHARS), 1):
+        raw = text[start:start + NOTES_CHUNK_CHARS].encode("utf-8")
+        digest = hashlib.sha1(raw).digest()
+        if stored.get(count - 1) == digest: continue
+        if old is None: old = _read_notes(c, sid)
+        c.execute("INSERT OR REPLACE INTO notes_chunks (subject_id, seq, rev, digest, data) VALUES (?, ?, ?, ?, ?)",
+                  (sid, count - 1, rev, digest, zlib.compress(raw)))
+    if old is None and any(seq >= count for seq in stored): old = _read_notes(c, sid)
+    c.execute("DELETE FROM notes_chunks WHERE subject_id=? AND seq>=?", (sid, count))
+    c.execute("INSERT OR REPLACE INTO notes (subject_id, rev, size, chunks) VALUES (?, ?, ?, ?)", (sid, rev, len(text), count))
+    if old is not None: _index_notes(c, sid, old, text)
+    return rev
+
+def _read_notes(c, sid):
+    rows = c.execute("SELECT data FROM notes_chunks WHERE subject_id=? ORDER BY seq", (sid,)).fetchall()
+    return "".join(zlib.decompress(r[0]).decode("utf-8") for r in rows)
+
+# --- Full-text search ---
+# search_fts is contentless (content=''): it holds only the index, and titles
+# and snippets are rebuilt from the tables. rowid = id*3 for a subject's name,
+# id*3+1 for a chapter (name + YouTube URL) and id*3+2 for a subject's notes.
+# A contentless row can only be removed with FTS5's 'delete' command given the
+# values it was indexed with; triggers keep names and chapters in step, and
+# _index_notes does it for notes, whose text is compressed outside SQL's reach.
+_SEARCH_TRIGGERS = [
+    ("subjects_fts_ai", """AFTER INSERT ON subjects BEGIN
+        INSERT INTO search_fts (rowid, title, body) VALUES (new.id * 3, new.name, '');
+    END"""),
+    ("subjects_fts_au", """AFTER UPDATE OF name ON subjects BEGIN
+        INSERT INTO search_fts (search_fts, rowid, title, body) VALUES ('delete', old.id * 3, old.name, '');
+        INSERT INTO search_fts (rowid, title, body) VALUES (new.id * 3, new.name, '');
+    END"""),
+    ("subjects_fts_ad", """AFTER DELETE ON subjects BEGIN
+        INSERT INTO search_fts (search_fts, rowid, title, body) VALUES ('delete', old.id * 3, old.name, '');
+    END"""),
+    ("chapters_fts_ai", """AFTER INSERT ON chapters BEGIN
+        INSERT INTO search_fts (rowid, title, body) VALUES (new.id * 3 + 1, new.name, COALESCE(new.youtube_url, ''));
+    END"""),
+    ("chapters_fts_au", """AFTER UPDATE OF name, youtube_url ON chapters BEGIN
+        INSERT INTO search_fts (search_fts, rowid, title, body) VALUES ('delete', old.id * 3 + 1, old.name, COALESCE(old.youtube_url, ''));
+        INSERT INTO search_fts (rowid, title, body) VALUES (new.id * 3 + 1, new.name, COALESCE(new.youtube_url, ''));
+    END"""),
+    ("chapters_fts_ad", """AFTER DELETE ON chapters BEGIN
+        INSERT INTO search_fts (search_fts, rowid, title, body) VALUES ('delete', old.id * 3 + 1, old.name, COALESCE(old.youtube_url, ''));
+    END"""),
+]
+
+def _index_notes(c, sid, old, new):
+    """Replace subject `sid`'s notes in the search index (`old` must be what was indexed)."""
+    try:
+        if old: c.execute("INSERT INTO search_fts (search_fts, rowid, title, body) VALUES ('delete', ?, '', ?)", (sid * 3 + 2, old))
+        if new: c.execute("INSERT INTO search_fts (rowid, title, body) VALUES (?, '', ?)", (sid * 3 + 2, new))
+    except sqlite3.OperationalError: pass
+
+def _init_search_index(c):
+    table = c.execute("SELECT sql FROM sqlite_master WHERE name = 'search_fts'").fetchone()
+    # One transaction for the DDL below; on its own every statement commits (and syncs)
+    c.execute("SAVEPOINT search_index")
+    try:
+        if table and "content=''" not in table[0]:
+            # Older index stored a full copy of every note; rebuild it contentless
+            c.execute("DROP TABLE search_fts")
+            table = None
+        if not table:
+            try:
+                c.execute("CREATE VIRTUAL TABLE search_fts USING fts5(title, body, content='', tokenize = 'unicode61 remove_diacritics 2')")
+            except sqlite3.OperationalError:
+                c.execute("CREATE VIRTUAL TABLE search_fts USING fts5(title, body, content='')")
+        # Only triggers whose stored definition differs are recreated
+        stored = dict(c.execute("SELECT name, sql FROM sqlite_master WHERE type = 'trigger'").fetchall())
+        for name, body in _SEARCH_TRIGGERS:
+            sql = f"CREATE TRIGGER {name} {body}"
+            if stored.get(name) != sql:
+                c.execute(f"DROP TRIGGER IF EXISTS {name}")
+                c.execute(sql)
+        if not table:
+            # Backfill existing content once
+            c.execute("INSERT INTO search_fts (rowid, title, body) SELECT id * 3, name, '' FROM subjects")
+            c.execute("INSERT INTO search_fts (rowid, title, body) SELECT id * 3 + 1, name, COALESCE(youtube_url, '') FROM chapters")
+            for (sid,) in c.execute("SELECT subject_id FROM notes").fetchall():
+                _index_notes(c, sid, "", _read_notes(c, sid))
+        c.execute("RELEASE search_index")
+    except sqlite3.OperationalError as e:
+        c.execute("ROLLBACK TO search_index")
+        c.execute("RELEASE search_index")
+        print(f"[DB] Full-text search unavailable: {e}")
+
+def _fts_query(text):
+    """Every word must match, each as a prefix: 'integ calc' -> "integ"* AND "calc"*"""
+    terms = re.findall(r"\w+", text)
+    return " AND ".join('"' + t.replace('"', '""') + '"*' for t in terms)
+
+def _mark(text):
+    # Highlight markers are control chars so user text can be HTML-escaped safely
+    return html.escape(text or "").replace("\x02", "<b>").replace("\x03", "</b>")
+
+# Words as the unicode61 tokenizer sees them; matching folds case and accents like it
+_WORD = re.compile(r"[^\W_]+")
+
+def _fold(text):
+    return "".join(ch for ch in unicodedata.normalize("NFKD", text) if not unicodedata.combining(ch)).casefold()
+
+def _highlight(text, terms):
+    """Wrap words starting with one of `terms` in the \x02/\x03 markers."""
+    return _WORD.sub(lambda m: f"\x02{m.group()}\x03" if _fold(m.group()).startswith(terms) else m.group(), text)
+
+def _snippet(text, terms, size=16):
+    """About `size` words of `text` around the first match, highlighted and with '…' where cut."""
+    words, first = [], None
+    for m in _WORD.finditer(text):
+        if first is None and _fold(m.group()).startswith(terms): first = len(words)
+        words.append(m)
+        if first is not None and len(words) >= first + size: break
+    if not words: return ""
+    start = max(0, min((first or 0) - size // 4, len(words) - size))
+    window = words[start:start + size]
+    more = _WORD.search(text, window[-1].end()) is not None
+    return ("…" if start else "") + _highlight(text[window[0].start():window[-1].end()], terms) + ("…" if more else "")
+
+def search_content(query, limit=30):
+    """Ranked matches over subject names/notes and chapter names/URLs.
+
+    Returns dicts with kind ('subject'|'chapter'), the field that matched
+    ('name'|'chapter'|'notes'), ids, and HTML-highlighted title and snippet.
+    """
+    match = _fts_query(query)
+    if not match: return []
+    terms = tuple(_fold(t) for t in re.findall(r"\w+", query))
+    conn = get_db_connection()
+    results, seen = [], {}
+    fields = ('name', 'chapter', 'notes')  # by rowid % 3
+    try:
+        rowids = [r[0] for r in conn.execute(
+            "SELECT rowid FROM search_fts WHERE search_fts MATCH ? ORDER BY bm25(search_fts, 10.0, 1.0) LIMIT ?",
+            (match, limit))]
+        for rowid in rowids:
+            is_chapter = rowid % 3 == 1
+            field = fields[rowid % 3]
+            key = (is_chapter, rowid // 3)
+            # A subject can match on its name and on its notes; list it once, as a notes match
+            if key in seen:
+                if field == 'notes': seen[key]['field'] = field
+                continue
+            if is_chapter:
+                r = conn.execute("SELECT c.subject_id, c.name, c.youtube_url, s.name AS subject_name FROM chapters c "
+                                 "JOIN subjects s ON s.id = c.subject_id WHERE c.id=?", (rowid // 3,)).fetchone()
+                if not r: continue
+                sid, title, body = r['subject_id'], r['name'], r['youtube_url'] or ''
+            else:
+                r = conn.execute("SELECT id AS subject_id, name AS subject_name FROM subjects WHERE id=?", (rowid // 3,)).fetchone()
+                if not r: continue
+                sid, title, body = r['subject_id'], r['subject_name'], _read_notes(conn, rowid // 3)
+            seen[key] = {
+                'kind': 'chapter' if is_chapter else 'subject',
+                'field': field,
+                'subject_id': sid,
+                'chapter_id': rowid // 3 if is_chapter else None,
+                'subject_name': r['subject_name'],
+                'title': _mark(_highlight(title, terms)),
+                'snippet': _mark(_snippet(body, terms)),
+            }
+            results.append(seen[key])
+    except sqlite3.OperationalError as e:
+        print(f"[Search] Query failed: {e}")
+        return []
+    finally:
+        conn.close()
+    return results
+
 import traceback
 
+# PostgREST caps responses at max-rows (1000 on Supabase); pages must not exceed it
+SYNC_PAGE_SIZE = 1000
+
+def _fetch_pages(sb, table, uid, page_size=SYNC_PAGE_SIZE):
+    """Yield the user's rows of `table` page by page, by ascending id (keyset pagination)."""
+    last_id = None
+    while True:
+        q = sb.table(table).select("*").eq("user_id", uid)
+        if last_id is not None: q = q.gt("id", last_id)
+        page = q.order("id").limit(page_size).execute().data or []
+        if page: yield page
+        if len(page) < page_size: return
+        last_id = page[-1]['id']
+
+# Tables download concurrently; each keeps at most SYNC_PREFETCH_PAGES pages queued for the writer
+SYNC_WORKERS = 5  # one per table: profile, semesters, subjects, chapters, sessions
+SYNC_PREFETCH_PAGES = 4
+_END = object()
+
+def _prefetch(pool, stop, sb, table, uid):
+    """Start fetching `table` on `pool`; returns a generator over its pages, in order."""
+    pages = queue.Queue(maxsize=SYNC_PREFETCH_PAGES)
+
+    def put(item):
+        while not stop.is_set():
+            try: pages.put(item, timeout=0.1); return True
+            except queue.Full: pass
+        return False
+
+    def produce():
+        try:
+            for page in _fetch_pages(sb, table, uid):
+                if not put(page): return
+            put(_END)
+        except Exception as e:
+            put(e)
+
+    pool.submit(produce)
+    def consume():
+        while True:
+            item = pages.get()
+            if item is _END: return
+            if isinstance(item, Exception): raise item
+            yield item
+    return consume()
+
+def _insert_page(cursor, table, sql, rows):
+    """executemany one page; returns {cloud_id: local id} for the rows it inserted."""
+    start = cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}").fetchone()[0]
+    cursor.executemany(sql, rows)
+    return dict(cursor.execute(f"SELECT cloud_id, id FROM {table} WHERE id > ?", (start,)).fetchall())
+
 def sync_from_cloud():
     uid = get_uid()
-    if not uid or is_offline_mode(): return False
+    if not uid or is_offline_mode(): return cloud_stats.skipped("download")
+    collector = cloud_stats.collect()
+    conn = None
+    # Tables are submitted in the order they are written, so a small pool can't deadlock
+    pool = ThreadPoolExecutor(max_workers=SYNC_WORKERS, thread_name_prefix="sync")
+    stop = threading.Event()
     try:
+        read_cache.clear()
         sb = get_supabase()
         print(f"[Sync] Downloading data for UID: {uid}")
-        r_sem = sb.table("semesters").select("*").eq("user_id", uid).execute()
-        r_sub = sb.table("subjects").select("*").eq("user_id", uid).execute()
-        r_cha = sb.table("chapters").select("*").eq("user_id", uid).execute()
-        r_pro = sb.table("user_profile").select("*").eq("user_id", uid).maybe_single().execute()
-        r_ses = sb.table("study_sessions").select("*").eq("user_id", uid).execute()
+        f_pro = pool.submit(lambda: sb.table("user_profile").select("*").eq("user_id", uid).maybe_single().execute())
+        semesters, subjects, chapters, sessions = (_prefetch(pool, stop, sb, t, uid)
+                                                   for t in ("semesters", "subjects", "chapters", "study_sessions"))
 
+        # Pages are written as they arrive, all in one transaction: a failed download rolls back
         conn = get_db_connection()
         cursor = conn.cursor()
         
         cursor.execute("DELETE FROM semesters")
         cursor.execute("DELETE FROM subjects")
+        cursor.execute("DELETE FROM notes")
+        cursor.execute("DELETE FROM notes_chunks")
         cursor.execute("DELETE FROM chapters")
+        # Notes rows of the index have no trigger to remove them
+        try: cursor.execute("INSERT INTO search_fts (search_fts) VALUES ('delete-all')")
+        except sqlite3.OperationalError: pass
         cursor.execute("DELETE FROM study_sessions")
         cursor.execute("DELETE FROM user_profile")
 
         sem_map = {}
         sub_map = {}
 
-        for s in r_sem.data:
-            cursor.execute("INSERT INTO semesters (name, cloud_id) VALUES (?, ?)", (str(s['name']), s['id']))
-            sem_map[s['id']] = cursor.lastrowid
+        for page in semesters:
+            sem_map.update(_insert_page(cursor, "semesters", "INSERT INTO semesters (name, cloud_id) VALUES (?, ?)",
+                                        ((str(s['name']), s['id']) for s in page)))
             
-        for s in r_sub.data:
-            local_sem_id = sem_map.get(s['semester_id'])
-            cursor.execute("INSERT INTO subjects (semester_id, name, exam_date, notes, has_exercises, cloud_id) VALUES (?, ?, ?, ?, ?, ?)", 
-                         (local_sem_id, str(s['name']), s['exam_date'], s['notes'], int(s.get('has_exercises', True)), s['id']))
-            sub_map[s['id']] = cursor.lastrowid
+        for page in subjects:
+            page_map = _insert_page(cursor, "subjects", "INSERT INTO subjects (semester_id, name, exam_date, has_exercises, cloud_id) VALUES (?, ?, ?, ?, ?)",
+                                    ((sem_map.get(s['semester_id']), str(s['name']), s['exam_date'], int(s.get('has_exercises', True)), s['id']) for s in page))
+            sub_map.update(page_map)
+            for s in page:
+                if s.get('notes'): _write_notes(cursor, page_map[s['id']], s['notes'])
             
-        for c in r_cha.data:
-            local_sub_id = sub_map.get(c['subject_id'])
-            cursor.execute("INSERT INTO chapters (subject_id, name, video_completed, exercises_completed, is_completed, cloud_id, youtube_url) VALUES (?, ?, ?, ?, ?, ?, ?)", 
-                         (local_sub_id, str(c['name']), int(c['video_completed']), int(c['exercises_completed']), int(c['is_completed']), c['id'], c.get('youtube_url')))
+        for page in chapters:
+            cursor.executemany("INSERT INTO chapters (subject_id, name, video_completed, exercises_completed, is_completed, cloud_id, youtube_url) VALUES (?, ?, ?, ?, ?, ?, ?)", 
+                               ((sub_map.get(c['subject_id']), str(c['name']), int(c['video_completed']), int(c['exercises_completed']), int(c['is_completed']), c['id'], c.get('youtube_url')) for c in page))
         
-        for s in r_ses.data:
-            local_sub_id = sub_map.get(s['subject_id'])
-            cursor.execute("INSERT INTO study_sessions (subject_id, duration_minutes, timestamp, cloud_id) VALUES (?, ?, ?, ?)", 
-                         (local_sub_id, int(s['duration_minutes']), s['timestamp'], s['id']))
+        for page in sessions:
+            cursor.executemany("INSERT INTO study_sessions (subject_id, duration_minutes, timestamp, cloud_id) VALUES (?, ?, ?, ?)", 
+                               ((sub_map.get(s['subject_id']), int(s['duration_minutes']), s['timestamp'], s['id']) for s in page))
         
-        if r_pro.data:
+        r_pro = f_pro.result()
+        if r_pro and r_pro.data:
             cursor.execute("INSERT INTO user_profile (id, xp, level, total_sessions, display_name) VALUES (?, ?, ?, ?, ?)", 
                          (uid, int(r_pro.data['xp']), int(r_pro.data['level']), int(r_pro.data['total_sessions']), r_pro.data.get('display_name')))
         
-        conn.commit(); conn.close()
+        conn.commit()
+        read_cache.clear()
         print("[Sync] Download and local update successful.")
-        return True
+        return cloud_stats.sync_result(True, "download", collector)
     except Exception as e:
         print(f"[Sync] Download failed: {e}")
         traceback.print_exc()
-        return False
+        return cloud_stats.sync_result(False, "download", collector)
+    finally:
+        stop.set()
+        pool.shutdown(wait=True)
+        if conn: conn.close()
 
+@invalidates("semesters", "subjects", "chapters")  # cloud_id write-back
 def push_to_cloud():
-    uid = get_uid(); sb = get_supabase(); conn = get_db_connection()
-    if not uid or is_offline_mode(): return False
+    uid = get_uid()
+    if not uid or is_offline_mode(): return cloud_stats.skipped("upload")
+    sb = get_supabase(); conn = get_db_connection()
+    collector = cloud_stats.collect()
     try:
         print("[Sync] Starting Cloud Push (Mirror Mode)...")
         # 1. Clear cloud data for this user
@@ -150,11 +433,11 @@ def push_to_cloud():
                 new_sem_id = res_s.data[0]['id']
                 cursor.execute("UPDATE semesters SET cloud_id = ? WHERE id = ?", (new_sem_id, s['id']))
                 
-                subs = cursor.execute("SELECT * FROM subjects WHERE semester_id = ?", (s['id'],)).fetchall()
+                subs = cursor.execute(f"SELECT {_SUBJECT_COLUMNS} FROM subjects WHERE semester_id = ?", (s['id'],)).fetchall()
                 for sub in subs:
                     res_sub = sb.table("subjects").insert({
                         "name": sub['name'], "semester_id": new_sem_id, 
-                        "exam_date": sub['exam_date'], "notes": sub['notes'], 
+                        "exam_date": sub['exam_date'], "notes": _read_notes(cursor, sub['id']) or None, 
                         "has_exercises": bool(sub['has_exercises']), "user_id": uid
                     }).execute()
                     
@@ -187,22 +470,35 @@ def push_to_cloud():
 
         conn.commit()
         print("[Sync] Cloud Push successful.")
-        return True
+        return cloud_stats.sync_result(True, "upload", collector)
     except Exception as e:
         print(f"[Sync] Push failed: {e}")
         traceback.print_exc()
-        return False
+        return cloud_stats.sync_result(False, "upload", collector)
     finally:
         conn.close()
 
-def get_all_semesters(): conn = get_db_connection(); r = conn.execute("SELECT * FROM semesters").fetchall(); conn.close(); return r
+# Read helpers return records.* tuples built from explicit column lists.
+# Subject listings never carry notes; use get_subject_notes() for the body.
+_SEMESTER_COLUMNS = columns(Semester)
+_SUBJECT_COLUMNS = columns(Subject)
+_CHAPTER_COLUMNS = columns(Chapter)
+_TODO_COLUMNS = "c.id, c.subject_id, c.name, c.video_completed, c.exercises_completed, c.youtube_url, s.name"
+@cached("semesters")
+def get_all_semesters(): conn = get_db_connection(); r = fetch_all(conn, Semester, f"SELECT {_SEMESTER_COLUMNS} FROM semesters"); conn.close(); return r
+@cached("subjects")
 def get_all_subjects(sem_id=None):
     conn = get_db_connection()
-    if sem_id: r = conn.execute("SELECT * FROM subjects WHERE semester_id = ?", (sem_id,)).fetchall()
-    else: r = conn.execute("SELECT * FROM subjects").fetchall()
+    if sem_id: r = fetch_all(conn, Subject, f"SELECT {_SUBJECT_COLUMNS} FROM subjects WHERE semester_id = ?", (sem_id,))
+    else: r = fetch_all(conn, Subject, f"SELECT {_SUBJECT_COLUMNS} FROM subjects")
     conn.close(); return r
-def get_chapters_by_subject(sub_id): conn = get_db_connection(); r = conn.execute("SELECT * FROM chapters WHERE subject_id = ?", (sub_id,)).fetchall(); conn.close(); return r
+@cached("subjects")
+def get_subject(sub_id): conn = get_db_connection(); r = fetch_one(conn, Subject, f"SELECT {_SUBJECT_COLUMNS} FROM subjects WHERE id = ?", (sub_id,)); conn.close(); return r
+@cached("chapters")
+def get_chapters_by_subject(sub_id): conn = get_db_connection(); r = fetch_all(conn, Chapter, f"SELECT {_CHAPTER_COLUMNS} FROM chapters WHERE subject_id = ?", (sub_id,)); conn.close(); return r
+@cached("user_profile")
 def get_user_profile(): conn = get_db_connection(); r = conn.execute("SELECT * FROM user_profile LIMIT 1").fetchone(); conn.close(); return r
+@invalidates("user_profile")
 def add_xp(amount, session_inc=0):
     conn = get_db_connection(); p = conn.execute("SELECT * FROM user_profile LIMIT 1").fetchone()
     nx = p['xp'] + amount; nl = 1 + (nx // 500); ns = p['total_sessions'] + session_inc
@@ -218,8 +514,35 @@ def log_study_session(sub_id, duration):
         try: get_supabase().table("study_sessions").insert({"subject_id": sub_id, "duration_minutes": duration, "user_id": get_uid()}).execute()
         except: pass
 
+@invalidates("user_profile")
+def complete_study_session(sub_id, duration, xp_amount, session_inc=1, timestamp=None):
+    """Log a session, award XP and clear the session journal in one transaction."""
+    conn = get_db_connection()
+    try:
+        with conn:
+            p = conn.execute("SELECT * FROM user_profile LIMIT 1").fetchone()
+            if sub_id:
+                conn.execute("INSERT INTO study_sessions (subject_id, duration_minutes, timestamp) VALUES (?, ?, COALESCE(?, CURRENT_TIMESTAMP))",
+                             (sub_id, duration, timestamp))
+            nx = p['xp'] + xp_amount; nl = 1 + (nx // 500); ns = p['total_sessions'] + session_inc
+            conn.execute("UPDATE user_profile SET xp=?, level=?, total_sessions=?", (nx, nl, ns))
+            conn.execute("DELETE FROM session_journal")
+    finally:
+        conn.close()
+    if get_sync_mode() == "Automatic" and not is_offline_mode():
+        try:
+            sb = get_supabase()
+            if sub_id:
+                row = {"subject_id": sub_id, "duration_minutes": duration, "user_id": get_uid()}
+                if timestamp: row["timestamp"] = str(timestamp)
+                sb.table("study_sessions").insert(row).execute()
+            sb.table("user_profile").update({"xp": nx, "level": nl, "total_sessions": ns}).eq("user_id", get_uid()).execute()
+        except: pass
+    return (nl > p['level']), nl
+
+@cached("chapters", "subjects")
 def get_todo_chapters():
-    conn = get_db_connection(); r = conn.execute("SELECT c.*, s.name as subject_name FROM chapters c JOIN subjects s ON c.subject_id = s.id WHERE c.is_completed = 0 LIMIT 5").fetchall(); conn.close(); return r
+    conn = get_db_connection(); r = fetch_all(conn, TodoChapter, f"SELECT {_TODO_COLUMNS} FROM chapters c JOIN subjects s ON c.subject_id = s.id WHERE c.is_completed = 0 LIMIT 5"); conn.close(); return r
 def get_progress_stats():
     conn = get_db_connection(); t = conn.execute("SELECT COUNT(*) FROM chapters").fetchone()[0] * 2; d = conn.execute("SELECT SUM(video_completed + exercises_completed) FROM chapters").fetchone()[0] or 0; conn.close(); return t, d
 def get_next_exam_info():
@@ -279,54 +602,134 @@ def get_study_streak():
         cursor -= timedelta(days=1)
     return streak
 
-def add_semester(name): conn = get_db_connection(); c = conn.cursor(); c.execute("INSERT INTO semesters (id, name) VALUES (?, ?)", (int(datetime.now().timestamp()), name)); conn.commit(); conn.close()
-def add_subject(name, sem_id): conn = get_db_connection(); c = conn.cursor(); c.execute("INSERT INTO subjects (id, semester_id, name) VALUES (?, ?, ?)", (int(datetime.now().timestamp()), sem_id, name)); conn.commit(); conn.close()
+@invalidates("semesters")
+def add_semester(name):
+    conn = get_db_connection(); c = conn.cursor(); c.execute("INSERT INTO semesters (name) VALUES (?)", (name,)); conn.commit(); sid = c.lastrowid; conn.close(); return sid
+@invalidates("subjects")
+def add_subject(name, sem_id, exam_date=None):
+    conn = get_db_connection(); c = conn.cursor(); c.execute("INSERT INTO subjects (semester_id, name, exam_date) VALUES (?, ?, ?)", (sem_id, name, exam_date)); conn.commit(); sid = c.lastrowid; conn.close(); return sid
+@invalidates("chapters")
 def add_chapter(sub_id, name, youtube_url=None): 
     conn = get_db_connection()
     c = conn.cursor()
-    c.execute("INSERT INTO chapters (id, subject_id, name, youtube_url) VALUES (?, ?, ?, ?)", 
-              (int(datetime.now().timestamp()), sub_id, name, youtube_url))
+    c.execute("INSERT INTO chapters (subject_id, name, youtube_url) VALUES (?, ?, ?)", 
+              (sub_id, name, youtube_url))
     conn.commit()
+    cid = c.lastrowid
     conn.close()
+    return cid
 
+@invalidates("chapters")
 def update_chapter_youtube(chapter_id, youtube_url):
     conn = get_db_connection()
     conn.execute("UPDATE chapters SET youtube_url = ? WHERE id = ?", (youtube_url, chapter_id))
     conn.commit()
     conn.close()
+@invalidates("semesters")
 def delete_semester(sid): conn = get_db_connection(); conn.execute("DELETE FROM semesters WHERE id=?", (sid,)); conn.commit(); conn.close()
-def delete_subject(sid): conn = get_db_connection(); conn.execute("DELETE FROM subjects WHERE id=?", (sid,)); conn.commit(); conn.close()
+@invalidates("subjects")
+def delete_subject(sid):
+    conn = get_db_connection()
+    _index_notes(conn, sid, _read_notes(conn, sid), "")
+    conn.execute("DELETE FROM subjects WHERE id=?", (sid,)); conn.commit(); conn.close()
+@invalidates("chapters")
 def delete_chapter(cid): conn = get_db_connection(); conn.execute("DELETE FROM chapters WHERE id=?", (cid,)); conn.commit(); conn.close()
-def update_subject_notes(sid, n): conn = get_db_connection(); conn.execute("UPDATE subjects SET notes=? WHERE id=?", (n, sid)); conn.commit(); conn.close()
+class NotesConflict(Exception):
+    """The notes were saved by another editor since the expected revision."""
+    def __init__(self, rev):
+        super().__init__(f"notes are at revision {rev}")
+        self.rev = rev
+def update_subject_notes(sid, n, expected_rev=None):
+    """Store notes and return the subject's new notes revision.
+
+    With `expected_rev`, raises NotesConflict (and writes nothing) if the stored
+    revision has moved on, instead of overwriting another editor's save.
+    """
+    conn = get_db_connection()
+    try:
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            if expected_rev is not None:
+                row = conn.execute(_NOTES_REV_SQL, (sid,)).fetchone()
+                if row and row[0] != expected_rev: raise NotesConflict(row[0])
+            return _write_notes(conn.cursor(), sid, n)
+    finally:
+        conn.close()
+@invalidates("chapters")
 def toggle_video_status(cid, s): conn = get_db_connection(); conn.execute("UPDATE chapters SET video_completed=?, is_completed=(video_completed AND exercises_completed) WHERE id=?", (s, cid)); conn.commit(); conn.close()
+@invalidates("chapters")
 def toggle_exercises_status(cid, s): conn = get_db_connection(); conn.execute("UPDATE chapters SET exercises_completed=?, is_completed=(video_completed AND exercises_completed) WHERE id=?", (s, cid)); conn.commit(); conn.close()
+@invalidates("chapters")
 def toggle_chapter_status(cid, s): conn = get_db_connection(); conn.execute("UPDATE chapters SET is_completed=? WHERE id=?", (s, cid)); conn.commit(); conn.close()
 def get_subject_notes(sub_id):
-    conn = get_db_connection(); row = conn.execute("SELECT notes FROM subjects WHERE id=?", (sub_id,)).fetchone(); conn.close(); return row['notes'] if row else ""
+    conn = get_db_connection(); text = _read_notes(conn, sub_id); conn.close(); return text
+_NOTES_REV_SQL = "SELECT COALESCE(n.rev, 0) FROM subjects s LEFT JOIN notes n ON n.subject_id = s.id WHERE s.id=?"
+def get_subject_notes_rev(sub_id):
+    conn = get_db_connection(); row = conn.execute(_NOTES_REV_SQL, (sub_id,)).fetchone(); conn.close(); return row[0] if row else None
+def load_subject_notes(sub_id):
+    """(notes, revision) read in one transaction so the pair is consistent."""
+    conn = get_db_connection()
+    try:
+        with conn:
+            conn.execute("BEGIN")
+            row = conn.execute(_NOTES_REV_SQL, (sub_id,)).fetchone()
+            if not row: return "", None
+            return _read_notes(conn, sub_id), row[0]
+    finally:
+        conn.close()
 def get_subject_progress(sub_id):
-    chaps = get_chapters_by_subject(sub_id); total = len(chaps) * 2; done = sum((1 if c['video_completed'] else 0) + (1 if c['exercises_completed'] else 0) for c in chaps); return total, done
+    chaps = get_chapters_by_subject(sub_id); total = len(chaps) * 2; done = sum((1 if c.video_completed else 0) + (1 if c.exercises_completed else 0) for c in chaps); return total, done
 def get_next_task(sub_id):
     chaps = get_chapters_by_subject(sub_id)
-    for c in sorted(chaps, key=lambda x: x['id']):
+    for c in sorted(chaps, key=lambda x: x.id):
         for c in chaps:
-            if not c['video_completed']: return {'chapter_id': c['id'], 'chapter_name': c['name'], 'type': 'Course'}
-            if not c['exercises_completed']: return {'chapter_id': c['id'], 'chapter_name': c['name'], 'type': 'Exercises'}
+            if not c.video_completed: return {'chapter_id': c.id, 'chapter_name': c.name, 'type': 'Course'}
+            if not c.exercises_completed: return {'chapter_id': c.id, 'chapter_name': c.name, 'type': 'Exercises'}
 def get_upcoming_deadlines(days_limit=3): return []
 def get_detailed_stats(sid=None):
     conn = get_db_connection(); r = conn.execute('SELECT s.name, COALESCE(SUM(ss.duration_minutes), 0) as total_minutes, COUNT(ss.id) as session_count FROM subjects s LEFT JOIN study_sessions ss ON s.id = ss.subject_id WHERE s.semester_id = ? OR ? IS NULL GROUP BY s.id, s.name ORDER BY total_minutes DESC', (sid, sid)).fetchall(); conn.close(); return r
 def get_semester_comparison_stats(): return []
 def get_daily_stats(): return []
 def get_weekly_stats(): return []
+@invalidates("subjects")
 def update_subject_dates(sid, ed, td): conn = get_db_connection(); conn.execute("UPDATE subjects SET exam_date=? WHERE id=?", (ed, sid)); conn.commit(); conn.close()
 def update_chapter_due_date(cid, dd): pass
+def _template_chapter(ch):
+    """Chapters are plain names (templates.txt) or {name, url, resources} dicts (templates.js)."""
+    if not isinstance(ch, dict): return str(ch), None
+    url = ch.get('url') or next((r.get('url') for r in ch.get('resources', []) if r.get('type') == 'video'), None)
+    return ch.get('name', ''), url or None
+
+def _insert_template_subjects(c, sem_id, subjects):
+    for sub in subjects:
+        c.execute("INSERT INTO subjects (semester_id, name, has_exercises) VALUES (?, ?, ?)",
+                  (sem_id, sub['name'], int(sub.get('has_exercises', True))))
+        subid = c.lastrowid
+        c.executemany("INSERT INTO chapters (subject_id, name, youtube_url) VALUES (?, ?, ?)",
+                      [(subid,) + _template_chapter(ch) for ch in sub.get('chapters', [])])
+
+@invalidates("semesters", "subjects", "chapters")
 def apply_template(template_data):
-    for sem in template_data:
-        add_semester(sem['name'])
-        conn = get_db_connection(); sid = conn.execute("SELECT id FROM semesters ORDER BY id DESC LIMIT 1").fetchone()[0]; conn.close()
-        for sub in sem['subjects']:
-            add_subject(sub['name'], sid)
-            conn = get_db_connection(); subid = conn.execute("SELECT id FROM subjects ORDER BY id DESC LIMIT 1").fetchone()[0]; conn.close()
-            for ch in sub['chapters']: add_chapter(subid, ch)
+    """Create one semester per template, with its subjects and chapters, in a single transaction."""
+    conn = get_db_connection()
+    try:
+        with conn:
+            c = conn.cursor()
+            for sem in template_data:
+                c.execute("INSERT INTO semesters (name) VALUES (?)", (sem['name'],))
+                _insert_template_subjects(c, c.lastrowid, sem.get('subjects', []))
+    finally:
+        conn.close()
+
+@invalidates("subjects", "chapters")
+def apply_template_to_semester(sem_id, template):
+    conn = get_db_connection()
+    try:
+        with conn:
+            _insert_template_subjects(conn.cursor(), sem_id, template.get('subjects', []))
+    finally:
+        conn.close()
+
 def reset_all_data():
     if os.path.exists(get_db_path()): os.remove(get_db_path())
     init_db()
@@ -0,0 +1,343 @@
+"""
+In-process stand-in for the Supabase client, backed by SQLite.
+
+Covers the surface the app uses: table().select/insert/upsert/update/delete,
+filters (eq, neq, gt, gte, lt, lte, in_), order, limit, range,
+single/maybe_single and execute(), plus the auth calls AuthManager makes.
+Each request can be delayed and made to fail at a seeded random rate, so
+sync and GUI stalls can be reproduced offline.
+
+Enable it for the app with environment variables:
+
+    STUDENTPRO_FAKE_SUPABASE=1              (or a path to the backing .db file; 0/false/no/off disable it)
+    STUDENTPRO_FAKE_LATENCY_MS=80           per-request latency
+    STUDENTPRO_FAKE_JITTER_MS=40            extra uniform random latency
+    STUDENTPRO_FAKE_FAILURE_RATE=0.05       probability a request raises
+    STUDENTPRO_FAKE_SEED=1                  makes latency/failures repeatable
+"""
+
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+
+# Column defaults the real schema would fill in on insert
+DEFAULTS = {
+    "semesters": {},
+    "subjects": {"exam_date": None, "notes": None, "has_exercises": True},
+    "chapters": {"video_completed": False, "exercises_completed": False, "is_completed": False, "youtube_url": None},
+    "study_sessions": {"timestamp": None},
+    "user_profile": {"xp": 0, "level": 1, "total_sessions": 0, "display_name": None},
+}
+
+
+class FakeSupabaseError(Exception):
+    """Raised for injected failures and unsupported requests."""
+
+
+class FakeResponse:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+class _Obj:
+    def __init__(self, **kw):
+        self.__dict__.update(kw)
+
+
+def _user_for(email):
+    return _Obj(id=str(uuid.uuid5(uuid.NAMESPACE_URL, f"studentpro:{email}")), email=email)
+
+
+class FakeAuth:
+    def __init__(self, client):
+        self._client = client
+        self._tokens = {}
+        self.user = None
+
+    def _session_for(self, user):
+        token = uuid.uuid4().hex
+        self._tokens[token] = user
+        return _Obj(access_token=token, refresh_token=user.email, user=user)
+
+    def sign_up(self, credentials):
+        self._client._request()
+        self.user = _user_for(credentials["email"])
+        return _Obj(user=self.user, session=self._session_for(self.user))
+
+    def sign_in_with_password(self, credentials):
+        return self.sign_up(credentials)
+
+    def set_session(self, access_token, refresh_token):
+        self._client._request()
+        # Tokens don't survive a restart; the refresh token carries the email
+        self.user = self._tokens.get(access_token) or _user_for(refresh_token)
+        return _Obj(user=self.user, session=self._session_for(self.user))
+
+    def sign_out(self):
+        self.user = None
+
+
+class FakeQuery:
+    def __init__(self, client, table):
+        self._client = client
+        self._table = table
+        self._op = "select"
+        self._columns = "*"
+        self._payload = None
+        self._on_conflict = "id"
+        self._filters = []
+        self._order = []
+        self._limit = None
+        self._offset = 0
+        self._single = None
+        self._count = None
+
+    # --- operations ---
+    def select(self, columns="*", count=None):
+        self._op, self._columns, self._count = "select", columns, count
+        return self
+
+    def insert(self, rows):
+        self._op, self._payload = "insert", rows
+        return self
+
+    def upsert(self, rows, on_conflict="id"):
+        self._op, self._payload, self._on_conflict = "upsert", rows, on_conflict
+        return self
+
+    def update(self, values):
+        self._op, self._payload = "update", values
+        return self
+
+    def delete(self):
+        self._op = "delete"
+        return self
+
+    # --- filters and modifiers ---
+    def _filter(self, col, op, value):
+        self._filters.append((col, op, value))
+        return self
+
+    def eq(self, col, value): return self._filter(col, "=", value)
+    def neq(self, col, value): return self._filter(col, "!=", value)
+    def gt(self, col, value): return self._filter(col, ">", value)
+    def gte(self, col, value): return self._filter(col, ">=", value)
+    def lt(self, col, value): return self._filter(col, "<", value)
+    def lte(self, col, value): return self._filter(col, "<=", value)
+    def in_(self, col, values): return self._filter(col, "IN", list(values))
+
+    def order(self, col, desc=False):
+        self._order.append((col, desc))
+        return self
+
+    def limit(self, n):
+        self._limit = n
+        return self
+
+    def range(self, start, end):
+        """Inclusive row range, as in PostgREST."""
+        self._offset, self._limit = start, end - start + 1
+        return self
+
+    def single(self):
+        self._single = "single"
+        return self
+
+    def maybe_single(self):
+        self._single = "maybe"
+        return self
+
+    def execute(self):
+        self._client._request()
+        return self._client._run(self)
+
+
+class FakeSupabase:
+    def __init__(self, path=":memory:", latency=0.0, jitter=0.0, failure_rate=0.0, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS rows (id INTEGER PRIMARY KEY AUTOINCREMENT, tbl TEXT NOT NULL, data TEXT NOT NULL)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS rows_tbl ON rows (tbl)")
+        self._conn.commit()
+        self._parsed = {}  # table -> [(rid, row)], dropped on writes
+        self._data_version = None
+        self.views = {"weekly_leaderboard": self._weekly_leaderboard}
+        self.stats = {"requests": 0, "failures": 0, "rows_read": 0, "rows_written": 0, "sleep_seconds": 0.0}
+        self.auth = FakeAuth(self)
+
+    @classmethod
+    def from_env(cls):
+        target = os.getenv("STUDENTPRO_FAKE_SUPABASE", "1")
+        if target.strip().lower() in ("1", "true", "yes", "on"):
+            from student_app.settings import get_app_data_dir
+            target = os.path.join(get_app_data_dir(), "fake_supabase.db")
+        seed = os.getenv("STUDENTPRO_FAKE_SEED")
+        return cls(
+            target,
+            latency=float(os.getenv("STUDENTPRO_FAKE_LATENCY_MS", "0")) / 1000,
+            jitter=float(os.getenv("STUDENTPRO_FAKE_JITTER_MS", "0")) / 1000,
+            failure_rate=float(os.getenv("STUDENTPRO_FAKE_FAILURE_RATE", "0")),
+            seed=int(seed) if seed else None,
+        )
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    def close(self):
+        self._conn.close()
+
+    # --- request simulation ---
+    def _request(self):
+        with self._lock:
+            self.stats["requests"] += 1
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+            fail = self.failure_rate and self._rng.random() < self.failure_rate
+        if delay:
+            time.sleep(delay)
+            with self._lock: self.stats["sleep_seconds"] += delay
+        if fail:
+            with self._lock: self.stats["failures"] += 1
+            raise FakeSupabaseError("Injected failure")
+
+    # --- storage ---
+    def _rows(self, table):
+        """Parsed rows of `table`; shared with the cache, so copy before mutating."""
+        if table in self.views:
+            return [(None, r) for r in self.views[table]()]
+        # data_version changes when another connection writes the same file
+        version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if version != self._data_version:
+            self._parsed.clear()
+            self._data_version = version
+        rows = self._parsed.get(table)
+        if rows is None:
+            cur = self._conn.execute("SELECT id, data FROM rows WHERE tbl = ?", (table,))
+            rows = self._parsed[table] = [(rid, json.loads(data)) for rid, data in cur]
+        return rows
+
+    @staticmethod
+    def _matches(row, filters):
+        for col, op, value in filters:
+            v = row.get(col)
+            if op == "=" and not (v == value or str(v) == str(value)): return False
+            if op == "!=" and (v == value or str(v) == str(value)): return False
+            if op == "IN" and v not in value and str(v) not in map(str, value): return False
+            if op in ("<", "<=", ">", ">="):
+                if v is None: return False
+                if op == "<" and not v < value: return False
+                if op == "<=" and not v <= value: return False
+                if op == ">" and not v > value: return False
+                if op == ">=" and not v >= value: return False
+        return True
+
+    @staticmethod
+    def _project(row, columns):
+        if columns.strip() == "*": return dict(row)
+        return {c.strip(): row.get(c.strip()) for c in columns.split(",")}
+
+    def _insert_row(self, table, values):
+        row = dict(DEFAULTS.get(table, {}))
+        if table == "study_sessions": row["timestamp"] = datetime.now().isoformat()
+        row.update(values)
+        cur = self._conn.execute("INSERT INTO rows (tbl, data) VALUES (?, '{}')", (table,))
+        row.setdefault("id", cur.lastrowid)
+        self._conn.execute("UPDATE rows SET data = ? WHERE id = ?", (json.dumps(row), cur.lastrowid))
+        return cur.lastrowid, row
+
+    def _run(self, q):
+        with self._lock:
+            if q._op == "select":
+                return self._select(q)
+            if q._table in self.views:
+                raise FakeSupabaseError(f"{q._table} is read-only")
+            try:
+                with self._conn:
+                    data = self._write(q)
+            finally:
+                self._parsed.pop(q._table, None)
+            self.stats["rows_written"] += len(data)
+            return FakeResponse(data)
+
+    def _write(self, q):
+        if q._op == "insert":
+            payload = q._payload if isinstance(q._payload, list) else [q._payload]
+            data = [self._insert_row(q._table, r)[1] for r in payload]
+        elif q._op == "upsert":
+            data = self._upsert(q)
+        else:
+            data = []
+            for rid, row in self._rows(q._table):
+                if not self._matches(row, q._filters): continue
+                if q._op == "update":
+                    row = {**row, **q._payload}
+                    self._conn.execute("UPDATE rows SET data = ? WHERE id = ?", (json.dumps(row), rid))
+                else:
+                    self._conn.execute("DELETE FROM rows WHERE id = ?", (rid,))
+                data.append(row)
+        return data
+
+    def _upsert(self, q):
+        keys = [k.strip() for k in q._on_conflict.split(",")]
+        payload = q._payload if isinstance(q._payload, list) else [q._payload]
+        existing = list(self._rows(q._table))
+        data = []
+        for values in payload:
+            match = next((i for i, (rid, row) in enumerate(existing)
+                          if all(k in values and str(row.get(k)) == str(values[k]) for k in keys)), None)
+            if match is not None:
+                rid, row = existing[match]
+                row = {**row, **values}
+                existing[match] = (rid, row)
+                self._conn.execute("UPDATE rows SET data = ? WHERE id = ?", (json.dumps(row), rid))
+            else:
+                rid, row = self._insert_row(q._table, values)
+                existing.append((rid, row))
+            data.append(row)
+        return data
+
+    def _select(self, q):
+        rows = [row for _, row in self._rows(q._table) if self._matches(row, q._filters)]
+        total = len(rows)
+        for col, desc in reversed(q._order):
+            rows.sort(key=lambda r: (r.get(col) is None, r.get(col)), reverse=desc)
+        if q._limit is not None:
+            rows = rows[q._offset:q._offset + q._limit]
+        elif q._offset:
+            rows = rows[q._offset:]
+        rows = [self._project(r, q._columns) for r in rows]
+        self.stats["rows_read"] += len(rows)
+        count = total if q._count else None
+        if q._single:
+            if len(rows) > 1 or (q._single == "single" and not rows):
+                raise FakeSupabaseError(f"Expected one row from {q._table}, got {len(rows)}")
+            return FakeResponse(rows[0] if rows else None, count)
+        return FakeResponse(rows, count)
+
+    def _weekly_leaderboard(self):
+        profiles = [row for _, row in self._rows("user_profile")]
+        profiles.sort(key=lambda r: r.get("xp") or 0, reverse=True)
+        return [{"user_id": p.get("user_id"), "display_name": p.get("display_name"), "level": p.get("level"),
+                 "xp": p.get("xp"), "sessions_count": p.get("total_sessions", 0)} for p in profiles]
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_client():
+    """One client per process, so every AuthManager sees the same fake backend."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = FakeSupabase.from_env()
+        return _shared
@@ -15,13 +15,17 @@ from student_app.ui.pomodoro import PomodoroTimer
 from student_app.ui.analytics import Analytics
 from student_app.ui.leaderboard import LeaderboardTab
 from student_app.ui.settings import SettingsTab
+from student_app.ui.global_search import GlobalSearchBox
 from student_app.ui.onboarding import OnboardingDialog
 from student_app.ui.login import LoginWindow
 from student_app.auth_manager import AuthManager
 from student_app.sound_manager import create_app_sounds
+from student_app import stall_watchdog, startup_profile
 from student_app.settings import get_language, get_theme
 from student_app.ui.translations import TRANSLATIONS
+from student_app.action_profiler import profile_actions
 
+@profile_actions
 class MainWindow(QMainWindow):
     def __init__(self, user=None):
         super().__init__()
@@ -34,12 +38,15 @@ class MainWindow(QMainWindow):
         is_offline = hasattr(self.user, 'id') and self.user.id == "local_user"
         if self.user and not is_offline:
             sync_from_cloud()
+            startup_profile.mark("main_window.sync")
         
         self.setWindowTitle("Student Study Manager By Chenoufi Abderrahmane")
         self.resize(1100, 750)
         
         self.setup_ui()
+        startup_profile.mark("main_window.setup_ui")
         self.setup_tray()
+        startup_profile.mark("main_window.setup_tray")
 
     def setup_tray(self):
         self.tray_icon = QSystemTrayIcon(self)
@@ -107,6 +114,11 @@ class MainWindow(QMainWindow):
             logo_container.addWidget(self.sync_label)
         
         sidebar_layout.addLayout(logo_container)
+
+        # Global search (notes, chapters, YouTube links)
+        self.search_box = GlobalSearchBox()
+        self.search_box.result_activated.connect(self.open_search_result)
+        sidebar_layout.addWidget(self.search_box)
         
         # Navigation Buttons
         self.nav_buttons = []
@@ -171,6 +183,12 @@ class MainWindow(QMainWindow):
         python = sys.executable
         os.execl(python, python, *sys.argv)
 
+    def open_search_result(self, result):
+        self.switch_tab(1)
+        # Notes matches open on the Notes tab, chapter matches on Chapters
+        tab = 1 if result['field'] == 'notes' else 0
+        self.planner_tab.open_subject_window(result['subject_id'], result['subject_name'], tab)
+
     def switch_tab(self, index):
         self.content_stack.setCurrentIndex(index)
         
@@ -193,21 +211,29 @@ class MainWindow(QMainWindow):
         elif index == 3: self.analytics_tab.refresh_data()
 
 def main():
+    startup_profile.mark("imports")
     init_db()
+    startup_profile.mark("init_db")
     create_app_sounds()
+    startup_profile.mark("create_app_sounds")
     
     app = QApplication(sys.argv)
+    app.stall_watchdog = stall_watchdog.install(app)
+    startup_profile.mark("QApplication")
     
     theme = get_theme()
     app.setStyleSheet(get_stylesheet(theme))
+    startup_profile.mark("stylesheet")
     
     # Check Auth
     auth = AuthManager()
     user = auth.get_current_user()
+    startup_profile.mark("auth")
     
     def start_main_app(user_obj):
         from student_app.database import sync_from_cloud, get_all_semesters, init_db
         init_db() # Ensure tables exist
+        startup_profile.mark("init_db (again)")
         
         is_offline = hasattr(user_obj, 'id') and user_obj.id == "local_user"
         
@@ -217,6 +243,7 @@ def main():
                 print("[Main] Cloud sync successful.")
             else:
                 print("[Main] Cloud sync failed or offline. Using local database.")
+            startup_profile.mark("sync")
         else:
             print("[Main] Working in OFFLINE mode.")
         
@@ -226,6 +253,7 @@ def main():
             diag.exec_()
             
         window = MainWindow(user=user_obj)
+        startup_profile.watch_first_paint(window)
         window.show()
         # Close login window if it exists
         if 'login_win' in globals():
@@ -238,6 +266,7 @@ def main():
     else:
         global login_win
         login_win = LoginWindow()
+        startup_profile.watch_first_paint(login_win)
         login_win.login_successful.connect(start_main_app)
         login_win.show()
         
@@ -0,0 +1,90 @@
+"""
+Versioned LRU cache in front of the database read helpers.
+
+Each table has a version counter. A cached result remembers the versions of
+the tables it was read from and is served only while they are unchanged.
+Write helpers bump the versions of the tables they touch after committing,
+so a read that raced a write is stored against the old version and never
+served as current.
+
+    @cached("chapters")
+    def get_chapters_by_subject(sub_id): ...
+
+    @invalidates("chapters")
+    def delete_chapter(cid): ...
+"""
+
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+MAX_ENTRIES = 256
+
+_versions = {}
+_entries = OrderedDict()
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+
+def bump(*tables):
+    with _lock:
+        for t in tables:
+            _versions[t] = _versions.get(t, 0) + 1
+
+
+def clear():
+    """Forget everything, e.g. after a bulk import or switching databases."""
+    with _lock:
+        for t in _versions:
+            _versions[t] += 1
+        _entries.clear()
+
+
+def cache_info():
+    with _lock:
+        return dict(_stats, size=len(_entries), max_entries=MAX_ENTRIES)
+
+
+def _stamp(tables):
+    return tuple(_versions.get(t, 0) for t in tables)
+
+
+def cached(*tables):
+    """Memoize a read helper whose result depends only on its args and `tables`."""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = (fn.__name__, args, tuple(sorted(kwargs.items())))
+            with _lock:
+                stamp = _stamp(tables)
+                entry = _entries.get(key)
+                if entry and entry[0] == stamp:
+                    _entries.move_to_end(key)
+                    _stats["hits"] += 1
+                    return list(entry[1]) if entry[2] else entry[1]
+                _stats["misses"] += 1
+            result = fn(*args, **kwargs)
+            # Lists are stored as tuples and copied out, so callers can't mutate the cache
+            is_list = isinstance(result, list)
+            with _lock:
+                _entries[key] = (stamp, tuple(result) if is_list else result, is_list)
+                _entries.move_to_end(key)
+                while len(_entries) > MAX_ENTRIES:
+                    _entries.popitem(last=False)
+            return result
+        wrapper.uncached = fn
+        return wrapper
+    return decorator
+
+
+def invalidates(*tables):
+    """Bump `tables` once the wrapped write helper returns (or raises)."""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                bump(*tables)
+        return wrapper
+    return decorator
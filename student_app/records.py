@@ -0,0 +1,65 @@
+"""
+Typed rows returned by the database read helpers.
+
+Each record's field order is its SELECT column list (see columns()), so rows
+are built straight from plain tuples and read by attribute, and a schema
+change can no longer silently shift positional indices in the UI.
+"""
+
+from typing import NamedTuple, Optional
+
+
+class Semester(NamedTuple):
+    id: int
+    name: str
+    cloud_id: Optional[int]
+
+
+class Subject(NamedTuple):
+    id: int
+    semester_id: Optional[int]
+    name: str
+    exam_date: Optional[str]
+    has_exercises: int
+    cloud_id: Optional[int]
+
+
+class Chapter(NamedTuple):
+    id: int
+    subject_id: int
+    name: str
+    video_completed: int
+    exercises_completed: int
+    is_completed: int
+    due_date: Optional[str]
+    cloud_id: Optional[int]
+    youtube_url: Optional[str]
+
+
+class TodoChapter(NamedTuple):
+    id: int
+    subject_id: int
+    name: str
+    video_completed: int
+    exercises_completed: int
+    youtube_url: Optional[str]
+    subject_name: str
+
+
+def columns(record, alias=None):
+    """SELECT list for `record`, optionally qualified: columns(Chapter, "c") -> "c.id, c.subject_id, ..." """
+    prefix = f"{alias}." if alias else ""
+    return ", ".join(prefix + f for f in record._fields)
+
+
+def fetch_all(conn, record, sql, params=()):
+    cur = conn.cursor()
+    cur.row_factory = None  # plain tuples, no sqlite3.Row wrapper per row
+    return list(map(record._make, cur.execute(sql, params)))
+
+
+def fetch_one(conn, record, sql, params=()):
+    cur = conn.cursor()
+    cur.row_factory = None
+    row = cur.execute(sql, params).fetchone()
+    return record._make(row) if row else None
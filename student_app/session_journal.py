@@ -0,0 +1,66 @@
+import time
+from student_app.database import get_db_connection
+
+CHECKPOINT_SECONDS = 15
+# Interrupted work sessions shorter than this are discarded instead of logged.
+MIN_RECOVER_SECONDS = 60
+
+
+class SessionJournal:
+    """Checkpoints the running Pomodoro work session to the session_journal table.
+
+    The journal is a single row updated in place, so a checkpoint is one small
+    UPDATE. Each write opens its own short-lived connection, like the helpers in
+    database.py, so no handle outlives it (reset_all_data deletes the file). If
+    the app crashes or the user logs out mid-session, the row survives and the
+    session is finalized on the next start.
+    """
+
+    def __init__(self, interval=CHECKPOINT_SECONDS):
+        self.interval = interval
+        self._last_checkpoint = None
+
+    def _write(self, sql, params=()):
+        conn = get_db_connection()
+        try:
+            with conn:
+                conn.execute(sql, params)
+        finally:
+            conn.close()
+
+    def begin(self, sub_id, mode, planned_seconds):
+        self._write(
+            "INSERT OR REPLACE INTO session_journal (id, subject_id, mode, planned_seconds, elapsed_seconds, started_at, updated_at) "
+            "VALUES (1, ?, ?, ?, 0, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)",
+            (sub_id, mode, int(planned_seconds))
+        )
+        self._last_checkpoint = time.monotonic()
+
+    @property
+    def is_active(self):
+        return self._last_checkpoint is not None
+
+    def checkpoint(self, elapsed_seconds, force=False):
+        """Record progress if the checkpoint interval has passed (or if forced)."""
+        if self._last_checkpoint is None: return False
+        if not force and time.monotonic() - self._last_checkpoint < self.interval: return False
+        self._write("UPDATE session_journal SET elapsed_seconds = ?, updated_at = CURRENT_TIMESTAMP WHERE id = 1",
+                    (float(elapsed_seconds),))
+        self._last_checkpoint = time.monotonic()
+        return True
+
+    def clear(self):
+        self._last_checkpoint = None
+        self._write("DELETE FROM session_journal")
+
+    def mark_finalized(self):
+        """Forget the session after complete_study_session() removed its row."""
+        self._last_checkpoint = None
+
+
+def get_interrupted_session():
+    conn = get_db_connection()
+    try:
+        return conn.execute("SELECT * FROM session_journal WHERE id = 1").fetchone()
+    finally:
+        conn.close()
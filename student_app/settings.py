@@ -50,6 +50,8 @@ def set_db_path(path):
     settings = load_settings()
     settings["db_path"] = path # Will be made relative in save_settings if in project root
     save_settings(settings)
+    from student_app import read_cache
+    read_cache.clear()
 
 def get_language():
     settings = load_settings()
@@ -92,3 +94,30 @@ def set_sync_mode(mode):
     settings = load_settings()
     settings["sync_mode"] = mode
     save_settings(settings)
+
+def get_sql_stats_enabled():
+    settings = load_settings()
+    return settings.get("sql_stats", False)
+
+def set_sql_stats_enabled(enabled):
+    settings = load_settings()
+    settings["sql_stats"] = enabled
+    save_settings(settings)
+
+def get_stall_watchdog_enabled():
+    settings = load_settings()
+    return settings.get("stall_watchdog", False)
+
+def set_stall_watchdog_enabled(enabled):
+    settings = load_settings()
+    settings["stall_watchdog"] = enabled
+    save_settings(settings)
+
+def get_profile_actions_enabled():
+    settings = load_settings()
+    return settings.get("profile_actions", False)
+
+def set_profile_actions_enabled(enabled):
+    settings = load_settings()
+    settings["profile_actions"] = enabled
+    save_settings(settings)
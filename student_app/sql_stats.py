@@ -0,0 +1,216 @@
+"""
+Per-statement SQL statistics and a slow-query log.
+
+When enabled, get_db_connection() hands out InstrumentedConnection objects.
+Their cursors time every execute/executemany plus the fetches that step the
+statement, and aggregate count, total/max latency and rows returned per SQL
+text. A trace callback also counts what the wrappers can't see: commits,
+executescript and nested statements run by triggers or FTS5. A statement slower than the
+threshold gets its EXPLAIN QUERY PLAN written to a rotating slow-query log.
+
+Enable with STUDENTPRO_SQL_STATS=1 or the "sql_stats" setting; the threshold
+comes from STUDENTPRO_SQL_SLOW_MS (default 50). When disabled, connections
+are plain sqlite3 connections and nothing here runs.
+
+    print(sql_stats.report(top=15))
+"""
+
+import atexit
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+
+from student_app.settings import get_app_data_dir, get_sql_stats_enabled
+
+SLOW_MS = float(os.getenv("STUDENTPRO_SQL_SLOW_MS", "50"))
+LOG_MAX_BYTES = 1 << 20
+LOG_BACKUPS = 3
+
+_env = os.getenv("STUDENTPRO_SQL_STATS", "").lower() in ("1", "true", "yes")
+enabled = _env or get_sql_stats_enabled()
+
+_stats = {}
+_lock = threading.Lock()
+_log = None
+_WS = re.compile(r"\s+")
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+def set_enabled(on):
+    """Takes effect for connections opened afterwards."""
+    global enabled
+    enabled = bool(on)
+
+
+def reset():
+    with _lock:
+        _stats.clear()
+
+
+def _key(sql):
+    return _WS.sub(" ", sql).strip()
+
+
+def _record(key, elapsed=0.0, rows=0, calls=1):
+    with _lock:
+        s = _stats.get(key)
+        if s is None:
+            s = _stats[key] = {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": 0}
+        s["count"] += calls
+        s["total_ms"] += elapsed * 1000
+        s["rows"] += rows
+        if elapsed * 1000 > s["max_ms"]:
+            s["max_ms"] = elapsed * 1000
+
+
+def snapshot():
+    """[(sql, stats)] sorted by total time, slowest first."""
+    with _lock:
+        items = [(k, dict(v)) for k, v in _stats.items()]
+    return sorted(items, key=lambda kv: kv[1]["total_ms"], reverse=True)
+
+
+def report(top=20):
+    lines = [f"{'count':>7} {'total ms':>10} {'max ms':>8} {'rows':>8}  statement"]
+    for sql, s in snapshot()[:top]:
+        lines.append(f"{s['count']:>7} {s['total_ms']:>10.2f} {s['max_ms']:>8.2f} {s['rows']:>8}  {sql[:120]}")
+    return "\n".join(lines)
+
+
+def slow_log_path():
+    return os.path.join(get_app_data_dir(), "slow_queries.log")
+
+
+def _slow_logger():
+    global _log
+    with _lock:
+        if _log is None:
+            _log = logging.getLogger("studentpro.sql")
+            _log.propagate = False
+            _log.setLevel(logging.INFO)
+            handler = RotatingFileHandler(slow_log_path(), maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            _log.addHandler(handler)
+        return _log
+
+
+def _log_slow(conn, sql, params, elapsed):
+    plan = []
+    try:
+        # A plain cursor, so the EXPLAIN itself isn't timed or traced
+        conn._tracing = False
+        plan = [row[-1] for row in sqlite3.Cursor(conn).execute("EXPLAIN QUERY PLAN " + sql, params)]
+    except sqlite3.Error:
+        pass
+    finally:
+        conn._tracing = True
+    _slow_logger().info("%.1f ms  %s\n    " + "\n    ".join(plan or ["(no plan)"]), elapsed * 1000, _key(sql))
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    _sql = None
+
+    def _begin(self, sql, params):
+        self._sql, self._params, self._elapsed, self._logged = sql, params, 0.0, False
+
+    def _account(self, elapsed, rows, calls=0):
+        self._elapsed += elapsed
+        _record(_key(self._sql), elapsed, rows, calls)
+        if not self._logged and self._elapsed * 1000 >= SLOW_MS and self._params is not None:
+            self._logged = True
+            _log_slow(self.connection, self._sql, self._params, self._elapsed)
+
+    def execute(self, sql, params=()):
+        self._begin(sql, params)
+        self.connection._active += 1
+        t0 = time.perf_counter()
+        try:
+            return super().execute(sql, params)
+        finally:
+            elapsed = time.perf_counter() - t0
+            self.connection._active -= 1
+            self._account(elapsed, 0, calls=1)
+
+    def executemany(self, sql, seq):
+        self._begin(sql, None)
+        counter = _Counter(seq)
+        self.connection._active += 1
+        t0 = time.perf_counter()
+        try:
+            return super().executemany(sql, counter)
+        finally:
+            elapsed = time.perf_counter() - t0
+            self.connection._active -= 1
+            _record(_key(sql), elapsed, 0, calls=counter.n)
+
+    def _fetch(self, fetch, *args):
+        if self._sql is None:
+            return fetch(*args)
+        t0 = time.perf_counter()
+        result = fetch(*args)
+        rows = (1 if result is not None else 0) if fetch.__name__ == "fetchone" else len(result)
+        self._account(time.perf_counter() - t0, rows)
+        return result
+
+    def fetchone(self): return self._fetch(super().fetchone)
+    def fetchall(self): return self._fetch(super().fetchall)
+    def fetchmany(self, size=None): return self._fetch(super().fetchmany, self.arraysize if size is None else size)
+
+    def __next__(self):
+        row = self.fetchone()
+        if row is None:
+            raise StopIteration
+        return row
+
+
+class _Counter:
+    def __init__(self, seq):
+        self._it, self.n = iter(seq), 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        item = next(self._it)
+        self.n += 1
+        return item
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._active = 0
+        self._tracing = True
+        self.set_trace_callback(self._trace)
+
+    def _trace(self, sql):
+        if not self._tracing:
+            return
+        if sql.startswith("--"):
+            # Nested statements (trigger bodies, FTS5 internals) arrive as "-- <sql>"
+            _record(_key(sql), calls=1)
+        elif not self._active:
+            _record(_LITERALS.sub("?", _key(sql)))
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql, seq):
+        return self.cursor().executemany(sql, seq)
+
+
+def connect(path):
+    return sqlite3.connect(path, factory=InstrumentedConnection)
+
+
+@atexit.register
+def _dump():
+    if _env and _stats:
+        print("[SQL] Statement statistics:\n" + report())
@@ -0,0 +1,145 @@
+"""
+GUI-thread stall watchdog.
+
+A QTimer on the GUI thread stamps a heartbeat every HEARTBEAT_MS. A daemon
+thread checks the stamp; while it is older than the threshold the event loop
+is stalled, and the thread samples the GUI thread's Python stack with
+sys._current_frames(). Samples are aggregated per stack, so the report shows
+which call sites the app was stuck in and for roughly how long.
+
+Enable with STUDENTPRO_STALL_WATCHDOG=1 or the "stall_watchdog" setting;
+STUDENTPRO_STALL_MS sets the threshold (default 200). Each stall is printed
+as it ends and the aggregated report is written to stall_report.txt in the
+app data dir on quit.
+"""
+
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+
+from PyQt5.QtCore import QObject, QTimer
+
+from student_app.settings import get_app_data_dir, get_stall_watchdog_enabled
+
+HEARTBEAT_MS = 50
+STALL_MS = float(os.getenv("STUDENTPRO_STALL_MS", "200"))
+MAX_DEPTH = 40
+MAX_EVENTS = 200
+
+_APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def enabled():
+    env = os.getenv("STUDENTPRO_STALL_WATCHDOG", "").lower()
+    return env in ("1", "true", "yes") or (env == "" and get_stall_watchdog_enabled())
+
+
+def _call_site(stack):
+    """Innermost frame in app code, else the innermost frame."""
+    for frame in reversed(stack):
+        if frame.filename.startswith(_APP_DIR) and not frame.filename.endswith("stall_watchdog.py"):
+            return frame
+    return stack[-1] if stack else None
+
+
+class StallWatchdog(QObject):
+    def __init__(self, parent=None, threshold_ms=STALL_MS):
+        super().__init__(parent)
+        self.threshold = threshold_ms / 1000
+        self.poll = max(0.01, self.threshold / 4)
+        self.stacks = {}  # stack -> [samples, seconds]
+        self.events = deque(maxlen=MAX_EVENTS)  # (started_at, duration_ms, call site)
+        self._gui_ident = threading.get_ident()
+        self._beat = time.monotonic()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self._heartbeat)
+        self._thread = threading.Thread(target=self._watch, name="stall-watchdog", daemon=True)
+
+    def start(self):
+        self._beat = time.monotonic()
+        self._timer.start(HEARTBEAT_MS)
+        self._thread.start()
+
+    def stop(self):
+        self._timer.stop()
+        self._stop.set()
+
+    def _heartbeat(self):
+        self._beat = time.monotonic()
+
+    def _sample(self):
+        frame = sys._current_frames().get(self._gui_ident)
+        if frame is None:
+            return None
+        stack = traceback.extract_stack(frame, limit=MAX_DEPTH)
+        key = tuple((f.filename, f.lineno, f.name) for f in stack)
+        with self._lock:
+            entry = self.stacks.setdefault(key, [0, 0.0])
+            entry[0] += 1
+            entry[1] += self.poll
+        return stack
+
+    def _watch(self):
+        stalled_since, site = None, None
+        while not self._stop.wait(self.poll):
+            beat = self._beat
+            if time.monotonic() - beat > self.threshold:
+                if stalled_since != beat:
+                    stalled_since, site = beat, None
+                stack = self._sample()
+                if site is None and stack:
+                    site = _call_site(stack)
+            elif stalled_since is not None:
+                self._end_stall(stalled_since, beat, site)
+                stalled_since = None
+
+    def _end_stall(self, since, resumed, site):
+        duration = (resumed - since) * 1000
+        where = f"{site.name} ({os.path.basename(site.filename)}:{site.lineno})" if site else "unknown"
+        with self._lock:
+            self.events.append((time.time() - (time.monotonic() - since), duration, where))
+        print(f"[Watchdog] GUI thread stalled {duration:.0f} ms in {where}")
+
+    def report(self, top=10):
+        with self._lock:
+            events = list(self.events)
+            stacks = sorted(self.stacks.items(), key=lambda kv: kv[1][0], reverse=True)[:top]
+        lines = [f"Stalls over {self.threshold * 1000:.0f} ms: {len(events)}, "
+                 f"total {sum(e[1] for e in events):.0f} ms, worst {max((e[1] for e in events), default=0):.0f} ms"]
+        by_site = {}
+        for _, duration, where in events:
+            n, total = by_site.get(where, (0, 0.0))
+            by_site[where] = (n + 1, total + duration)
+        for where, (n, total) in sorted(by_site.items(), key=lambda kv: kv[1][1], reverse=True):
+            lines.append(f"  {n:>4} x {total:>8.0f} ms  {where}")
+        for key, (samples, seconds) in stacks:
+            lines.append(f"\n{samples} samples (~{seconds * 1000:.0f} ms):")
+            lines.extend(line.rstrip() for line in traceback.format_list(
+                traceback.StackSummary.from_list([(f, l, n, None) for f, l, n in key])))
+        return "\n".join(lines)
+
+    def write_report(self, path=None):
+        path = path or os.path.join(get_app_data_dir(), "stall_report.txt")
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(self.report() + "\n")
+            print(f"[Watchdog] Stall report written to {path}")
+        except OSError as e:
+            print(f"[Watchdog] Could not write stall report: {e}")
+
+
+def install(app):
+    """Start a watchdog for `app` if enabled; returns it (or None)."""
+    if not enabled():
+        return None
+    watchdog = StallWatchdog(app)
+    watchdog.start()
+    app.aboutToQuit.connect(watchdog.stop)
+    app.aboutToQuit.connect(watchdog.write_report)
+    print(f"[Watchdog] Watching the GUI thread for stalls over {watchdog.threshold * 1000:.0f} ms")
+    return watchdog
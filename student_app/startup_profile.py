@@ -0,0 +1,128 @@
+"""
+Startup phase timings and per-module import times.
+
+run.py calls begin() before importing the app; main() then mark()s each
+phase (init_db, sounds, auth, sync, tabs, ...) and watch_first_paint() ends
+the profile once the first window has painted. Imports are timed by wrapping
+builtins.__import__ on the main thread, like `python -X importtime`:
+cumulative and self time for every module imported for the first time.
+
+Enable with STUDENTPRO_STARTUP_PROFILE=1 (report goes to startup_profile.json
+in the app data dir) or =<path>. STUDENTPRO_STARTUP_EXIT=1 quits right after
+the first frame, which is how benchmarks/bench_startup.py drives it.
+
+Everything here is a no-op unless begin() enabled it.
+"""
+
+import builtins
+import json
+import os
+import sys
+import threading
+import time
+
+_env = os.getenv("STUDENTPRO_STARTUP_PROFILE", "")
+active = False
+_t0 = None
+_wall0 = None
+_phases = []
+_imports = []
+_stack = []
+_main_ident = None
+_orig_import = builtins.__import__
+
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    if level or name in sys.modules or threading.get_ident() != _main_ident:
+        return _orig_import(name, globals, locals, fromlist, level)
+    t0 = time.perf_counter()
+    _stack.append(0.0)
+    try:
+        return _orig_import(name, globals, locals, fromlist, level)
+    finally:
+        elapsed = time.perf_counter() - t0
+        children = _stack.pop()
+        if _stack:
+            _stack[-1] += elapsed
+        _imports.append((name, elapsed * 1000, (elapsed - children) * 1000, len(_stack)))
+
+
+def begin():
+    """Start profiling if STUDENTPRO_STARTUP_PROFILE is set."""
+    global active, _t0, _wall0, _main_ident
+    if not _env or active:
+        return
+    active = True
+    _t0, _wall0 = time.perf_counter(), time.time()
+    _main_ident = threading.get_ident()
+    builtins.__import__ = _timed_import
+
+
+def mark(phase):
+    """Record that `phase` just finished."""
+    if active:
+        _phases.append((phase, (time.perf_counter() - _t0) * 1000))
+
+
+def _report_path():
+    if _env.lower() in ("1", "true", "yes"):
+        from student_app.settings import get_app_data_dir
+        return os.path.join(get_app_data_dir(), "startup_profile.json")
+    return _env
+
+
+def finish(top=15):
+    """Stop profiling, print a summary and write the JSON report."""
+    global active
+    if not active:
+        return None
+    mark("first_frame")
+    active = False
+    builtins.__import__ = _orig_import
+
+    phases, prev = [], 0.0
+    for name, at in _phases:
+        phases.append({"phase": name, "ms": round(at - prev, 2), "at_ms": round(at, 2)})
+        prev = at
+    imports = sorted(({"module": n, "cumulative_ms": round(c, 2), "self_ms": round(s, 2), "depth": d}
+                      for n, c, s, d in _imports), key=lambda r: r["self_ms"], reverse=True)
+    result = {"started_at": _wall0, "first_frame_ms": phases[-1]["at_ms"], "phases": phases,
+              "import_ms": round(sum(c for _, c, _, d in _imports if d == 0), 2), "imports": imports}
+
+    print(f"[Startup] First frame after {result['first_frame_ms']:.0f} ms")
+    for p in phases:
+        print(f"[Startup]   {p['phase']:<24} {p['ms']:>9.1f} ms")
+    print("[Startup] Slowest imports (self time):")
+    for r in imports[:top]:
+        print(f"[Startup]   {r['module']:<32} {r['self_ms']:>8.1f} ms  ({r['cumulative_ms']:.1f} cumulative)")
+    path = _report_path()
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    except OSError as e:
+        print(f"[Startup] Could not write {path}: {e}")
+    return result
+
+
+def watch_first_paint(widget):
+    """Finish the profile once `widget` has painted for the first time."""
+    if not active:
+        return
+    from PyQt5.QtCore import QEvent, QObject, QTimer
+    from PyQt5.QtWidgets import QApplication
+
+    class _FirstPaint(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Paint:
+                obj.removeEventFilter(self)
+                # Runs after the paint event has been handled
+                QTimer.singleShot(0, self._done)
+            return False
+
+        def _done(self):
+            finish()
+            if os.getenv("STUDENTPRO_STARTUP_EXIT"):
+                QApplication.instance().quit()
+
+    widget._first_paint_filter = _FirstPaint(widget)
+    widget.installEventFilter(widget._first_paint_filter)
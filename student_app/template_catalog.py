@@ -0,0 +1,196 @@
+"""
+Compiled catalog of semester templates shared by onboarding, the planner and
+the templates editor.
+
+The source (templates.txt if present, otherwise webversion/js/templates.js) is
+parsed once and written to a compact JSON cache in the app data directory. The
+cache is reused while the source's mtime and size are unchanged (or, if only
+the mtime moved, while its SHA-1 still matches). In-process, the compiled
+catalog is memoized and revalidated with a single os.stat().
+"""
+
+import hashlib
+import json
+import os
+import re
+import unicodedata
+from student_app.settings import get_app_root, get_app_data_dir
+from student_app.templates_js import parse_js_file
+
+CACHE_VERSION = 1
+_memo = {}
+
+
+def get_default_source():
+    root = get_app_root()
+    txt = os.path.join(root, "templates.txt")
+    if os.path.exists(txt):
+        return txt
+    return os.path.join(root, "webversion", "js", "templates.js")
+
+
+def parse_templates_txt(path):
+    """Parse the legacy '#'/'##'/'-' outline format used by templates.txt."""
+    templates = []
+    current_sem = None
+    current_sub = None
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("'"): continue
+
+            if line.startswith("##"):
+                if current_sem:
+                    current_sub = {'name': line[2:].strip(), 'chapters': []}
+                    current_sem['subjects'].append(current_sub)
+            elif line.startswith("#"):
+                current_sem = {'name': line[1:].strip(), 'subjects': []}
+                templates.append(current_sem)
+            elif line.startswith("-"):
+                if current_sub:
+                    current_sub['chapters'].append(line[1:].strip())
+            elif current_sub:
+                 current_sub['chapters'].append(line)
+    return templates
+
+
+def _slug(text):
+    ascii_text = unicodedata.normalize("NFKD", text or "").encode("ascii", "ignore").decode()
+    return re.sub(r"[^a-z0-9]+", "_", ascii_text.lower()).strip("_")
+
+
+def _make_ids(templates):
+    """Stable ids from year + ASCII part of the name, e.g. 'bac_sciences_experimentales'."""
+    ids, seen = [], set()
+    for i, t in enumerate(templates):
+        year = _slug(t.get("year", ""))
+        name = _slug(t.get("name", ""))
+        if year and name.startswith(year):
+            base = name
+        else:
+            base = "_".join(p for p in (year, name) if p) or f"template_{i + 1}"
+        tid, n = base, 2
+        while tid in seen:
+            tid = f"{base}_{n}"; n += 1
+        seen.add(tid)
+        ids.append(tid)
+    return ids
+
+
+class TemplateCatalog:
+    def __init__(self, source, templates, ids):
+        self.source = source
+        self.templates = templates
+        self.ids = ids
+        self.by_id = dict(zip(ids, templates))
+        self.by_name = {t.get("name"): t for t in templates}
+        self.by_year = {}
+        for t in templates:
+            self.by_year.setdefault(t.get("year"), []).append(t)
+
+    def __len__(self):
+        return len(self.templates)
+
+    def __iter__(self):
+        return iter(zip(self.ids, self.templates))
+
+    def get(self, template_id):
+        return self.by_id.get(template_id)
+
+    def for_year(self, year):
+        return self.by_year.get(year, [])
+
+    def years(self):
+        return [y for y in self.by_year if y]
+
+
+def _cache_path(source):
+    key = hashlib.sha1(os.path.abspath(source).encode("utf-8")).hexdigest()[:12]
+    cache_dir = os.path.join(get_app_data_dir(), "cache")
+    os.makedirs(cache_dir, exist_ok=True)
+    return os.path.join(cache_dir, f"templates_{key}.json")
+
+
+def _file_sha1(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _compile(source):
+    if source.endswith(".txt"):
+        return parse_templates_txt(source)
+    return parse_js_file(source)
+
+
+def _write_cache(path, payload):
+    tmp = path + ".tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"[Templates] Could not write catalog cache: {e}")
+
+
+def _load(source, st):
+    cache = _cache_path(source)
+    payload = None
+    try:
+        with open(cache, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+    except (OSError, ValueError):
+        pass
+
+    if payload and payload.get("version") == CACHE_VERSION:
+        if payload.get("mtime_ns") == st.st_mtime_ns and payload.get("size") == st.st_size:
+            return payload
+        sha1 = _file_sha1(source)
+        if payload.get("sha1") == sha1:
+            # Touched but unchanged: refresh the stat stamp only
+            payload["mtime_ns"], payload["size"] = st.st_mtime_ns, st.st_size
+            _write_cache(cache, payload)
+            return payload
+    else:
+        sha1 = _file_sha1(source)
+
+    templates = _compile(source)
+    payload = {
+        "version": CACHE_VERSION, "source": os.path.abspath(source),
+        "mtime_ns": st.st_mtime_ns, "size": st.st_size, "sha1": sha1,
+        "ids": _make_ids(templates), "templates": templates,
+    }
+    _write_cache(cache, payload)
+    return payload
+
+
+def load_catalog(source=None):
+    """Return the compiled catalog for `source` (default: the app's templates)."""
+    source = source or get_default_source()
+    try:
+        st = os.stat(source)
+    except OSError:
+        return TemplateCatalog(source, [], [])
+    stamp = (st.st_mtime_ns, st.st_size)
+    memo = _memo.get(source)
+    if memo and memo[0] == stamp:
+        return memo[1]
+    try:
+        payload = _load(source, st)
+    except Exception as e:
+        print(f"[Templates] Could not load {source}: {e}")
+        return TemplateCatalog(source, [], [])
+    catalog = TemplateCatalog(source, payload["templates"], payload["ids"])
+    _memo[source] = (stamp, catalog)
+    return catalog
+
+
+def load_templates(source):
+    """Fresh, caller-owned copy of the template list (for editors that mutate it).
+
+    Parse errors propagate so the caller can report them.
+    """
+    st = os.stat(source)
+    return _load(source, st)["templates"]
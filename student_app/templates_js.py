@@ -0,0 +1,390 @@
+"""
+Reader and writer for webversion/js/templates.js.
+
+The file is a JS object literal (`const TEMPLATES = [...]`) with unquoted keys,
+single- or double-quoted strings, comments and trailing commas. It is parsed in
+one pass: a tokenizer streams tokens to an iterative state machine that keeps
+open arrays and objects on an explicit stack and builds the Python tree
+directly, so cost is linear in file size, nesting depth is not bounded by the
+recursion limit, and keys or comment markers inside strings are never misread.
+
+The writer streams the file out chunk by chunk through a buffered temp file
+that atomically replaces the target, in the editor's pretty layout or as a
+minified bundle.
+"""
+
+import json
+import os
+import re
+import shutil
+import tempfile
+
+__all__ = ["TemplatesParseError", "parse_js", "parse_js_file", "write_js", "write_js_file"]
+
+WRITE_BUFFER = 1 << 16
+
+
+class TemplatesParseError(ValueError):
+    """Syntax error with a 1-based line/column pointing into the source."""
+
+    def __init__(self, message, text, pos):
+        self.pos = pos
+        self.line = text.count("\n", 0, pos) + 1
+        self.column = pos - text.rfind("\n", 0, pos)
+        self.message = message
+        super().__init__(f"line {self.line}, column {self.column}: {message}")
+
+
+# One match per significant token; leading whitespace is absorbed by the same
+# match so the scan stays a single left-to-right pass in the regex engine.
+_SCAN_RE = re.compile(r"""
+    [ \t\r\n\ufeff\u00a0\u2028\u2029]*
+    (?:
+        ("[^"\\\n]*(?:\\.[^"\\\n]*)*"|'[^'\\\n]*(?:\\.[^'\\\n]*)*')        # 1 string
+      | ([{}\[\]:,;=])                                                     # 2 punctuation
+      | ([A-Za-z_$][\w$]*)                                                 # 3 identifier
+      | (//[^\n]*|/\*.*?\*/)                                               # 4 comment
+      | ([-+]?(?:0[xX][0-9a-fA-F]+|(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?))  # 5 number
+      | (.)                                                                # 6 invalid
+      | \Z                                                                 # end of input
+    )
+""", re.VERBOSE | re.DOTALL)
+_STR, _PUNCT, _IDENT, _COMMENT, _NUM, _BAD = range(1, 7)
+
+_ESCAPES = {
+    "n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f", "v": "\v",
+    "0": "\0", "\n": "", "\u2028": "", "\u2029": "",
+}
+_KEYWORDS = {"true": True, "false": False, "null": None}
+
+
+_KIND_NAMES = {_STR: "str", _PUNCT: "punct", _IDENT: "ident", _NUM: "num", _BAD: "invalid"}
+
+
+def _decode_number(raw):
+    sign = -1 if raw[0] == "-" else 1
+    body = raw.lstrip("+-")
+    if body[:2] in ("0x", "0X"):
+        return sign * int(body, 16)
+    if "." in body or "e" in body or "E" in body:
+        return sign * float(body)
+    return sign * int(body)
+
+
+def _decode_string(raw, text, pos):
+    body = raw[1:-1]
+    if "\\" not in body:
+        return body
+    out = []
+    i, n = 0, len(body)
+    while i < n:
+        j = body.find("\\", i)
+        if j < 0:
+            out.append(body[i:])
+            break
+        out.append(body[i:j])
+        c = body[j + 1]
+        i = j + 2
+        if c == "x":
+            out.append(chr(_hex(body[i:i + 2], 2, text, pos + 1 + j)))
+            i += 2
+        elif c == "u":
+            if body[i:i + 1] == "{":
+                close = body.find("}", i)
+                if close < 0:
+                    raise TemplatesParseError("bad \\u{...} escape", text, pos + 1 + j)
+                code = _hex(body[i + 1:close], None, text, pos + 1 + j)
+                i = close + 1
+            else:
+                code = _hex(body[i:i + 4], 4, text, pos + 1 + j)
+                i += 4
+                # Re-join UTF-16 surrogate pairs written as two \u escapes
+                if 0xD800 <= code < 0xDC00 and body[i:i + 2] == "\\u":
+                    low = _hex(body[i + 2:i + 6], 4, text, pos + 1 + i)
+                    if 0xDC00 <= low < 0xE000:
+                        code = 0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00)
+                        i += 6
+            out.append(chr(code))
+        elif c == "\r":
+            if body[i:i + 1] == "\n":
+                i += 1
+        else:
+            out.append(_ESCAPES.get(c, c))
+    return "".join(out)
+
+
+def _hex(digits, width, text, pos):
+    if (width and len(digits) != width) or not digits:
+        raise TemplatesParseError("bad hex escape", text, pos)
+    try:
+        return int(digits, 16)
+    except ValueError:
+        raise TemplatesParseError("bad hex escape", text, pos) from None
+
+
+# Parser states
+_START, _DECL_NAME, _DECL_EQ, _VALUE, _KEY, _COLON, _NEXT, _END = range(8)
+
+
+def _describe(m):
+    kind = m.lastindex
+    if kind is None:
+        return "end of file"
+    raw = m.group(kind)
+    if kind == _BAD:
+        if raw in "\"'":
+            return "unterminated string"
+        if raw == "`":
+            return "template literal (not supported)"
+        if raw == "/" and m.string.startswith("/*", m.start(kind)):
+            return "unterminated block comment"
+        return f"unexpected character {raw!r}"
+    return f"{_KIND_NAMES[kind]} {raw!r}" if kind != _PUNCT else repr(raw)
+
+
+def _fail(m, expected):
+    kind = m.lastindex
+    pos = m.start(kind) if kind else m.end()
+    found = _describe(m)
+    message = found if kind == _BAD else f"expected {expected}, found {found}"
+    raise TemplatesParseError(message, m.string, pos)
+
+
+def parse_js(text):
+    """Parse the text of a templates.js file into Python lists/dicts.
+
+    Accepts an optional `const|let|var NAME =` prefix and trailing `;`.
+    Raises TemplatesParseError with the line/column of the first bad token.
+    """
+    stack = []          # open containers, innermost last
+    keys = []           # pending object key saved when a nested container opens
+    container = None
+    in_list = False
+    key = None
+    root = None
+    state = _START
+    for m in _SCAN_RE.finditer(text):
+        kind = m.lastindex
+        if kind == _COMMENT:
+            continue
+        if kind is None:
+            if state == _END:
+                return root
+            _fail(m, "a value" if state in (_START, _VALUE) else "',' or closing bracket")
+
+        if state == _NEXT:
+            if kind == _PUNCT:
+                p = m.group(2)
+                if p == ",":
+                    state = _VALUE if in_list else _KEY
+                    continue
+                if p == ("]" if in_list else "}"):
+                    value = stack.pop()
+                    key = keys.pop()
+                    container = stack[-1] if stack else None
+                    in_list = container.__class__ is list
+                else:
+                    _fail(m, "',' or ']'" if in_list else "',' or '}'")
+            else:
+                _fail(m, "',' or ']'" if in_list else "',' or '}'")
+
+        elif state == _KEY:
+            if kind == _IDENT or kind == _NUM:
+                key = m.group(kind)
+                state = _COLON
+                continue
+            if kind == _STR:
+                raw = m.group(1)
+                key = raw[1:-1] if "\\" not in raw else _decode_string(raw, text, m.start(1))
+                state = _COLON
+                continue
+            if kind == _PUNCT and m.group(2) == "}":
+                value = stack.pop()
+                key = keys.pop()
+                container = stack[-1] if stack else None
+                in_list = container.__class__ is list
+            else:
+                _fail(m, "property name")
+
+        elif state == _COLON:
+            if kind == _PUNCT and m.group(2) == ":":
+                state = _VALUE
+                continue
+            _fail(m, "':'")
+
+        elif state == _VALUE or state == _START:
+            if kind == _STR:
+                raw = m.group(1)
+                value = raw[1:-1] if "\\" not in raw else _decode_string(raw, text, m.start(1))
+            elif kind == _PUNCT:
+                p = m.group(2)
+                if p == "{" or p == "[":
+                    keys.append(key)
+                    container = {} if p == "{" else []
+                    stack.append(container)
+                    in_list = p == "["
+                    state = _VALUE if in_list else _KEY
+                    continue
+                if p == "]" and in_list and state == _VALUE:
+                    # empty array or trailing comma
+                    value = stack.pop()
+                    key = keys.pop()
+                    container = stack[-1] if stack else None
+                    in_list = container.__class__ is list
+                else:
+                    _fail(m, "a value")
+            elif kind == _NUM:
+                value = _decode_number(m.group(5))
+            elif kind == _IDENT:
+                word = m.group(3)
+                if word in _KEYWORDS:
+                    value = _KEYWORDS[word]
+                elif state == _START and word in ("const", "let", "var"):
+                    state = _DECL_NAME
+                    continue
+                else:
+                    _fail(m, "a value")
+            else:
+                _fail(m, "a value")
+
+        elif state == _DECL_NAME:
+            if kind != _IDENT:
+                _fail(m, "variable name")
+            state = _DECL_EQ
+            continue
+
+        elif state == _DECL_EQ:
+            if kind == _PUNCT and m.group(2) == "=":
+                state = _VALUE
+                continue
+            _fail(m, "'='")
+
+        else:  # _END
+            if kind == _PUNCT and m.group(2) == ";":
+                continue
+            _fail(m, "end of file")
+
+        # A complete value was produced: attach it to its parent.
+        if container is None:
+            root = value
+            state = _END
+        elif in_list:
+            container.append(value)
+            state = _NEXT
+        else:
+            container[key] = value
+            state = _NEXT
+
+
+def parse_js_file(filepath):
+    with open(filepath, "r", encoding="utf-8") as f:
+        return parse_js(f.read())
+
+
+# ── Writer ──────────────────────────────────
+
+def _js_str(value):
+    # JSON string syntax is valid JS; U+2028/2029 are escaped for pre-ES2019 engines
+    return json.dumps(value, ensure_ascii=False).replace("\u2028", "\\u2028").replace("\u2029", "\\u2029")
+
+
+def _chapter_js(ch, minify):
+    if not isinstance(ch, dict):
+        return _js_str(ch)
+    sp = "" if minify else " "
+    parts = [f"name:{sp}{_js_str(ch['name'])}"]
+    if ch.get("url"):
+        parts.append(f"url:{sp}{_js_str(ch['url'])}")
+    if ch.get("resources"):
+        res = [
+            f"{{{sp}type:{sp}{_js_str(r.get('type', ''))},{sp}url:{sp}{_js_str(r.get('url', ''))},"
+            f"{sp}label:{sp}{_js_str(r.get('label', ''))}{sp}}}"
+            for r in ch["resources"]
+        ]
+        parts.append(f"resources:{sp}[{(',' + sp).join(res)}]")
+    return f"{{{sp}{(',' + sp).join(parts)}{sp}}}"
+
+
+def _iter_pretty(templates):
+    yield "const TEMPLATES = [\n"
+    seen_years = set()
+    last = len(templates) - 1
+    for i, tmpl in enumerate(templates):
+        # Year comment header at first occurrence (none for templates without a year)
+        year = tmpl.get("year", "")
+        if year not in seen_years:
+            seen_years.add(year)
+            if year:
+                yield f"    // ==================== {str(year).upper()} ====================\n"
+        yield "    {\n"
+        yield f"        year: {_js_str(year)},\n"
+        yield f"        name: {_js_str(tmpl.get('name', ''))},\n"
+        yield "        subjects: [\n"
+        subjects = tmpl.get("subjects", [])
+        for si, subj in enumerate(subjects):
+            yield "            { \n"
+            yield f"                name: {_js_str(subj.get('name', ''))}, \n"
+            if subj.get("has_exercises") is False:
+                yield "                has_exercises: false,\n"
+            yield "                chapters: [\n"
+            chapters = subj.get("chapters", [])
+            for ci, ch in enumerate(chapters):
+                yield f"                    {_chapter_js(ch, False)}{',' if ci < len(chapters) - 1 else ''}\n"
+            yield "                ] \n"
+            yield f"            }}{',' if si < len(subjects) - 1 else ''}\n"
+        yield "        ]\n"
+        yield f"    }}{',' if i < last else ''}\n"
+    yield "];\n"
+
+
+def _iter_minified(templates):
+    yield "const TEMPLATES=["
+    for i, tmpl in enumerate(templates):
+        subjects = []
+        for subj in tmpl.get("subjects", []):
+            ex = "has_exercises:false," if subj.get("has_exercises") is False else ""
+            chapters = ",".join(_chapter_js(ch, True) for ch in subj.get("chapters", []))
+            subjects.append(f"{{name:{_js_str(subj.get('name', ''))},{ex}chapters:[{chapters}]}}")
+        yield (f"{',' if i else ''}{{year:{_js_str(tmpl.get('year', ''))},"
+               f"name:{_js_str(tmpl.get('name', ''))},subjects:[{','.join(subjects)}]}}")
+    yield "];\n"
+
+
+def write_js(templates, out, minify=False):
+    """Stream `templates` as JS source to the text stream `out`."""
+    # Chunks are batched so the stream sees a few large writes, not thousands of tiny ones
+    pending, size = [], 0
+    for chunk in (_iter_minified if minify else _iter_pretty)(templates):
+        pending.append(chunk)
+        size += len(chunk)
+        if size >= WRITE_BUFFER:
+            out.write("".join(pending))
+            pending, size = [], 0
+    out.write("".join(pending))
+
+
+def write_js_file(filepath, templates, minify=False):
+    """Write `templates` to `filepath` atomically.
+
+    Output goes to a buffered temp file in the same directory which replaces
+    the target only once fully written and synced, so a crash mid-write
+    leaves the previous file intact.
+    """
+    directory = os.path.dirname(os.path.abspath(filepath))
+    fd, tmp = tempfile.mkstemp(prefix=".templates-", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", buffering=WRITE_BUFFER) as f:
+            write_js(templates, f, minify)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(filepath):
+            shutil.copymode(filepath, tmp)
+        else:
+            os.chmod(tmp, 0o644)
+        os.replace(tmp, filepath)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
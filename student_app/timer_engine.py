@@ -0,0 +1,102 @@
+import math
+import sys
+import time
+
+# Repaint at least this often while the timer is hidden so completion still fires.
+HIDDEN_TICK_SECONDS = 30.0
+MIN_TICK_MS = 20
+
+
+def _suspend_aware_clock():
+    """Monotonic clock that keeps counting while the system is suspended.
+
+    time.monotonic() stops during sleep on Linux and macOS, so use
+    CLOCK_BOOTTIME (Linux) or CLOCK_MONOTONIC (macOS, which includes sleep)
+    there. Windows' monotonic clock already includes sleep. The wall clock is
+    never consulted, so NTP steps, DST or a user changing the time don't move
+    a running session.
+    """
+    if sys.platform.startswith("linux"):
+        clock_id = getattr(time, "CLOCK_BOOTTIME", None)
+    elif sys.platform == "darwin":
+        clock_id = getattr(time, "CLOCK_MONOTONIC", None)
+    else:
+        clock_id = None
+    if clock_id is not None:
+        try:
+            time.clock_gettime(clock_id)
+            return lambda: time.clock_gettime(clock_id)
+        except OSError:
+            pass
+    return time.monotonic
+
+
+class MonotonicTimer:
+    """Countdown driven by monotonic clock deadlines instead of tick counting.
+
+    Remaining time is always derived from clock progress, so delayed or
+    skipped ticks (GUI stalls, blocking sync calls) never stretch a session,
+    and time spent suspended counts toward it.
+    """
+
+    def __init__(self, duration=0, clock=None):
+        self._clock = clock or _suspend_aware_clock()
+        self._duration = float(duration)
+        self._elapsed = 0.0          # time banked before the current run
+        self._started_at = None      # clock reading at the start of the current run
+
+    @property
+    def duration(self):
+        return self._duration
+
+    @property
+    def is_running(self):
+        return self._started_at is not None
+
+    def reset(self, duration):
+        self._duration = float(duration)
+        self._elapsed = 0.0
+        self._started_at = None
+
+    def start(self):
+        if self.is_running: return
+        self._started_at = self._clock()
+
+    def pause(self):
+        if not self.is_running: return
+        self._elapsed = self._current_elapsed()
+        self._started_at = None
+
+    def _current_elapsed(self):
+        if not self.is_running:
+            return self._elapsed
+        return self._elapsed + (self._clock() - self._started_at)
+
+    def elapsed(self):
+        return min(self._duration, self._current_elapsed())
+
+    def remaining(self):
+        return max(0.0, self._duration - self._current_elapsed())
+
+    def seconds_left(self):
+        """Whole seconds to display (ceil, so a fresh 25 min timer shows 25:00)."""
+        return int(math.ceil(self.remaining()))
+
+    def progress(self):
+        if self._duration <= 0: return 1.0
+        return self.elapsed() / self._duration
+
+    def is_finished(self):
+        return self.remaining() <= 0
+
+    def next_tick_ms(self, visible=True):
+        """Delay until the display next changes, or a coarse poll when hidden."""
+        remaining = self.remaining()
+        if remaining <= 0:
+            return 0
+        if visible:
+            delay = remaining - math.floor(remaining)
+            if delay < 0.001: delay = 1.0
+        else:
+            delay = min(remaining, HIDDEN_TICK_SECONDS)
+        return max(MIN_TICK_MS, int(delay * 1000) + 1)
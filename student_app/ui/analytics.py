@@ -12,6 +12,7 @@ from student_app.database import (
 from student_app.settings import get_theme, get_language
 from student_app.ui.styles import PALETTE
 from student_app.ui.translations import TRANSLATIONS
+from student_app.action_profiler import profile_actions
 
 class AnalyticsCard(QFrame):
     def __init__(self, title):
@@ -111,6 +112,7 @@ class ModernBarChart(QWidget):
             label_rect = QRectF(x - spacing/2, self.height() - margin_y + 10, bar_width + spacing, 40)
             painter.drawText(label_rect, Qt.AlignHCenter | Qt.AlignTop | Qt.TextWordWrap, label)
 
+@profile_actions
 class Analytics(QWidget):
     def __init__(self):
         super().__init__()
@@ -270,6 +272,6 @@ class Analytics(QWidget):
         self.sem_selector.blockSignals(True)
         self.sem_selector.clear()
         for s in get_all_semesters():
-            self.sem_selector.addItem(s['name'], s['id'])
+            self.sem_selector.addItem(s.name, s.id)
         self.sem_selector.blockSignals(False)
         self.refresh_data()
\ No newline at end of file
@@ -14,6 +14,7 @@ from student_app.database import (
 )
 from student_app.settings import get_language
 from student_app.ui.translations import TRANSLATIONS
+from student_app.action_profiler import profile_actions
 
 class StatCard(QFrame):
     def __init__(self, title, value, subtitle="", icon=""):
@@ -41,6 +42,7 @@ class StatCard(QFrame):
     def update_value(self, value):
         self.v_label.setText(str(value))
 
+@profile_actions
 class Dashboard(QWidget):
     start_challenge_requested = pyqtSignal()
 
@@ -177,12 +179,9 @@ class Dashboard(QWidget):
             self.todo_layout.addWidget(QLabel("🎉 No tasks left! Take a break."))
         else:
             for item in todos[:5]: # Show top 5
-                # Handle both dict and sqlite3.Row
-                # chapters table: id(0), subject_id(1), name(2), video_completed(3), exercises_completed(4), is_completed(5), due_date(6), cloud_id(7), youtube_url(8)
-                # JOIN adds: subject_name at index 9
-                item_name = item['name'] if isinstance(item, dict) else item[2]  # name is column index 2
-                item_subject = item['subject_name'] if isinstance(item, dict) else item[9]  # subject_name from JOIN at index 9
-                item_video = item['video_completed'] if isinstance(item, dict) else item[3]  # video_completed is column index 3
+                item_name = item.name
+                item_subject = item.subject_name
+                item_video = item.video_completed
                 
                 frame = QFrame()
                 frame.setObjectName("card")
@@ -0,0 +1,131 @@
+import html
+from PyQt5.QtWidgets import (
+    QWidget, QVBoxLayout, QLineEdit, QListWidget, QListWidgetItem, QLabel,
+    QFrame, QAbstractItemView
+)
+from PyQt5.QtCore import Qt, pyqtSignal, QTimer, QEvent, QPoint, QSize
+from student_app.database import search_content
+from student_app.settings import get_language
+from student_app.ui.translations import TRANSLATIONS
+
+SEARCH_DEBOUNCE_MS = 150
+POPUP_WIDTH = 420
+POPUP_MAX_ROWS = 8
+
+
+class GlobalSearchBox(QWidget):
+    """Sidebar search over subject names, notes, chapter names and YouTube links.
+
+    Results come ranked from the FTS index (database.search_content) and are
+    shown in a popup under the line edit; Up/Down/Enter work from the line
+    edit so focus never has to leave it.
+    """
+    result_activated = pyqtSignal(dict)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.texts = TRANSLATIONS.get(get_language(), TRANSLATIONS["English"])
+        self.results = []
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(5, 0, 5, 10)
+        self.input = QLineEdit()
+        self.input.setPlaceholderText(self.texts.get("search_placeholder", "🔍 Search notes & chapters"))
+        self.input.setClearButtonEnabled(True)
+        self.input.installEventFilter(self)
+        layout.addWidget(self.input)
+
+        self.popup = QListWidget()
+        self.popup.setWindowFlags(Qt.Tool | Qt.FramelessWindowHint | Qt.WindowDoesNotAcceptFocus)
+        self.popup.setAttribute(Qt.WA_ShowWithoutActivating)
+        self.popup.setFocusPolicy(Qt.NoFocus)
+        self.popup.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.popup.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.popup.setFrameShape(QFrame.StyledPanel)
+        self.popup.itemClicked.connect(self._activate_item)
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self._timer.timeout.connect(self.run_search)
+        self.input.textChanged.connect(self._timer.start)
+        self.input.returnPressed.connect(self._activate_current)
+
+    def run_search(self):
+        query = self.input.text().strip()
+        self.results = search_content(query) if query else []
+        self.popup.clear()
+        if not query:
+            self.popup.hide()
+            return
+        if not self.results:
+            item = QListWidgetItem(self.texts.get("no_results", "No results"))
+            item.setFlags(Qt.NoItemFlags)
+            self.popup.addItem(item)
+        for r in self.results:
+            item = QListWidgetItem()
+            item.setData(Qt.UserRole, r)
+            label = QLabel(self._render(r))
+            label.setTextFormat(Qt.RichText)
+            label.setWordWrap(True)
+            label.setContentsMargins(8, 4, 8, 4)
+            label.setAttribute(Qt.WA_TransparentForMouseEvents)
+            label.setFixedWidth(POPUP_WIDTH - 24)
+            item.setSizeHint(QSize(POPUP_WIDTH - 24, label.heightForWidth(POPUP_WIDTH - 24)))
+            self.popup.addItem(item)
+            self.popup.setItemWidget(item, label)
+        if self.results:
+            self.popup.setCurrentRow(0)
+        self._show_popup()
+
+    def _render(self, r):
+        icon = "📘" if r['kind'] == 'subject' else "🎬"
+        context = "" if r['kind'] == 'subject' else f" <span style='color:#94a3b8;'>· {html.escape(r['subject_name'] or '')}</span>"
+        snippet = f"<br><span style='font-size:11px; color:#64748b;'>{r['snippet']}</span>" if r['snippet'] else ""
+        return f"{icon} {r['title']}{context}{snippet}"
+
+    def _show_popup(self):
+        rows = min(self.popup.count(), POPUP_MAX_ROWS)
+        height = sum(self.popup.sizeHintForRow(i) for i in range(rows)) + 2 * self.popup.frameWidth()
+        self.popup.setFixedSize(POPUP_WIDTH, max(height, 30))
+        self.popup.move(self.input.mapToGlobal(QPoint(0, self.input.height() + 2)))
+        self.popup.show()
+        self.popup.raise_()
+
+    def _activate_item(self, item):
+        r = item.data(Qt.UserRole)
+        if not r: return
+        self.popup.hide()
+        self.input.clear()
+        self.result_activated.emit(r)
+
+    def _activate_current(self):
+        if self._timer.isActive():
+            self._timer.stop()
+            self.run_search()
+        item = self.popup.currentItem()
+        if item and self.popup.isVisible():
+            self._activate_item(item)
+
+    def eventFilter(self, obj, event):
+        if obj is self.input:
+            if event.type() == QEvent.KeyPress and self.popup.isVisible():
+                key = event.key()
+                if key in (Qt.Key_Down, Qt.Key_Up) and self.results:
+                    step = 1 if key == Qt.Key_Down else -1
+                    row = (self.popup.currentRow() + step) % len(self.results)
+                    self.popup.setCurrentRow(row)
+                    return True
+                if key == Qt.Key_Escape:
+                    self.popup.hide()
+                    return True
+            elif event.type() == QEvent.FocusOut:
+                # Delay so a click on the popup is delivered before it hides
+                QTimer.singleShot(150, self._hide_if_unfocused)
+            elif event.type() == QEvent.FocusIn and self.input.text().strip():
+                self._timer.start()
+        return super().eventFilter(obj, event)
+
+    def _hide_if_unfocused(self):
+        if not self.input.hasFocus():
+            self.popup.hide()
@@ -6,7 +6,9 @@ from PyQt5.QtCore import Qt
 from student_app.database import get_supabase, get_uid
 from student_app.settings import get_language
 from student_app.ui.translations import TRANSLATIONS
+from student_app.action_profiler import profile_actions
 
+@profile_actions
 class LeaderboardTab(QWidget):
     def __init__(self):
         super().__init__()
@@ -0,0 +1,121 @@
+import hashlib
+from PyQt5.QtWidgets import QApplication, QMessageBox
+from PyQt5.QtCore import QObject, QTimer, QEvent, pyqtSignal
+from student_app.database import update_subject_notes, load_subject_notes, get_subject_notes_rev, NotesConflict
+
+AUTOSAVE_DELAY_MS = 1000
+
+
+def _digest(text):
+    return hashlib.sha1(text.encode("utf-8")).digest()
+
+
+class NotesAutosaver(QObject):
+    """Keeps a QTextEdit and a subject's stored notes in step.
+
+    Edits are written after the user pauses typing, and only when the content
+    hash differs from what was last loaded or saved. Reloads compare the stored
+    notes revision first, so the notes body is only read and re-set when another
+    editor actually changed it. Saves carry the revision they were based on; if
+    another editor saved in between, the user picks which version to keep.
+    """
+    saved = pyqtSignal(int)
+
+    def __init__(self, editor, delay=AUTOSAVE_DELAY_MS):
+        super().__init__(editor)
+        self.editor = editor
+        self.subject_id = None
+        self.rev = None
+        self._hash = None
+        self._resolving = False
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay)
+        self._timer.timeout.connect(self.flush)
+        editor.textChanged.connect(self._on_text_changed)
+        editor.installEventFilter(self)
+        app = QApplication.instance()
+        if app: app.aboutToQuit.connect(self.flush)
+
+    @property
+    def pending(self):
+        return self._timer.isActive()
+
+    def load(self, subject_id):
+        """Show `subject_id`'s notes; a no-op if they are already current."""
+        if subject_id != self.subject_id:
+            self.flush()
+            self.subject_id = subject_id
+            self.rev = None
+        if subject_id is None:
+            self._set_text("")
+            return
+        if self.rev is not None:
+            if self.pending or get_subject_notes_rev(subject_id) == self.rev:
+                return
+        text, self.rev = load_subject_notes(subject_id)
+        self._set_text(text)
+
+    def flush(self):
+        """Write pending edits now. Returns True if anything was stored."""
+        self._timer.stop()
+        if self.subject_id is None or self._resolving: return False
+        text = self.editor.toPlainText()
+        digest = _digest(text)
+        if digest == self._hash: return False
+        try:
+            self.rev = update_subject_notes(self.subject_id, text, self.rev)
+        except NotesConflict as e:
+            return self._resolve_conflict(e.rev)
+        except Exception as e:
+            print(f"[Notes] Autosave failed: {e}")
+            return False
+        self._hash = digest
+        self.saved.emit(self.rev)
+        return True
+
+    def _resolve_conflict(self, stored_rev):
+        print(f"[Notes] Subject {self.subject_id} notes were saved elsewhere (revision {stored_rev}, editing {self.rev})")
+        # Focus changes while the dialog is up must not start another save
+        self._resolving = True
+        try:
+            answer = QMessageBox.question(
+                self.editor.window(), "Notes Changed",
+                "These notes were changed in another window since you opened them.\n\n"
+                "Keep your version? Choosing No loads the other version.",
+                QMessageBox.Yes | QMessageBox.No)
+        finally:
+            self._resolving = False
+        if answer == QMessageBox.Yes:
+            self.rev = stored_rev
+            return self.flush()
+        self.rev = None
+        self.load(self.subject_id)
+        return False
+
+    def reset(self):
+        """Drop pending edits and detach, e.g. before the subject is deleted."""
+        self._timer.stop()
+        self.subject_id = self.rev = None
+        self._set_text("")
+
+    def _set_text(self, text):
+        self._timer.stop()
+        self.editor.blockSignals(True)
+        self.editor.setPlainText(text)
+        self.editor.blockSignals(False)
+        self._hash = _digest(text)
+
+    def _on_text_changed(self):
+        if self.subject_id is not None:
+            self._timer.start()
+
+    def eventFilter(self, obj, event):
+        if obj is self.editor:
+            if event.type() == QEvent.FocusIn:
+                # Pick up edits made in another window since we last looked
+                self.load(self.subject_id)
+            elif event.type() == QEvent.FocusOut:
+                self.flush()
+        return super().eventFilter(obj, event)
@@ -1,51 +1,20 @@
-import os
 from PyQt5.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, 
     QListWidget, QListWidgetItem, QFrame, QLineEdit
 )
 from PyQt5.QtCore import Qt
 from student_app.database import apply_template, get_uid, get_supabase
-from student_app.settings import get_language, get_app_root
+from student_app.settings import get_language
+from student_app.template_catalog import load_catalog
 from student_app.ui.translations import TRANSLATIONS
 
-def parse_templates():
-    templates = []
-    current_sem = None
-    current_sub = None
-    
-    try:
-        path = os.path.join(get_app_root(), "templates.txt")
-        if not os.path.exists(path): return []
-        
-        with open(path, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                if not line or line.startswith("'"): continue
-                
-                if line.startswith("##"):
-                    if current_sem:
-                        current_sub = {'name': line[2:].strip(), 'chapters': []}
-                        current_sem['subjects'].append(current_sub)
-                elif line.startswith("#"):
-                    current_sem = {'name': line[1:].strip(), 'subjects': []}
-                    templates.append(current_sem)
-                elif line.startswith("-"):
-                    if current_sub:
-                        current_sub['chapters'].append(line[1:].strip())
-                elif current_sub: 
-                     current_sub['chapters'].append(line)
-        return templates
-    except Exception as e:
-        print(f"Error parsing templates: {e}")
-        return []
-
 class OnboardingDialog(QDialog):
     def __init__(self):
         super().__init__()
         self.lang = get_language()
         self.texts = TRANSLATIONS.get(self.lang, TRANSLATIONS["English"])
         self.selected_template = None
-        self.templates = parse_templates()
+        self.templates = load_catalog().templates
         
         self.setWindowTitle(self.texts.get("welcome_title", "Welcome to StudentPro!"))
         self.resize(500, 650)
@@ -9,12 +9,15 @@ from student_app.database import (
     add_subject, get_all_subjects, delete_subject, 
     add_chapter, get_chapters_by_subject, toggle_chapter_status, delete_chapter,
     add_semester, get_all_semesters, delete_semester, get_subject_progress,
-    get_subject_notes, update_subject_notes, get_next_exam_info
+    get_next_exam_info
 )
 from student_app.ui.subject_window import SubjectWindow
+from student_app.ui.notes_autosave import NotesAutosaver
 from student_app.settings import get_language
 from student_app.ui.translations import TRANSLATIONS
+from student_app.action_profiler import profile_actions
 
+@profile_actions
 class StudyPlanner(QWidget):
     def __init__(self):
         super().__init__()
@@ -133,6 +136,7 @@ class StudyPlanner(QWidget):
         
         tabs_layout.addWidget(QLabel(self.texts["notes"], objectName="h2"))
         self.notes_area = QTextEdit()
+        self.notes_saver = NotesAutosaver(self.notes_area)
         tabs_layout.addWidget(self.notes_area)
         
         save_notes_btn = QPushButton(self.texts["save_notes"])
@@ -163,7 +167,7 @@ class StudyPlanner(QWidget):
         self.sem_combo.clear()
         sems = get_all_semesters()
         for s in sems:
-            self.sem_combo.addItem(s['name'], s['id'])
+            self.sem_combo.addItem(s.name, s.id)
         self.sem_combo.blockSignals(False)
         
         if self.sem_combo.count() > 0:
@@ -180,8 +184,8 @@ class StudyPlanner(QWidget):
         
         subjects = get_all_subjects(self.current_semester_id)
         for s in subjects:
-            item = QListWidgetItem(s['name'])
-            item.setData(Qt.UserRole, s['id'])
+            item = QListWidgetItem(s.name)
+            item.setData(Qt.UserRole, s.id)
             self.subject_list.addItem(item)
 
     def on_subject_selected(self, item_or_none=None):
@@ -212,6 +216,7 @@ class StudyPlanner(QWidget):
 
     def handle_delete_subject(self):
         if self.selected_subject_id:
+            self.notes_saver.reset()
             delete_subject(self.selected_subject_id)
             self.selected_subject_id = None
             self.refresh_subjects()
@@ -222,20 +227,20 @@ class StudyPlanner(QWidget):
         self.chapter_list.clear()
         chaps = get_chapters_by_subject(self.selected_subject_id)
         for c in chaps:
-            vid = "📖" if c['video_completed'] else "◯"
-            ex = "✍️" if c['exercises_completed'] else "◯"
-            self.chapter_list.addItem(f"{c['name']}  {vid} {ex}")
+            vid = "📖" if c.video_completed else "◯"
+            ex = "✍️" if c.exercises_completed else "◯"
+            self.chapter_list.addItem(f"{c.name}  {vid} {ex}")
 
     def refresh_notes(self):
-        self.notes_area.setText(get_subject_notes(self.selected_subject_id))
+        self.notes_saver.load(self.selected_subject_id)
 
     def handle_save_notes(self):
-        if self.selected_subject_id:
-            update_subject_notes(self.selected_subject_id, self.notes_area.toPlainText())
+        self.notes_saver.flush()
 
     def handle_add_semester(self):
         from PyQt5.QtWidgets import QDialog, QVBoxLayout, QLabel, QLineEdit, QComboBox, QDialogButtonBox
-        from ..database import add_semester, add_subject, add_chapter
+        from ..database import add_semester, apply_template_to_semester
+        from ..template_catalog import load_catalog
         from .translations import TRANSLATIONS
         
         lang = "English"
@@ -257,17 +262,12 @@ class StudyPlanner(QWidget):
         template_combo = QComboBox()
         template_combo.addItem("-- No Template --", None)
         
-        # We need access to the templates from the web version or a local copy
-        # For simplicity in Python, let's add a few core ones or link to a shared file
-        # For now, I'll add the common ones
-        template_options = [
-            ("BAC Sciences", "bac_sci"),
-            ("BAC Math", "bac_math"),
-            ("L1 Info", "l1_info"),
-            ("L2 Info", "l2_info")
-        ]
-        for label, val in template_options:
-            template_combo.addItem(label, val)
+        # Shared compiled catalog (same source as onboarding and the web version)
+        catalog = load_catalog()
+        for template_id, tmpl in catalog:
+            year = tmpl.get("year")
+            label = f"[{year.upper()}] {tmpl['name']}" if year else tmpl['name']
+            template_combo.addItem(label, template_id)
         layout.addWidget(template_combo)
         
         buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
@@ -279,8 +279,9 @@ class StudyPlanner(QWidget):
             name = name_input.text().strip()
             if name:
                 sem_id = add_semester(name)
-                # Template logic (simplified for now to show the approach)
-                # In a real app, we'd import the TEMPLATES from a shared JSON
+                template = catalog.get(template_combo.currentData())
+                if template:
+                    apply_template_to_semester(sem_id, template)
                 self.refresh_semesters()
 
     def handle_delete_semester(self):
@@ -295,10 +296,16 @@ class StudyPlanner(QWidget):
 
     def handle_open_subject_window(self):
         if not self.selected_subject_id: return
-        if self.selected_subject_id in self.subject_windows:
-            self.subject_windows[self.selected_subject_id].show()
-        else:
-            win = SubjectWindow(self.selected_subject_id, self.selected_name)
+        self.open_subject_window(self.selected_subject_id, self.selected_name)
+
+    def open_subject_window(self, sub_id, name, tab=None):
+        win = self.subject_windows.get(sub_id)
+        if win is None:
+            win = SubjectWindow(sub_id, name)
             win.data_changed.connect(self.on_subject_selected) # Re-trigger refresh
-            self.subject_windows[self.selected_subject_id] = win
-            win.show()
\ No newline at end of file
+            self.subject_windows[sub_id] = win
+        if tab is not None:
+            win.tabs.setCurrentIndex(tab)
+        win.show()
+        win.raise_()
+        win.activateWindow()
\ No newline at end of file
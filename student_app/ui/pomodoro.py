@@ -4,57 +4,132 @@ from PyQt5.QtWidgets import (
     QComboBox, QProgressBar, QFrame, QMessageBox, QCheckBox
 )
 from PyQt5.QtCore import QTimer, Qt, QRectF, QPointF
-from PyQt5.QtGui import QPainter, QColor, QPen, QFont
+from PyQt5.QtGui import QPainter, QColor, QPen, QFont, QFontMetrics, QPixmap
 from datetime import datetime
+import math
 from student_app.database import (
     get_all_subjects, get_next_task, get_user_profile, 
-    add_xp, log_study_session, get_chapters_by_subject
+    complete_study_session, get_chapters_by_subject
 )
+from student_app.session_journal import SessionJournal, get_interrupted_session, MIN_RECOVER_SECONDS
 from student_app.sound_manager import play_sound, toggle_lofi
-from student_app.settings import get_language, get_pomodoro_settings
+from student_app.timer_engine import MonotonicTimer
+from student_app.settings import get_language, get_pomodoro_settings, get_theme
 from student_app.ui.translations import TRANSLATIONS
+from student_app.action_profiler import profile_actions
 import webbrowser
 
 class CircularTimer(QWidget):
+    RING_WIDTH = 12
+    # Static ring pixmaps shared by every instance, keyed by size, DPR and ring color
+    _ring_cache = {}
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setMinimumSize(300, 300)
         self.progress = 0 # 0 to 1
         self.time_text = "25:00"
-        self.mode_color = QColor("#6366f1")
+        self.theme = get_theme()
+        self.timer_font = QFont("Inter", 48, QFont.Bold)
+        self.set_mode_color(QColor("#6366f1"))
+
+    def set_mode_color(self, color):
+        self.mode_color = QColor(color)
+        dark = self.theme == "Dark" or self.mode_color.lightness() < 100 # Simple dark check
+        self.ring_color = QColor("#334155" if dark else "#e2e8f0")
+        self.arc_pen = QPen(self.mode_color, self.RING_WIDTH)
+        self.arc_pen.setCapStyle(Qt.RoundCap)
+        self.text_pen = QPen(self.mode_color)
+        self.update()
+
+    def _circle_rect(self):
+        width = self.width()
+        height = self.height()
+        side = min(width, height) - 40
+        return QRectF((width - side) / 2, (height - side) / 2, side, side)
+
+    def _text_rect(self):
+        # Centered box wide enough for any "MMM:SS" string in the timer font (work sessions go up to 120 min)
+        rect = self._circle_rect()
+        fm = QFontMetrics(self.timer_font)
+        w = fm.horizontalAdvance("888:88") + 8
+        h = fm.height() + 4
+        return QRectF(rect.center().x() - w / 2, rect.center().y() - h / 2, w, h).toAlignedRect()
+
+    def _arc_span(self, progress):
+        return int(-progress * 360 * 16)
+
+    def _arc_segment_rect(self, old_span, new_span):
+        """Bounding box of the arc between two spans (1/16th degrees), pen included."""
+        rect = self._circle_rect()
+        cx, cy, r = rect.center().x(), rect.center().y(), rect.width() / 2
+        a0, a1 = sorted((90 + old_span / 16, 90 + new_span / 16))
+        steps = max(1, int((a1 - a0) / 5) + 1)
+        xs, ys = [], []
+        for i in range(steps + 1):
+            a = math.radians(a0 + (a1 - a0) * i / steps)
+            xs.append(cx + r * math.cos(a))
+            ys.append(cy - r * math.sin(a))
+        pad = self.RING_WIDTH + 2
+        return QRectF(min(xs) - pad, min(ys) - pad, max(xs) - min(xs) + 2 * pad, max(ys) - min(ys) + 2 * pad).toAlignedRect()
 
     def set_progress(self, progress, text):
+        old_span = self._arc_span(self.progress)
+        new_span = self._arc_span(progress)
+        text_changed = text != self.time_text
         self.progress = progress
         self.time_text = text
-        self.update()
+        if new_span != old_span:
+            if abs(new_span) < abs(old_span):
+                # Arc shrank (reset / mode change): the rest of the ring must be restored too
+                self.update()
+                return
+            self.update(self._arc_segment_rect(old_span, new_span))
+        if text_changed:
+            self.update(self._text_rect())
+
+    def _ring_pixmap(self):
+        dpr = self.devicePixelRatioF()
+        key = (self.width(), self.height(), dpr, self.ring_color.name())
+        pixmap = self._ring_cache.get(key)
+        if pixmap is None:
+            pixmap = QPixmap(int(self.width() * dpr), int(self.height() * dpr))
+            pixmap.setDevicePixelRatio(dpr)
+            pixmap.fill(Qt.transparent)
+            painter = QPainter(pixmap)
+            painter.setRenderHint(QPainter.Antialiasing)
+            painter.setPen(QPen(self.ring_color, self.RING_WIDTH))
+            painter.drawEllipse(self._circle_rect())
+            painter.end()
+            if len(self._ring_cache) > 8: self._ring_cache.clear()
+            self._ring_cache[key] = pixmap
+        return pixmap
 
     def paintEvent(self, event):
         painter = QPainter(self)
         painter.setRenderHint(QPainter.Antialiasing)
+        dirty = event.rect()
+        rect = self._circle_rect()
         
-        width = self.width()
-        height = self.height()
-        side = min(width, height) - 40
-        rect = QRectF((width - side) / 2, (height - side) / 2, side, side)
-        
-        # Background Circle
-        pen = QPen(QColor("#e2e8f0"), 12)
-        if self.mode_color.lightness() < 100: # Simple dark check
-             pen.setColor(QColor("#334155"))
-        painter.setPen(pen)
-        painter.drawEllipse(rect)
+        # Background Circle (cached)
+        painter.drawPixmap(QRectF(dirty), self._ring_pixmap(), self._source_rect(dirty))
         
         # Progress Arc
-        pen.setColor(self.mode_color)
-        pen.setCapStyle(Qt.RoundCap)
-        painter.setPen(pen)
-        painter.drawArc(rect, 90 * 16, int(-self.progress * 360 * 16))
+        painter.setPen(self.arc_pen)
+        painter.drawArc(rect, 90 * 16, self._arc_span(self.progress))
         
         # Text
-        painter.setPen(self.mode_color)
-        painter.setFont(QFont("Inter", 48, QFont.Bold))
-        painter.drawText(rect, Qt.AlignCenter, self.time_text)
+        text_rect = self._text_rect()
+        if dirty.intersects(text_rect):
+            painter.setPen(self.text_pen)
+            painter.setFont(self.timer_font)
+            painter.drawText(rect, Qt.AlignCenter, self.time_text)
 
+    def _source_rect(self, rect):
+        dpr = self.devicePixelRatioF()
+        return QRectF(rect.x() * dpr, rect.y() * dpr, rect.width() * dpr, rect.height() * dpr)
+
+@profile_actions
 class PomodoroTimer(QWidget):
     def __init__(self, notify_callback=None):
         super().__init__()
@@ -73,13 +148,35 @@ class PomodoroTimer(QWidget):
         self.mode = "WORK"
         self.sessions_completed = 0
         
+        # Single-shot timer re-armed for the next visible change; remaining
+        # time always comes from the monotonic engine, never from tick counts.
+        self.engine = MonotonicTimer(self.time_left)
         self.timer = QTimer()
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.PreciseTimer)
         self.timer.timeout.connect(self.update_timer)
         
+        self.journal = SessionJournal()
+        
         self.init_ui()
+        self.recover_interrupted_session()
         self.refresh_subjects()
         self.refresh_profile()
 
+    def recover_interrupted_session(self):
+        """Finalize a work session left behind by a crash or logout."""
+        row = get_interrupted_session()
+        if not row: return
+        elapsed = int(row['elapsed_seconds'] or 0)
+        if row['mode'] == "WORK" and elapsed >= MIN_RECOVER_SECONDS:
+            duration_mins = elapsed // 60
+            complete_study_session(row['subject_id'], duration_mins, duration_mins * 2, 1, row['started_at'])
+            print(f"[Pomodoro] Recovered interrupted session ({duration_mins} min).")
+            if self.notify_callback:
+                self.notify_callback("Pomodoro", f"Recovered an interrupted {duration_mins} min session.")
+        else:
+            self.journal.clear()
+
     def refresh_settings(self):
         if not self.is_running:
             p_settings = get_pomodoro_settings()
@@ -89,6 +186,7 @@ class PomodoroTimer(QWidget):
             if self.mode == "WORK": self.time_left = self.work_time
             elif self.mode == "SHORT_BREAK": self.time_left = self.short_break
             else: self.time_left = self.long_break
+            self.engine.reset(self.time_left)
             self.update_display()
 
     def init_ui(self):
@@ -162,29 +260,46 @@ class PomodoroTimer(QWidget):
         layout.addLayout(extra)
 
     def update_timer(self):
-        if self.time_left > 0:
-            self.time_left -= 1
-            self.update_display()
-        else:
+        self.time_left = self.engine.seconds_left()
+        if self.engine.is_finished():
             self.handle_complete()
+        else:
+            if self.journal.is_active:
+                self.journal.checkpoint(self.engine.elapsed())
+            self.update_display()
+            self.schedule_tick()
+
+    def schedule_tick(self):
+        if self.engine.is_running:
+            self.timer.start(self.engine.next_tick_ms(self.isVisible()))
 
     def update_display(self):
         mins = self.time_left // 60
         secs = self.time_left % 60
         text = f"{mins:02d}:{secs:02d}"
-        
-        total = self.work_time if self.mode == "WORK" else (self.short_break if self.mode == "SHORT_BREAK" else self.long_break)
-        progress = 1 - (self.time_left / total)
-        self.circular_timer.set_progress(progress, text)
+        self.circular_timer.set_progress(self.engine.progress(), text)
+
+    def showEvent(self, event):
+        # Hidden tabs poll coarsely; catch up immediately when shown again.
+        if self.engine.is_running:
+            self.update_timer()
+        super().showEvent(event)
 
     def toggle_timer(self):
         if self.is_running:
             self.timer.stop()
+            self.engine.pause()
+            self.time_left = self.engine.seconds_left()
+            if self.journal.is_active:
+                self.journal.checkpoint(self.engine.elapsed(), force=True)
             self.start_btn.setText(self.texts["resume"])
             self.is_running = False
             toggle_lofi(False)
         else:
-            self.timer.start(1000)
+            if self.mode == "WORK" and not self.journal.is_active:
+                self.journal.begin(self.subject_combo.currentData(), self.mode, self.engine.duration)
+            self.engine.start()
+            self.schedule_tick()
             self.start_btn.setText(self.texts["pause"])
             self.is_running = True
             play_sound("start.wav")
@@ -195,6 +310,9 @@ class PomodoroTimer(QWidget):
         self.is_running = False
         self.time_left = self.work_time
         self.mode = "WORK"
+        self.engine.reset(self.time_left)
+        if self.journal.is_active:
+            self.journal.clear()
         self.update_display()
         self.start_btn.setText(self.texts["start_focus"])
         toggle_lofi(False)
@@ -213,11 +331,11 @@ class PomodoroTimer(QWidget):
             
             sub_id = self.subject_combo.currentData()
             duration_mins = self.work_time // 60
-            if sub_id: log_study_session(sub_id, duration_mins)
             
             # Scale XP: 2 XP per minute (standard 25 min = 50 XP)
             xp_to_add = duration_mins * 2
-            leveled_up, new_level = add_xp(xp_to_add, 1)
+            leveled_up, new_level = complete_study_session(sub_id, duration_mins, xp_to_add, 1)
+            self.journal.mark_finalized()
             self.refresh_profile()
             
             if self.sessions_completed % 4 == 0:
@@ -230,6 +348,7 @@ class PomodoroTimer(QWidget):
             if self.notify_callback:
                 self.notify_callback("Pomodoro", "Break finished! Time to focus.")
 
+        self.engine.reset(self.time_left)
         self.update_display()
         self.start_btn.setText(self.texts["start_focus"])
 
@@ -242,7 +361,7 @@ class PomodoroTimer(QWidget):
         self.subject_combo.blockSignals(True)
         self.subject_combo.clear()
         for s in get_all_subjects():
-            self.subject_combo.addItem(s['name'], s['id'])
+            self.subject_combo.addItem(s.name, s.id)
         self.subject_combo.blockSignals(False)
         self.update_suggestion()
 
@@ -259,8 +378,7 @@ class PomodoroTimer(QWidget):
         chapters = get_chapters_by_subject(sub_id)
         yt_url = None
         for c in chapters:
-            # Actual schema: id(0), subject_id(1), name(2), video_completed(3), exercises_completed(4), is_completed(5), due_date(6), cloud_id(7), youtube_url(8)
-            yt = c['youtube_url'] if isinstance(c, dict) else c[8]  # youtube_url is column 8
+            yt = c.youtube_url
             # Ensure it's a string and not empty
             if yt and str(yt).strip():
                 yt_url = str(yt).strip()
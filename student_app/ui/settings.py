@@ -1,16 +1,21 @@
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QFileDialog, QMessageBox, QGroupBox, QComboBox, QSpinBox
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QFileDialog, QMessageBox, QGroupBox, QComboBox, QSpinBox,
+    QCheckBox, QPlainTextEdit, QShortcut
 )
+from PyQt5.QtGui import QFont, QKeySequence
 import os
 import shutil
 from student_app.settings import (
     get_db_path, set_db_path, get_language, set_language, 
     get_theme, set_theme, get_pomodoro_settings, set_pomodoro_settings,
-    get_sync_mode, set_sync_mode
+    get_sync_mode, set_sync_mode, set_profile_actions_enabled
 )
 from student_app.ui.translations import TRANSLATIONS
 from student_app.database import reset_all_data, sync_from_cloud, push_to_cloud
+from student_app import action_profiler, cloud_stats
+from student_app.action_profiler import profile_actions
 
+@profile_actions
 class SettingsTab(QWidget):
     def __init__(self):
         super().__init__()
@@ -195,10 +200,96 @@ class SettingsTab(QWidget):
         danger_group.setLayout(danger_layout)
         layout.addWidget(danger_group)
         
+        # Diagnostics (hidden unless profiling is on; Ctrl+Shift+D toggles it)
+        self.diag_group = QGroupBox("Diagnostics")
+        diag_layout = QVBoxLayout()
+        
+        self.profile_check = QCheckBox("Profile UI actions (cProfile)")
+        self.profile_check.setChecked(action_profiler.enabled)
+        self.profile_check.toggled.connect(self.toggle_action_profiling)
+        diag_layout.addWidget(self.profile_check)
+        
+        action_row = QHBoxLayout()
+        self.action_combo = QComboBox()
+        self.action_combo.currentIndexChanged.connect(self.show_action_profile)
+        action_row.addWidget(self.action_combo, 1)
+        refresh_btn = QPushButton("Refresh")
+        refresh_btn.clicked.connect(self.load_action_profiles)
+        action_row.addWidget(refresh_btn)
+        save_btn = QPushButton("Save .pstats")
+        save_btn.clicked.connect(self.save_action_profiles)
+        action_row.addWidget(save_btn)
+        clear_btn = QPushButton("Clear")
+        clear_btn.clicked.connect(self.clear_action_profiles)
+        action_row.addWidget(clear_btn)
+        diag_layout.addLayout(action_row)
+        
+        self.profile_view = QPlainTextEdit()
+        self.profile_view.setReadOnly(True)
+        self.profile_view.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self.profile_view.setFont(QFont("Consolas, Menlo, monospace", 9))
+        self.profile_view.setMinimumHeight(220)
+        diag_layout.addWidget(self.profile_view)
+        
+        diag_layout.addWidget(QLabel("<b>Cloud requests</b>"))
+        self.last_sync_label = QLabel()
+        self.last_sync_label.setWordWrap(True)
+        diag_layout.addWidget(self.last_sync_label)
+        self.cloud_view = QPlainTextEdit()
+        self.cloud_view.setReadOnly(True)
+        self.cloud_view.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self.cloud_view.setFont(self.profile_view.font())
+        self.cloud_view.setMinimumHeight(140)
+        diag_layout.addWidget(self.cloud_view)
+        
+        self.diag_group.setLayout(diag_layout)
+        self.diag_group.setVisible(action_profiler.enabled)
+        layout.addWidget(self.diag_group)
+        QShortcut(QKeySequence("Ctrl+Shift+D"), self, activated=self.toggle_diagnostics)
+        
         layout.addStretch()
         
         self.setLayout(layout)
 
+    def toggle_diagnostics(self):
+        self.diag_group.setVisible(not self.diag_group.isVisible())
+        if self.diag_group.isVisible():
+            self.load_action_profiles()
+
+    def toggle_action_profiling(self, on):
+        action_profiler.set_enabled(on)
+        set_profile_actions_enabled(on)
+
+    def load_action_profiles(self):
+        current = self.action_combo.currentData()
+        self.action_combo.blockSignals(True)
+        self.action_combo.clear()
+        for name, calls, total_ms in action_profiler.actions():
+            self.action_combo.addItem(f"{name}  ({calls}x, {total_ms:.0f} ms)", name)
+        index = max(0, self.action_combo.findData(current))
+        self.action_combo.setCurrentIndex(index)
+        self.action_combo.blockSignals(False)
+        self.show_action_profile()
+        self.show_cloud_stats()
+
+    def show_cloud_stats(self):
+        last = cloud_stats.last_sync
+        self.last_sync_label.setText(f"Last sync: {last.summary()}" if last else "No sync this session.")
+        self.cloud_view.setPlainText(cloud_stats.report())
+
+    def show_action_profile(self, *_):
+        name = self.action_combo.currentData()
+        self.profile_view.setPlainText(action_profiler.summary(name) if name else "No actions profiled yet.")
+
+    def save_action_profiles(self):
+        path = action_profiler.dump()
+        QMessageBox.information(self, self.texts["success"], f"Profiles saved to {path}")
+
+    def clear_action_profiles(self):
+        action_profiler.reset()
+        cloud_stats.reset()
+        self.load_action_profiles()
+
     def change_sync_mode(self, text):
         mode = "Automatic" if text == self.texts["automatic"] else "Manual"
         set_sync_mode(mode)
@@ -206,8 +297,9 @@ class SettingsTab(QWidget):
     def handle_upload(self):
         self.upload_btn.setEnabled(False)
         self.upload_btn.setText("Uploading...")
-        if push_to_cloud():
-            QMessageBox.information(self, self.texts["success"], self.texts["sync_success"])
+        result = push_to_cloud()
+        if result:
+            QMessageBox.information(self, self.texts["success"], f"{self.texts['sync_success']}\n\n{result.summary()}")
         else:
             QMessageBox.critical(self, self.texts["error"], self.texts["sync_failed"])
         self.upload_btn.setEnabled(True)
@@ -216,8 +308,9 @@ class SettingsTab(QWidget):
     def handle_download(self):
         self.download_btn.setEnabled(False)
         self.download_btn.setText("Downloading...")
-        if sync_from_cloud():
-            QMessageBox.information(self, self.texts["success"], self.texts["sync_success"])
+        result = sync_from_cloud()
+        if result:
+            QMessageBox.information(self, self.texts["success"], f"{self.texts['sync_success']}\n\n{result.summary()}")
         else:
             QMessageBox.critical(self, self.texts["error"], self.texts["sync_failed"])
         self.download_btn.setEnabled(True)
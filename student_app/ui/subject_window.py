@@ -7,18 +7,20 @@ from PyQt5.QtCore import Qt, pyqtSignal, QTimer, QDate
 from student_app.database import (
     add_chapter, get_chapters_by_subject, toggle_video_status, 
     toggle_exercises_status, delete_chapter, get_subject_progress,
-    update_subject_notes, get_subject_notes, update_subject_dates,
-    get_all_subjects, update_chapter_due_date, update_chapter_youtube
+    update_subject_dates,
+    get_subject, update_chapter_due_date, update_chapter_youtube
 )
 from student_app.settings import get_language
 from student_app.ui.translations import TRANSLATIONS
+from student_app.ui.notes_autosave import NotesAutosaver
+from student_app.action_profiler import profile_actions
 
 class ChapterWidget(QFrame):
     status_changed = pyqtSignal()
 
     def __init__(self, chapter, has_exercises=True):
         super().__init__()
-        self.chapter_id = chapter['id']
+        self.chapter_id = chapter.id
         self.has_exercises = has_exercises
         self.setFrameShape(QFrame.StyledPanel)
         self.init_ui(chapter)
@@ -26,19 +28,15 @@ class ChapterWidget(QFrame):
     def init_ui(self, chapter):
         layout = QHBoxLayout()
         
-        self.name_label = QLabel(chapter['name'])
+        self.name_label = QLabel(chapter.name)
         self.name_label.setStyleSheet("font-weight: bold; font-size: 14px;")
         layout.addWidget(self.name_label, 2)
 
         self.due_date_edit = QDateEdit()
         self.due_date_edit.setCalendarPopup(True)
-        # Handle due_date potential missing column gracefully
-        try:
-            if 'due_date' in chapter.keys() and chapter['due_date']:
-                self.due_date_edit.setDate(QDate.fromString(chapter['due_date'], "yyyy-MM-dd"))
-            else:
-                self.due_date_edit.setDate(QDate.currentDate())
-        except: 
+        if chapter.due_date:
+            self.due_date_edit.setDate(QDate.fromString(chapter.due_date, "yyyy-MM-dd"))
+        else:
             self.due_date_edit.setDate(QDate.currentDate())
             
         self.due_date_edit.dateChanged.connect(self.on_due_date_changed)
@@ -52,17 +50,8 @@ class ChapterWidget(QFrame):
         except: pass
         texts = TRANSLATIONS.get(lang, TRANSLATIONS["English"])
         
-        # Handle both dict and sqlite3.Row
-        # chapters table: id(0), subject_id(1), name(2), video_completed(3), exercises_completed(4), is_completed(5), due_date(6), cloud_id(7), youtube_url(8)
-        video_completed = 0
-        exercises_completed = 0
-        if isinstance(chapter, dict):
-            video_completed = chapter.get('video_completed', 0)
-            exercises_completed = chapter.get('exercises_completed', 0)
-        else:
-            # sqlite3.Row - video_completed is column index 3, exercises_completed is index 4
-            video_completed = chapter[3] if len(chapter) > 3 else 0
-            exercises_completed = chapter[4] if len(chapter) > 4 else 0
+        video_completed = chapter.video_completed
+        exercises_completed = chapter.exercises_completed
         
         self.video_check = QCheckBox(texts.get("course", "Course"))
         self.video_check.setChecked(bool(video_completed))
@@ -82,12 +71,7 @@ class ChapterWidget(QFrame):
         layout.addWidget(self.delete_btn)
         
         # YouTube edit button
-        yt_url = None
-        if isinstance(chapter, dict):
-            yt_url = chapter.get('youtube_url')
-        else:
-            # sqlite3.Row - youtube_url is column index 8
-            yt_url = chapter[8] if len(chapter) > 8 else None
+        yt_url = chapter.youtube_url
         yt_icon = "📺" if yt_url else "📺"
         self.yt_btn = QPushButton(yt_icon)
         self.yt_btn.setFixedSize(30, 30)
@@ -131,6 +115,7 @@ class ChapterWidget(QFrame):
             update_chapter_youtube(self.chapter_id, url)
             self.status_changed.emit()
 
+@profile_actions
 class SubjectWindow(QMainWindow):
     data_changed = pyqtSignal()
 
@@ -244,6 +229,7 @@ class SubjectWindow(QMainWindow):
         
         self.notes_edit = QTextEdit()
         self.notes_edit.setPlaceholderText(self.texts.get("notes", "Notes") + "...")
+        self.notes_saver = NotesAutosaver(self.notes_edit)
         notes_layout.addWidget(self.notes_edit)
         
         save_notes_btn = QPushButton(self.texts.get("save_notes", "Save Notes"))
@@ -258,22 +244,14 @@ class SubjectWindow(QMainWindow):
 
     def refresh_data(self):
         # Refresh Dates
-        all_subjects = get_all_subjects()
-        subject = next((s for s in all_subjects if s['id'] == self.subject_id), None)
+        subject = get_subject(self.subject_id)
         has_exercises = True
         
         if subject:
-            subject_dict = dict(subject)
-            exam_date = subject_dict.get('exam_date')
-            if exam_date:
-                self.exam_date_edit.setDate(QDate.fromString(exam_date, "yyyy-MM-dd"))
-            
-            test_date = subject_dict.get('test_date')
-            if test_date:
-                self.test_date_edit.setDate(QDate.fromString(test_date, "yyyy-MM-dd"))
-            # Check for has_exercises column safely
-            try: has_exercises = bool(subject_dict.get('has_exercises', False))
-            except: pass
+            if subject.exam_date:
+                self.exam_date_edit.setDate(QDate.fromString(subject.exam_date, "yyyy-MM-dd"))
+            # subjects has no test_date column; test_date_edit keeps its default
+            has_exercises = bool(subject.has_exercises)
 
         # Refresh Progress
         total, completed = get_subject_progress(self.subject_id)
@@ -293,18 +271,13 @@ class SubjectWindow(QMainWindow):
             chap_widget.status_changed.connect(self.refresh_data)
             self.chapter_layout.addWidget(chap_widget)
             
-        # Refresh Notes (only if first load or explicitly requested, but simple is fine)
-        saved_notes = get_subject_notes(self.subject_id)
-        if self.notes_edit.toPlainText() != saved_notes:
-             # Prevent overwriting user work if they are typing, but mostly this is called on init
-             if not self.notes_edit.hasFocus():
-                 self.notes_edit.setPlainText(saved_notes)
+        # Refresh Notes (a revision check; the body is only re-read if it changed)
+        self.notes_saver.load(self.subject_id)
         
         self.data_changed.emit()
 
     def handle_save_notes(self):
-        notes = self.notes_edit.toPlainText()
-        update_subject_notes(self.subject_id, notes)
+        self.notes_saver.flush()
         
         btn = self.sender()
         if btn and hasattr(btn, "setText"):
@@ -313,6 +286,10 @@ class SubjectWindow(QMainWindow):
         
         self.data_changed.emit()
 
+    def closeEvent(self, event):
+        self.notes_saver.flush()
+        super().closeEvent(event)
+
     def handle_save_dates(self):
         exam_date = self.exam_date_edit.date().toString("yyyy-MM-dd")
         test_date = self.test_date_edit.date().toString("yyyy-MM-dd")
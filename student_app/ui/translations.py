@@ -65,7 +65,9 @@ TRANSLATIONS = {
         "start_challenge": "Start Focus 🚀",
         "welcome_title": "Welcome to StudentPro!",
         "welcome_desc": "Your ultimate study companion is ready. Choose a template to start or create your own.",
-        "welcome_btn": "Apply Template 🚀"
+        "welcome_btn": "Apply Template 🚀",
+        "search_placeholder": "🔍 Search notes & chapters",
+        "no_results": "No results"
     },
     "Arabic": {
         "dashboard": "لوحة القيادة",
@@ -133,7 +135,9 @@ TRANSLATIONS = {
         "start_challenge": "ابدأ التحدي 🚀",
         "welcome_title": "مرحباً بك في StudentPro!",
         "welcome_desc": "رفيقك الدراسي المثالي جاهز. اختر قالباً للبدء أو أنشئ قالبك الخاص.",
-        "welcome_btn": "تطبيق القالب 🚀"
+        "welcome_btn": "تطبيق القالب 🚀",
+        "search_placeholder": "🔍 ابحث في الملاحظات والفصول",
+        "no_results": "لا توجد نتائج"
         },
     "French": {
         "dashboard": "Tableau de bord",
@@ -201,6 +205,8 @@ TRANSLATIONS = {
         "start_challenge": "Démarrer le défi 🚀",
         "welcome_title": "Bienvenue sur StudentPro!",
         "welcome_desc": "Votre compagnon d'étude ultime est prêt. Choisissez un modèle pour commencer ou créez le vôtre.",
-        "welcome_btn": "Appliquer le modèle 🚀"
+        "welcome_btn": "Appliquer le modèle 🚀",
+        "search_placeholder": "🔍 Rechercher notes et chapitres",
+        "no_results": "Aucun résultat"
     }
 }
@@ -4,21 +4,30 @@ A GUI tool to read, edit, and save templates.js files
 """
 
 import sys
-import re
 import json
 import copy
 import os
+import re
+import bisect
+import unicodedata
+from collections import Counter
+from contextlib import contextmanager
 from PyQt5.QtWidgets import (
-    QApplication, QMainWindow, QWidget, QSplitter, QTreeWidget, QTreeWidgetItem,
+    QApplication, QMainWindow, QWidget, QSplitter, QTreeWidget, QTreeWidgetItem, QTreeView,
     QVBoxLayout, QHBoxLayout, QFormLayout, QLabel, QLineEdit, QPushButton,
     QCheckBox, QGroupBox, QScrollArea, QFileDialog, QMessageBox, QToolBar,
     QAction, QStatusBar, QFrame, QSizePolicy, QDialog, QDialogButtonBox,
-    QComboBox, QTextEdit, QMenu, QAbstractItemView, QShortcut
+    QComboBox, QTextEdit, QMenu, QAbstractItemView, QShortcut, QUndoStack, QUndoCommand,
+    QInputDialog
+)
+from PyQt5.QtCore import (
+    Qt, QSize, QTimer, pyqtSignal, QAbstractItemModel, QModelIndex, QMimeData, QSortFilterProxyModel
 )
-from PyQt5.QtCore import Qt, QSize, pyqtSignal
 from PyQt5.QtGui import (
     QIcon, QFont, QColor, QPalette, QKeySequence, QFontMetrics
 )
+from student_app.templates_js import TemplatesParseError, write_js_file
+from student_app.template_catalog import load_templates
 
 # ─────────────────────────────────────────────
 #  Color palette  (Light theme)
@@ -46,7 +55,7 @@ QMainWindow, QWidget {{
     font-size: 13px;
 }}
 
-QTreeWidget {{
+QTreeView {{
     background-color: {COLORS['panel']};
     border: 1px solid {COLORS['border']};
     border-radius: 6px;
@@ -55,16 +64,16 @@ QTreeWidget {{
     color: {COLORS['text']};
     font-size: 12px;
 }}
-QTreeWidget::item {{
+QTreeView::item {{
     padding: 4px 6px;
     border-radius: 4px;
     margin: 1px 2px;
 }}
-QTreeWidget::item:selected {{
+QTreeView::item:selected {{
     background-color: {COLORS['accent']};
     color: #ffffff;
 }}
-QTreeWidget::item:hover:!selected {{
+QTreeView::item:hover:!selected {{
     background-color: {COLORS['surface']};
 }}
 
@@ -232,123 +241,617 @@ QDialogButtonBox QPushButton {{
 
 
 # ─────────────────────────────────────────────
-#  JS Parser / Writer
+#  Tree item data roles
 # ─────────────────────────────────────────────
+ROLE_TYPE = Qt.UserRole + 1    # "template" | "subject" | "chapter"
+ROLE_IDX  = Qt.UserRole + 2    # index(es) as tuple
 
-def parse_js_file(filepath: str):
-    """Parse templates.js and return Python list.
-    Handles JS object literals with unquoted keys and trailing commas.
+YEAR_COLORS = {
+    "bac":  "#5856d6",
+    "2as":  "#007aff",
+    "1as":  "#00aacc",
+    "l1":   "#34c759",
+    "l2":   "#ff9500",
+    "l3":   "#ff6b00",
+    "m1":   "#af52de",
+    "m2":   "#ff3b30",
+}
+
+
+# ─────────────────────────────────────────────
+#  Tree model
+# ─────────────────────────────────────────────
+
+_CHILD_KIND = {"root": "template", "template": "subject", "subject": "chapter"}
+_CHILD_KEY  = {"template": "subjects", "subject": "chapters"}
+
+
+class _Node:
+    """Stable handle for one tree row; `row` is kept current by the model."""
+    __slots__ = ("kind", "parent", "row", "children")
+
+    def __init__(self, kind, parent, row):
+        self.kind = kind
+        self.parent = parent
+        self.row = row
+        self.children = []
+
+
+class TemplatesModel(QAbstractItemModel):
+    """Item model over the editor's template list.
+
+    The list stays the source of truth; a parallel node tree gives every row a
+    stable internal pointer, so expansion and selection survive edits. All
+    structural changes go through insert_rows / remove_rows / move_rows, which
+    mutate the list and emit the matching row signal — the view never rebuilds.
     """
-    with open(filepath, "r", encoding="utf-8") as f:
-        content = f.read()
-
-    # 1. Remove comments carefully
-    # Use a regex that ignores // inside strings
-    # We strip the variable declaration first to make it easier
-    content = re.sub(r'^\s*const\s+TEMPLATES\s*=\s*', '', content, flags=re.MULTILINE)
-    content = content.strip().rstrip(';').strip()
-
-    # Remove single line comments that are on their own line or at the end of line
-    # but NOT inside a string (rough approximation)
-    def remove_comments(text):
-        # Match strings first so we can ignore them
-        # This matches "..." and '...'
-        pattern = r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')|//.*'
-        def subst(m):
-            if m.group(1): return m.group(1) # it's a string, keep it
-            return "" # it's a comment, remove it
-        return re.compile(pattern).sub(subst, text)
-
-    content = remove_comments(content)
-
-    # 2. Remove multi-line comments  /* ... */
-    content = re.sub(r'/\*.*?\*/', '', content, flags=re.DOTALL)
-
-    # 3. Quote unquoted JS object keys  e.g.  year:  →  "year":
-    # Only match keys that are not already quoted
-    # We use a negative lookbehind for quotes
-    content = re.sub(
-        r'(?<!["\'\w])([a-zA-Z_][a-zA-Z0-9_]*)\s*:(?!:)',
-        lambda m: f'"{m.group(1)}":',
-        content
-    )
-
-    # 4. Remove trailing commas before  }  or  ]
-    content = re.sub(r',\s*([}\]])', r'\1', content)
-
-    # 5. Parse as JSON
-    data = json.loads(content)
-    return data
-
-
-def write_js_file(filepath: str, templates: list):
-    """Write templates list back to JS file."""
-    lines = ["const TEMPLATES = [\n"]
-
-    for i, tmpl in enumerate(templates):
-        # Year comment header at first occurrence
-        year = tmpl.get("year", "")
-        if year not in [templates[j].get("year") for j in range(i)]:
-            yr_label = year.upper()
-            lines.append(f"    // ==================== {yr_label} ====================\n")
-
-        lines.append("    {\n")
-        lines.append(f'        year: "{tmpl["year"]}",\n')
-        lines.append(f'        name: "{tmpl["name"]}",\n')
-        lines.append("        subjects: [\n")
-
-        subjects = tmpl.get("subjects", [])
-        for si, subj in enumerate(subjects):
-            lines.append("            { \n")
-            lines.append(f'                name: "{subj["name"]}", \n')
-            if "has_exercises" in subj and subj["has_exercises"] is False:
-                lines.append("                has_exercises: false,\n")
-            
-            chapters = subj.get("chapters", [])
-            lines.append("                chapters: [\n")
-            chapter_blocks = []
-            for ch in chapters:
-                if isinstance(ch, dict):
-                    ch_lines = []
-                    ch_lines.append(f'                    {{ name: "{ch["name"]}"')
-                    
-                    if "url" in ch and ch["url"]:
-                        ch_lines.append(f', url: "{ch["url"]}"')
-                    
-                    if "resources" in ch and ch["resources"]:
-                        res_list = []
-                        for r in ch["resources"]:
-                            res_obj = f'{{ type: "{r["type"]}", url: "{r["url"]}", label: "{r["label"]}" }}'
-                            res_list.append(res_obj)
-                        ch_lines.append(f', resources: [{", ".join(res_list)}]')
-                    
-                    ch_lines.append(' }')
-                    chapter_blocks.append("".join(ch_lines))
-                else:
-                    chapter_blocks.append(f'                    "{ch}"')
-            
-            lines.append(",\n".join(chapter_blocks))
-            if chapter_blocks:
-                lines.append("\n")
-            lines.append("                ] \n")
-            comma = "," if si < len(subjects) - 1 else ""
-            lines.append(f"            }}{comma}\n")
-
-        lines.append("        ]\n")
-        comma = "," if i < len(templates) - 1 else ""
-        lines.append(f"    }}{comma}\n")
-
-    lines.append("];\n")
-
-    with open(filepath, "w", encoding="utf-8") as f:
-        f.writelines(lines)
+
+    MIME_TYPE = "application/x-templates-editor-rows"
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._templates = []
+        self._root = _Node("root", None, 0)
+        self._placeholder = None
+        self._bold = QFont()
+        self._bold.setBold(True)
+        self._colors = {}
+        # Called as move_hook(src_path, row, count, dst_path, dst_row) for drops,
+        # so the owner can record them (e.g. as undo commands); None moves directly.
+        self.move_hook = None
+
+    # ── Loading ──
+
+    def set_templates(self, templates):
+        self.beginResetModel()
+        self._templates = templates
+        self._placeholder = None
+        self._root.children = [self._build("template", self._root, i, t) for i, t in enumerate(templates)]
+        self.endResetModel()
+
+    def set_placeholder(self, text):
+        """Show a single inert row (empty state) until something is inserted."""
+        self.beginResetModel()
+        self._placeholder = text
+        self._root.children = [_Node("placeholder", self._root, 0)]
+        self.endResetModel()
+
+    def _build(self, kind, parent, row, value):
+        node = _Node(kind, parent, row)
+        key = _CHILD_KEY.get(kind)
+        if key:
+            child_kind = _CHILD_KIND[kind]
+            node.children = [self._build(child_kind, node, i, v) for i, v in enumerate(value.get(key) or [])]
+        return node
+
+    # ── Node / path helpers ──
+
+    def node(self, index):
+        return index.internalPointer() if index.isValid() else self._root
+
+    def _child_list(self, node):
+        if node is self._root:
+            return self._templates
+        value = self.value(node)
+        key = _CHILD_KEY[node.kind]
+        if value.get(key) is None:
+            value[key] = []
+        return value[key]
+
+    def value(self, node):
+        if node.kind == "placeholder":
+            return None
+        return self._child_list(node.parent)[node.row]
+
+    def node_for_path(self, path):
+        node = self._root
+        for row in path:
+            node = node.children[row]
+        return node
+
+    def path(self, node):
+        rows = []
+        while node is not self._root:
+            rows.append(node.row)
+            node = node.parent
+        return tuple(reversed(rows))
+
+    def index_for_node(self, node):
+        if node is self._root:
+            return QModelIndex()
+        return self.createIndex(node.row, 0, node)
+
+    def index_for_path(self, path):
+        return self.index_for_node(self.node_for_path(path))
+
+    def path_for_index(self, index):
+        return self.path(self.node(index))
+
+    def kind(self, index):
+        return self.node(index).kind
+
+    def child_count(self, path):
+        if self._placeholder is not None and not path:
+            return 0
+        return len(self.node_for_path(path).children)
+
+    def value_at(self, path):
+        return self.value(self.node_for_path(path))
+
+    def walk(self, node):
+        """`node` and all its descendants, depth first."""
+        stack = [node]
+        while stack:
+            n = stack.pop()
+            yield n
+            stack.extend(n.children)
+
+    def search_text(self, node):
+        """Text indexed for search: names, plus year and URLs where present."""
+        value = self.value(node)
+        if node.kind == "template":
+            return f"{value.get('year', '')} {value.get('name', '')}"
+        if node.kind == "subject":
+            return value.get("name", "")
+        if node.kind == "chapter":
+            if not isinstance(value, dict):
+                return value
+            parts = [value.get("name", ""), value.get("url") or ""]
+            for r in value.get("resources") or []:
+                parts.append(r.get("label", ""))
+                parts.append(r.get("url", ""))
+            return " ".join(parts)
+        return ""
+
+    @staticmethod
+    def _renumber(node, start=0):
+        children = node.children
+        for i in range(start, len(children)):
+            children[i].row = i
+
+    # ── Mutations ──
+
+    def insert_rows(self, parent_path, row, values):
+        """Insert `values` under `parent_path` at `row` (None = append)."""
+        if self._placeholder is not None:
+            self.set_templates(self._templates)
+        pnode = self.node_for_path(parent_path)
+        if row is None:
+            row = len(pnode.children)
+        lst = self._child_list(pnode)
+        kind = _CHILD_KIND[pnode.kind]
+        self.beginInsertRows(self.index_for_node(pnode), row, row + len(values) - 1)
+        lst[row:row] = values
+        pnode.children[row:row] = [self._build(kind, pnode, row + i, v) for i, v in enumerate(values)]
+        self._renumber(pnode, row)
+        self.endInsertRows()
+
+    def remove_rows(self, parent_path, row, count=1):
+        """Remove `count` rows and return the removed values."""
+        pnode = self.node_for_path(parent_path)
+        lst = self._child_list(pnode)
+        self.beginRemoveRows(self.index_for_node(pnode), row, row + count - 1)
+        removed = lst[row:row + count]
+        del lst[row:row + count]
+        del pnode.children[row:row + count]
+        self._renumber(pnode, row)
+        self.endRemoveRows()
+        return removed
+
+    def move_rows(self, src_path, row, count, dst_path, dst_row):
+        """Move rows between (or within) parents of the same kind.
+
+        `dst_row` follows Qt's convention: the position before the move.
+        """
+        src, dst = self.node_for_path(src_path), self.node_for_path(dst_path)
+        if src.kind != dst.kind:
+            return False
+        if not self.beginMoveRows(self.index_for_node(src), row, row + count - 1,
+                                  self.index_for_node(dst), dst_row):
+            return False
+        src_list, dst_list = self._child_list(src), self._child_list(dst)
+        values = src_list[row:row + count]
+        nodes = src.children[row:row + count]
+        del src_list[row:row + count]
+        del src.children[row:row + count]
+        if src is dst and dst_row > row:
+            dst_row -= count
+        dst_list[dst_row:dst_row] = values
+        dst.children[dst_row:dst_row] = nodes
+        for n in nodes:
+            n.parent = dst
+        self._renumber(src, min(row, dst_row) if src is dst else row)
+        if dst is not src:
+            self._renumber(dst, dst_row)
+        self.endMoveRows()
+        return True
+
+    def set_value(self, path, value):
+        """Replace the value stored at a chapter path."""
+        node = self.node_for_path(path)
+        self._child_list(node.parent)[node.row] = value
+        self.update(path)
+
+    def update(self, path):
+        """The item at `path` was edited in place: repaint just that row."""
+        index = self.index_for_path(path)
+        self.dataChanged.emit(index, index)
+
+    # ── QAbstractItemModel ──
+
+    def index(self, row, column, parent=QModelIndex()):
+        pnode = self.node(parent)
+        if column != 0 or not 0 <= row < len(pnode.children):
+            return QModelIndex()
+        return self.createIndex(row, 0, pnode.children[row])
+
+    def parent(self, index=None):
+        if index is None:
+            return super().parent()
+        if not index.isValid():
+            return QModelIndex()
+        p = index.internalPointer().parent
+        return self.index_for_node(p)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        return len(self.node(parent).children)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 1
+
+    def _color(self, hex_color):
+        color = self._colors.get(hex_color)
+        if color is None:
+            color = self._colors[hex_color] = QColor(hex_color)
+        return color
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        node = index.internalPointer()
+        kind = node.kind
+        if kind == "placeholder":
+            if role == Qt.DisplayRole: return self._placeholder
+            if role == Qt.ForegroundRole: return self._color(COLORS["overlay"])
+            return None
+
+        if role == Qt.DisplayRole:
+            value = self.value(node)
+            if kind == "template":
+                return f"  [{value.get('year', '?').upper()}]  {value.get('name', '(unnamed)')}"
+            if kind == "subject":
+                ex_icon = "" if value.get("has_exercises", True) else " ✗"
+                return f"  📖 {value.get('name', '')}{ex_icon}"
+            if isinstance(value, dict):
+                return f"    • {value['name']} 🔗"
+            return f"    • {value}"
+        if role == Qt.ForegroundRole:
+            if kind == "template":
+                return self._color(YEAR_COLORS.get(self.value(node).get("year", "?"), COLORS["text"]))
+            return self._color(COLORS["text"] if kind == "subject" else COLORS["subtext"])
+        if role == Qt.FontRole and kind == "template":
+            return self._bold
+        if role == ROLE_TYPE:
+            return kind
+        if role == ROLE_IDX:
+            return self.path(node)
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemIsDropEnabled
+        kind = index.internalPointer().kind
+        if kind == "placeholder":
+            return Qt.ItemIsEnabled
+        flags = Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsDragEnabled
+        if kind != "chapter":
+            flags |= Qt.ItemIsDropEnabled
+        return flags
+
+    # ── Drag & drop (internal moves) ──
+
+    def supportedDropActions(self):
+        return Qt.MoveAction
+
+    def mimeTypes(self):
+        return [self.MIME_TYPE]
+
+    def mimeData(self, indexes):
+        paths = sorted({self.path_for_index(i) for i in indexes if i.isValid()})
+        mime = QMimeData()
+        mime.setData(self.MIME_TYPE, json.dumps(paths).encode("utf-8"))
+        return mime
+
+    def dropMimeData(self, data, action, row, column, parent):
+        if action != Qt.MoveAction or not data.hasFormat(self.MIME_TYPE):
+            return False
+        paths = [tuple(p) for p in json.loads(bytes(data.data(self.MIME_TYPE)).decode("utf-8"))]
+        if not paths:
+            return False
+        src_path = paths[0][:-1]
+        rows = [p[-1] for p in paths]
+        # Only a contiguous run of siblings moves as one block
+        if any(p[:-1] != src_path for p in paths) or rows != list(range(rows[0], rows[0] + len(rows))):
+            return False
+        dst = self.node(parent)
+        if _CHILD_KIND.get(dst.kind) != self.node_for_path(paths[0]).kind:
+            return False
+        if row < 0:
+            row = len(dst.children)
+        move = self.move_hook or self.move_rows
+        move(src_path, rows[0], len(rows), self.path(dst), row)
+        return True
 
 
 # ─────────────────────────────────────────────
-#  Tree item data roles
+#  Search
 # ─────────────────────────────────────────────
-ROLE_TYPE = Qt.UserRole + 1    # "template" | "subject" | "chapter"
-ROLE_IDX  = Qt.UserRole + 2    # index(es) as tuple
+
+SEARCH_DEBOUNCE_MS = 150
+FUZZY_MIN_LEN = 4         # shorter terms are matched by prefix only
+FUZZY_THRESHOLD = 0.5     # share of the term's trigrams a token must contain
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def _fold(text):
+    """Case- and accent-insensitive form (also drops Arabic harakat)."""
+    text = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def _tokens(text):
+    return set(_TOKEN_RE.findall(_fold(text)))
+
+
+def _trigrams(token):
+    padded = f" {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    """Inverted token index over the tree rows of a TemplatesModel.
+
+    Built once per load and then kept current from the model's row signals,
+    so a query costs a few dictionary/bisect lookups instead of a walk over
+    every label. Each query term matches token prefixes; terms with no prefix
+    hit fall back to trigram similarity to tolerate typos.
+    """
+
+    def __init__(self, model):
+        self._model = model
+        self._postings = {}       # token -> set of nodes
+        self._node_tokens = {}    # node -> tokens (for removal)
+        self._trigrams = {}       # trigram -> set of tokens
+        self._sorted = []         # sorted tokens for prefix lookup
+        self._dirty = False
+        model.modelReset.connect(self.rebuild)
+        model.rowsInserted.connect(self._on_rows_inserted)
+        model.rowsAboutToBeRemoved.connect(self._on_rows_removed)
+        model.dataChanged.connect(self._on_data_changed)
+        self.rebuild()
+
+    # ── Maintenance ──
+
+    def rebuild(self):
+        self._postings.clear()
+        self._node_tokens.clear()
+        self._trigrams.clear()
+        root = self._model.node(QModelIndex())
+        for node in self._model.walk(root):
+            if node is not root:
+                self._add(node)
+        self._dirty = True
+
+    def _add(self, node):
+        tokens = _tokens(self._model.search_text(node))
+        self._node_tokens[node] = tokens
+        for tok in tokens:
+            nodes = self._postings.get(tok)
+            if nodes is None:
+                nodes = self._postings[tok] = set()
+                for tri in _trigrams(tok):
+                    self._trigrams.setdefault(tri, set()).add(tok)
+                self._dirty = True
+            nodes.add(node)
+
+    def _remove(self, node):
+        for tok in self._node_tokens.pop(node, ()):
+            nodes = self._postings[tok]
+            nodes.discard(node)
+            if not nodes:
+                del self._postings[tok]
+                for tri in _trigrams(tok):
+                    self._trigrams[tri].discard(tok)
+                self._dirty = True
+
+    def _on_rows_inserted(self, parent, first, last):
+        pnode = self._model.node(parent)
+        for node in pnode.children[first:last + 1]:
+            for n in self._model.walk(node):
+                self._add(n)
+
+    def _on_rows_removed(self, parent, first, last):
+        pnode = self._model.node(parent)
+        for node in pnode.children[first:last + 1]:
+            for n in self._model.walk(node):
+                self._remove(n)
+
+    def _on_data_changed(self, top_left, bottom_right):
+        node = self._model.node(top_left)
+        self._remove(node)
+        self._add(node)
+
+    # ── Queries ──
+
+    def _prefix(self, term):
+        if self._dirty:
+            self._sorted = sorted(self._postings)
+            self._dirty = False
+        i = bisect.bisect_left(self._sorted, term)
+        out = []
+        while i < len(self._sorted) and self._sorted[i].startswith(term):
+            out.append(self._sorted[i])
+            i += 1
+        return out
+
+    def _fuzzy(self, term):
+        tris = _trigrams(term)
+        counts = Counter()
+        for tri in tris:
+            counts.update(self._trigrams.get(tri, ()))
+        need = FUZZY_THRESHOLD * len(tris)
+        return [tok for tok, n in counts.items() if n >= need]
+
+    def search(self, query):
+        """Nodes matching every term of `query`, or None for an empty query."""
+        terms = _TOKEN_RE.findall(_fold(query))
+        if not terms:
+            return None
+        result = None
+        for term in terms:
+            tokens = self._prefix(term)
+            if not tokens and len(term) >= FUZZY_MIN_LEN:
+                tokens = self._fuzzy(term)
+            hits = set()
+            for tok in tokens:
+                hits |= self._postings[tok]
+            result = hits if result is None else result & hits
+            if not result:
+                break
+        return result
+
+
+class TemplatesFilterProxy(QSortFilterProxyModel):
+    """Shows matching rows and their ancestors; filtering is a set lookup."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._keep = None
+        self.ancestors = set()  # rows that must be expanded to show the matches
+
+    def set_matches(self, nodes):
+        keep = None
+        self.ancestors = set()
+        if nodes is not None:
+            keep = set()
+            for node in nodes:
+                while node is not None and node not in keep:
+                    keep.add(node)
+                    node = node.parent
+            self.ancestors = {node.parent for node in keep if node.parent is not None}
+        self._keep = keep
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if self._keep is None:
+            return True
+        return self.sourceModel().node(source_parent).children[source_row] in self._keep
+
+
+# ─────────────────────────────────────────────
+#  Undo commands
+# ─────────────────────────────────────────────
+# Each command records only the rows it touches (paths plus the affected
+# values), never a snapshot of the catalog.
+
+class InsertRowsCommand(QUndoCommand):
+    def __init__(self, model, parent_path, row, values, text="Insert"):
+        super().__init__(text)
+        self._model = model
+        self._parent = parent_path
+        self._row = model.child_count(parent_path) if row is None else row
+        self._values = values
+
+    def redo(self):
+        self._model.insert_rows(self._parent, self._row, self._values)
+
+    def undo(self):
+        self._model.remove_rows(self._parent, self._row, len(self._values))
+
+
+class RemoveRowsCommand(QUndoCommand):
+    def __init__(self, model, parent_path, row, count=1, text="Delete"):
+        super().__init__(text)
+        self._model = model
+        self._parent = parent_path
+        self._row = row
+        self._count = count
+        self._values = None
+
+    def redo(self):
+        self._values = self._model.remove_rows(self._parent, self._row, self._count)
+
+    def undo(self):
+        self._model.insert_rows(self._parent, self._row, self._values)
+
+
+class MoveRowsCommand(QUndoCommand):
+    def __init__(self, model, src_path, row, count, dst_path, dst_row, text="Move"):
+        super().__init__(text)
+        self._model = model
+        self._src, self._row, self._count = src_path, row, count
+        self._dst, self._dst_row = dst_path, dst_row
+
+    def redo(self):
+        self._model.move_rows(self._src, self._row, self._count, self._dst, self._dst_row)
+
+    def undo(self):
+        if self._src == self._dst:
+            final = self._dst_row - self._count if self._dst_row > self._row else self._dst_row
+            back = self._row + self._count if self._row > final else self._row
+        else:
+            final, back = self._dst_row, self._row
+        self._model.move_rows(self._dst, final, self._count, self._src, back)
+
+
+class SetFieldsCommand(QUndoCommand):
+    """Set keys on a template/subject/chapter dict; a None value deletes the key."""
+
+    _MISSING = object()
+
+    def __init__(self, model, path, fields, text="Edit"):
+        super().__init__(text)
+        self._model = model
+        self._path = path
+        self._new = fields
+        self._old = None
+
+    @staticmethod
+    def _apply(target, fields, missing):
+        for key, value in fields.items():
+            if value is None or value is missing:
+                target.pop(key, None)
+            else:
+                target[key] = value
+
+    def redo(self):
+        target = self._model.value_at(self._path)
+        self._old = {k: target.get(k, self._MISSING) for k in self._new}
+        self._apply(target, self._new, self._MISSING)
+        self._model.update(self._path)
+
+    def undo(self):
+        self._apply(self._model.value_at(self._path), self._old, self._MISSING)
+        self._model.update(self._path)
+
+
+class SetValueCommand(QUndoCommand):
+    def __init__(self, model, path, value, text="Edit"):
+        super().__init__(text)
+        self._model = model
+        self._path = path
+        self._new = value
+        self._old = None
+
+    def redo(self):
+        self._old = self._model.value_at(self._path)
+        self._model.set_value(self._path, self._new)
+
+    def undo(self):
+        self._model.set_value(self._path, self._old)
 
 
 # ─────────────────────────────────────────────
@@ -571,6 +1074,83 @@ class ResourceDialog(QDialog):
         return {"type": t, "label": l, "url": self.url_edit.text().strip()}
 
 
+def parse_chapter_lines(text):
+    """One chapter per line; "name | url" or "name<TAB>url" attaches a video."""
+    chapters = []
+    for line in text.splitlines():
+        line = line.strip().lstrip("-•*").strip()
+        if not line:
+            continue
+        sep = "\t" if "\t" in line else " | "
+        name, _, url = line.partition(sep)
+        name, url = name.strip(), url.strip()
+        if url:
+            chapters.append({"name": name, "url": url,
+                             "resources": [{"type": "video", "url": url, "label": "Video Lesson"}]})
+        else:
+            chapters.append(name)
+    return chapters
+
+
+class PasteChaptersDialog(QDialog):
+    def __init__(self, parent=None, text=""):
+        super().__init__(parent)
+        self.setWindowTitle("Paste Chapter List")
+        self.setMinimumSize(520, 380)
+        layout = QVBoxLayout(self)
+        hint = QLabel("One chapter per line. Add a video with  <i>name | url</i>  or a tab before the URL.")
+        hint.setWordWrap(True)
+        layout.addWidget(hint)
+        self.text_edit = QTextEdit()
+        self.text_edit.setAcceptRichText(False)
+        self.text_edit.setPlainText(text)
+        layout.addWidget(self.text_edit)
+        btns = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        btns.accepted.connect(self.accept)
+        btns.rejected.connect(self.reject)
+        layout.addWidget(btns)
+
+    def get_chapters(self):
+        return parse_chapter_lines(self.text_edit.toPlainText())
+
+
+class FindReplaceUrlsDialog(QDialog):
+    def __init__(self, parent=None, scope_label=""):
+        super().__init__(parent)
+        self.setWindowTitle("Find / Replace URLs")
+        self.setMinimumWidth(460)
+        layout = QVBoxLayout(self)
+        form = QFormLayout()
+        form.setSpacing(10)
+        self.find_edit = QLineEdit()
+        self.find_edit.setPlaceholderText("e.g. http://youtu.be/")
+        form.addRow("Find:", self.find_edit)
+        self.replace_edit = QLineEdit()
+        form.addRow("Replace:", self.replace_edit)
+        self.regex_cb = QCheckBox("Regular expression")
+        form.addRow("", self.regex_cb)
+        layout.addLayout(form)
+        if scope_label:
+            layout.addWidget(QLabel(scope_label))
+        btns = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        btns.accepted.connect(self.accept)
+        btns.rejected.connect(self.reject)
+        layout.addWidget(btns)
+
+    def get_replacer(self):
+        """A str -> str function, or None if the find text is empty/invalid."""
+        find, repl = self.find_edit.text(), self.replace_edit.text()
+        if not find:
+            return None
+        if self.regex_cb.isChecked():
+            try:
+                pattern = re.compile(find)
+            except re.error:
+                return None
+            return lambda s: pattern.sub(repl, s)
+        return lambda s: s.replace(find, repl)
+
+
 # ─────────────────────────────────────────────
 #  Right Panel: context-sensitive editor
 # ─────────────────────────────────────────────
@@ -578,7 +1158,7 @@ class ResourceDialog(QDialog):
 class EditorPanel(QScrollArea):
     """Right-side panel showing details of the selected item."""
 
-    request_refresh = pyqtSignal()
+    request_edit = pyqtSignal(tuple, dict, str)   # path, fields to set (None = remove), undo text
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -592,6 +1172,7 @@ class EditorPanel(QScrollArea):
         self.setWidget(self._container)
         self.setStyleSheet("QScrollArea { background: transparent; border: none; }")
         self._templates = None
+        self.current_path = None   # path of the item being edited
         self._show_welcome()
 
     def set_templates(self, templates):
@@ -603,15 +1184,17 @@ class EditorPanel(QScrollArea):
             if item.widget():
                 item.widget().deleteLater()
 
-    def _show_welcome(self):
+    def _show_welcome(self, text="← Select an item from the tree to edit it"):
         self._clear()
-        lbl = QLabel("← Select an item from the tree to edit it")
+        self.current_path = None
+        lbl = QLabel(text)
         lbl.setStyleSheet(f"color: {COLORS['overlay']}; font-size: 14px;")
         lbl.setAlignment(Qt.AlignCenter)
         self._layout.addWidget(lbl)
 
     def show_template(self, tmpl_idx):
         self._clear()
+        self.current_path = (tmpl_idx,)
         if self._templates is None:
             return
         tmpl = self._templates[tmpl_idx]
@@ -638,9 +1221,8 @@ class EditorPanel(QScrollArea):
         save_btn.setObjectName("btnAccent")
 
         def _save():
-            new_year = tmpl.get("year", "")  # year only changeable via dialog
-            tmpl["name"] = name_edit.text().strip()
-            self.request_refresh.emit()
+            # year only changeable via dialog
+            self.request_edit.emit((tmpl_idx,), {"name": name_edit.text().strip()}, "Edit Template")
 
         save_btn.clicked.connect(_save)
         form.addRow("", save_btn)
@@ -653,6 +1235,7 @@ class EditorPanel(QScrollArea):
 
     def show_subject(self, tmpl_idx, subj_idx):
         self._clear()
+        self.current_path = (tmpl_idx, subj_idx)
         if self._templates is None:
             return
         subj = self._templates[tmpl_idx]["subjects"][subj_idx]
@@ -677,13 +1260,9 @@ class EditorPanel(QScrollArea):
         save_btn.setObjectName("btnAccent")
 
         def _save():
-            subj["name"] = name_edit.text().strip()
-            if has_ex_cb.isChecked():
-                if "has_exercises" in subj:
-                    del subj["has_exercises"]
-            else:
-                subj["has_exercises"] = False
-            self.request_refresh.emit()
+            fields = {"name": name_edit.text().strip(),
+                      "has_exercises": None if has_ex_cb.isChecked() else False}
+            self.request_edit.emit((tmpl_idx, subj_idx), fields, "Edit Subject")
 
         save_btn.clicked.connect(_save)
         form.addRow("", save_btn)
@@ -695,17 +1274,13 @@ class EditorPanel(QScrollArea):
 
     def show_chapter(self, tmpl_idx, subj_idx, ch_idx):
         self._clear()
+        self.current_path = (tmpl_idx, subj_idx, ch_idx)
         if self._templates is None:
             return
         ch = self._templates[tmpl_idx]["subjects"][subj_idx]["chapters"][ch_idx]
-        is_dict = isinstance(ch, dict)
-        
-        # Ensure it's a dict for resource management
-        if not is_dict:
-            # Convert string chapter to dict on the fly if needed
-            self._templates[tmpl_idx]["subjects"][subj_idx]["chapters"][ch_idx] = {"name": ch, "url": "", "resources": []}
-            ch = self._templates[tmpl_idx]["subjects"][subj_idx]["chapters"][ch_idx]
-            is_dict = True
+        if not isinstance(ch, dict):
+            # Plain-string chapter: edit it as a dict, converted on save
+            ch = {"name": ch, "url": "", "resources": []}
 
         header = QLabel("📄 Chapter")
         header.setStyleSheet(f"color: {COLORS['accent3']}; font-size: 11px; font-weight: 700; letter-spacing: 1px;")
@@ -775,14 +1350,11 @@ class EditorPanel(QScrollArea):
         save_btn.setMinimumHeight(40)
 
         def _save_all():
-            subj_chapters = self._templates[tmpl_idx]["subjects"][subj_idx]["chapters"]
-            subj_chapters[ch_idx]["name"] = self.name_edit.text().strip()
-            subj_chapters[ch_idx]["resources"] = self.current_ch_resources
             # Sync back url for compat
             yt = next((r["url"] for r in self.current_ch_resources if r["type"] == "video"), "")
-            subj_chapters[ch_idx]["url"] = yt
-            
-            self.request_refresh.emit()
+            fields = {"name": self.name_edit.text().strip(),
+                      "resources": copy.deepcopy(self.current_ch_resources), "url": yt}
+            self.request_edit.emit((tmpl_idx, subj_idx, ch_idx), fields, "Edit Chapter")
             QMessageBox.information(self, "Success", "Chapter updated successfully!")
 
         save_btn.clicked.connect(_save_all)
@@ -805,6 +1377,8 @@ class TemplatesEditorWindow(QMainWindow):
         self._filepath = None
         self._templates = []
         self._unsaved = False
+        self._batching = False
+        self._undo = QUndoStack(self)
 
         self.setStyleSheet(STYLESHEET)
         self._build_toolbar()
@@ -816,6 +1390,9 @@ class TemplatesEditorWindow(QMainWindow):
         QShortcut(QKeySequence("Ctrl+S"), self, self._save_file)
         QShortcut(QKeySequence("Ctrl+O"), self, self._open_file)
         QShortcut(QKeySequence("Delete"), self._tree, self._delete_selected)
+        QShortcut(QKeySequence("Alt+Up"), self._tree, lambda: self._bulk_move(-1))
+        QShortcut(QKeySequence("Alt+Down"), self._tree, lambda: self._bulk_move(1))
+        QShortcut(QKeySequence("Ctrl+Shift+V"), self._tree, self._paste_chapters)
 
     def _save_config(self):
         """Save the last opened file path to a hidden config file."""
@@ -855,9 +1432,18 @@ class TemplatesEditorWindow(QMainWindow):
         tbtn("📂  Open", "Open templates.js  (Ctrl+O)", self._open_file)
         tbtn("💾  Save", "Save file  (Ctrl+S)", self._save_file)
         tbtn("💾  Save As", "Save as new file", self._save_as_file)
+        tbtn("📦  Export Minified", "Write a minified copy for the web bundle", self._export_minified)
         tb.addSeparator()
         tbtn("➕  Add Template", "Add a new template", self._add_template)
         tb.addSeparator()
+        undo_act = self._undo.createUndoAction(self, "↶  Undo")
+        undo_act.setShortcuts(QKeySequence.Undo)
+        redo_act = self._undo.createRedoAction(self, "↷  Redo")
+        redo_act.setShortcuts([QKeySequence("Ctrl+Y"), QKeySequence("Ctrl+Shift+Z")])
+        tb.addAction(undo_act)
+        tb.addAction(redo_act)
+        self._undo.cleanChanged.connect(self._on_clean_changed)
+        tb.addSeparator()
         self._expand_act = tbtn("⬇  Expand All", "Expand all tree items", self._tree_expand_all if hasattr(self, '_tree') else lambda: None)
         self._collapse_act = tbtn("⬆  Collapse All", "Collapse all tree items", self._tree_collapse_all if hasattr(self, '_tree') else lambda: None)
 
@@ -877,16 +1463,35 @@ class TemplatesEditorWindow(QMainWindow):
         search_row = QHBoxLayout()
         self._search = QLineEdit()
         self._search.setPlaceholderText("🔍  Search templates, subjects, chapters…")
-        self._search.textChanged.connect(self._filter_tree)
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self._search_timer.timeout.connect(self._filter_tree)
+        self._search.textChanged.connect(lambda _: self._search_timer.start())
         search_row.addWidget(self._search)
         left_layout.addLayout(search_row)
 
-        self._tree = QTreeWidget()
+        self._model = TemplatesModel(self)
+        self._model.set_templates(self._templates)
+        for sig in (self._model.rowsInserted, self._model.rowsRemoved,
+                    self._model.rowsMoved, self._model.dataChanged):
+            sig.connect(self._on_model_edited)
+        for sig in (self._model.rowsInserted, self._model.rowsRemoved, self._model.rowsMoved):
+            sig.connect(self._sync_editor)
+        self._model.move_hook = self._push_move
+        self._index = SearchIndex(self._model)
+        for sig in (self._model.rowsInserted, self._model.rowsRemoved, self._model.dataChanged):
+            sig.connect(self._refilter)
+        self._proxy = TemplatesFilterProxy(self)
+        self._proxy.setSourceModel(self._model)
+
+        self._tree = QTreeView()
+        self._tree.setModel(self._proxy)
         self._tree.setHeaderHidden(True)
-        self._tree.setUniformRowHeights(False)
+        self._tree.setUniformRowHeights(True)
         self._tree.setDragDropMode(QAbstractItemView.InternalMove)
-        self._tree.setSelectionMode(QAbstractItemView.SingleSelection)
-        self._tree.itemSelectionChanged.connect(self._on_selection_changed)
+        self._tree.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self._tree.selectionModel().selectionChanged.connect(self._on_selection_changed)
         self._tree.setContextMenuPolicy(Qt.CustomContextMenu)
         self._tree.customContextMenuRequested.connect(self._context_menu)
         left_layout.addWidget(self._tree)
@@ -910,7 +1515,7 @@ class TemplatesEditorWindow(QMainWindow):
 
         # Right: editor panel
         self._editor = EditorPanel()
-        self._editor.request_refresh.connect(self._on_refresh)
+        self._editor.request_edit.connect(self._on_editor_edit)
         self._editor.set_templates(self._templates)
         splitter.addWidget(self._editor)
 
@@ -930,88 +1535,47 @@ class TemplatesEditorWindow(QMainWindow):
     # ── Tree population ───────────────────────
 
     def _show_empty_state(self):
-        self._tree.clear()
-        item = QTreeWidgetItem(["No file loaded — use 📂 Open"])
-        item.setForeground(0, QColor(COLORS["overlay"]))
-        self._tree.addTopLevelItem(item)
-
-    def _populate_tree(self, preserve_expansion=False):
-        """Rebuild tree from self._templates."""
-        # Remember expanded state
-        expanded = set()
-        if preserve_expansion:
-            def _collect(item, path=""):
-                txt = item.text(0)
-                full = f"{path}/{txt}"
-                if item.isExpanded():
-                    expanded.add(full)
-                for i in range(item.childCount()):
-                    _collect(item.child(i), full)
-            for i in range(self._tree.topLevelItemCount()):
-                _collect(self._tree.topLevelItem(i))
-
-        self._tree.blockSignals(True)
-        self._tree.clear()
-
-        year_colors = {
-            "bac":  "#5856d6",
-            "2as":  "#007aff",
-            "1as":  "#00aacc",
-            "l1":   "#34c759",
-            "l2":   "#ff9500",
-            "l3":   "#ff6b00",
-            "m1":   "#af52de",
-            "m2":   "#ff3b30",
-        }
-
-        for ti, tmpl in enumerate(self._templates):
-            year = tmpl.get("year", "?")
-            color = year_colors.get(year, COLORS["text"])
-            tmpl_item = QTreeWidgetItem()
-            tmpl_item.setText(0, f"  [{year.upper()}]  {tmpl.get('name','(unnamed)')}")
-            tmpl_item.setForeground(0, QColor(color))
-            font = QFont()
-            font.setBold(True)
-            tmpl_item.setFont(0, font)
-            tmpl_item.setData(0, ROLE_TYPE, "template")
-            tmpl_item.setData(0, ROLE_IDX, (ti,))
-            self._tree.addTopLevelItem(tmpl_item)
-
-            for si, subj in enumerate(tmpl.get("subjects", [])):
-                has_ex = subj.get("has_exercises", True)
-                ex_icon = "" if has_ex else " ✗"
-                subj_item = QTreeWidgetItem(tmpl_item)
-                subj_item.setText(0, f"  📖 {subj.get('name','')}{ex_icon}")
-                subj_item.setForeground(0, QColor(COLORS["text"]))
-                subj_item.setData(0, ROLE_TYPE, "subject")
-                subj_item.setData(0, ROLE_IDX, (ti, si))
-
-                for ci, ch in enumerate(subj.get("chapters", [])):
-                    ch_name = ch["name"] if isinstance(ch, dict) else ch
-                    url_icon = " 🔗" if isinstance(ch, dict) else ""
-                    ch_item = QTreeWidgetItem(subj_item)
-                    ch_item.setText(0, f"    • {ch_name}{url_icon}")
-                    ch_item.setForeground(0, QColor(COLORS["subtext"]))
-                    ch_item.setData(0, ROLE_TYPE, "chapter")
-                    ch_item.setData(0, ROLE_IDX, (ti, si, ci))
-
-        # Restore expansion
-        if preserve_expansion and expanded:
-            def _restore(item, path=""):
-                txt = item.text(0)
-                full = f"{path}/{txt}"
-                if full in expanded:
-                    item.setExpanded(True)
-                for i in range(item.childCount()):
-                    _restore(item.child(i), full)
-            for i in range(self._tree.topLevelItemCount()):
-                _restore(self._tree.topLevelItem(i))
-        else:
-            self._tree.expandToDepth(0)
+        self._model.set_placeholder("No file loaded — use 📂 Open")
+        self._undo.clear()
+
+    def _populate_tree(self):
+        """Reset the model to self._templates (file load only; edits are incremental)."""
+        self._model.set_templates(self._templates)
+        self._undo.clear()   # history paths refer to the previous file
+        self._tree.expandToDepth(0)
+        self._update_status()
 
-        self._tree.blockSignals(False)
+    def _on_model_edited(self, *_):
+        if self._batching:
+            return
         self._update_status()
 
+    def _on_clean_changed(self, clean):
+        # Undoing back to the last save clears the unsaved marker
+        if clean:
+            self._unsaved = False
+            self.setWindowTitle(self.windowTitle().lstrip("* "))
+        else:
+            self._mark_unsaved()
+
+    @contextmanager
+    def _transaction(self, text):
+        """Group edits into one undo step with a single repaint and status update."""
+        self._undo.beginMacro(text)
+        self._batching = True
+        self._tree.setUpdatesEnabled(False)
+        try:
+            yield
+        finally:
+            self._undo.endMacro()
+            self._batching = False
+            self._tree.setUpdatesEnabled(True)
+            self._on_model_edited()
+            self._sync_editor()
+
+    def _push_move(self, src_path, row, count, dst_path, dst_row):
+        self._undo.push(MoveRowsCommand(self._model, src_path, row, count, dst_path, dst_row))
+
     def _tree_expand_all(self):
         self._tree.expandAll()
 
@@ -1020,13 +1584,45 @@ class TemplatesEditorWindow(QMainWindow):
 
     # ── Selection & editing ───────────────────
 
-    def _on_selection_changed(self):
-        items = self._tree.selectedItems()
-        if not items:
+    def _selected(self):
+        """(kind, path) of the selected row, or (None, None)."""
+        rows = self._tree.selectionModel().selectedRows()
+        if not rows:
+            return None, None
+        index = self._proxy.mapToSource(rows[0])
+        return self._model.kind(index), self._model.path_for_index(index)
+
+    def _selected_paths(self):
+        """Selected paths in tree order, without rows whose ancestor is also selected."""
+        paths = sorted(
+            self._model.path_for_index(self._proxy.mapToSource(i))
+            for i in self._tree.selectionModel().selectedRows()
+        )
+        top = []
+        for p in paths:
+            if top and p[:len(top[-1])] == top[-1]:
+                continue
+            top.append(p)
+        return top
+
+    @staticmethod
+    def _runs(paths):
+        """Group sorted sibling paths into [parent_path, first_row, count] runs."""
+        runs = []
+        for p in paths:
+            parent, row = p[:-1], p[-1]
+            if runs and runs[-1][0] == parent and runs[-1][1] + runs[-1][2] == row:
+                runs[-1][2] += 1
+            else:
+                runs.append([parent, row, 1])
+        return runs
+
+    def _on_selection_changed(self, *_):
+        count = len(self._tree.selectionModel().selectedRows())
+        if count > 1:
+            self._editor._show_welcome(f"{count} items selected — right-click for bulk actions")
             return
-        item = items[0]
-        kind = item.data(0, ROLE_TYPE)
-        idx  = item.data(0, ROLE_IDX)
+        kind, idx = self._selected()
         if kind == "template":
             self._editor.show_template(idx[0])
         elif kind == "subject":
@@ -1034,63 +1630,205 @@ class TemplatesEditorWindow(QMainWindow):
         elif kind == "chapter":
             self._editor.show_chapter(idx[0], idx[1], idx[2])
 
-    def _on_refresh(self):
-        self._mark_unsaved()
-        self._populate_tree(preserve_expansion=True)
+    def _on_editor_edit(self, path, fields, text):
+        self._apply_fields(path, fields, text)
         self._on_selection_changed()
 
+    def _apply_fields(self, path, fields, text):
+        """Record a field edit as an undoable delta (no-op edits are skipped)."""
+        value = self._model.value_at(path)
+        if isinstance(value, dict):
+            if all(value.get(k) == v for k, v in fields.items()):
+                return
+            self._undo.push(SetFieldsCommand(self._model, path, fields, text))
+        else:
+            # Plain-string chapter becomes a dict
+            new = {k: v for k, v in fields.items() if v is not None}
+            self._undo.push(SetValueCommand(self._model, path, new, text))
+
+    def _sync_editor(self, *_):
+        # Rows shifted under the editor panel: re-show it for the current selection
+        if self._batching or self._editor.current_path is None:
+            return
+        kind, path = self._selected()
+        if path != self._editor.current_path:
+            if kind is None:
+                self._editor._show_welcome()
+            else:
+                self._on_selection_changed()
+
     # ── Context menu ──────────────────────────
 
     def _context_menu(self, pos):
-        item = self._tree.itemAt(pos)
+        index = self._proxy.mapToSource(self._tree.indexAt(pos))
+        kind = self._model.kind(index) if index.isValid() else None
+        idx = self._model.path_for_index(index)
         menu = QMenu(self)
-        if item is None:
+        selected = self._selected_paths()
+        if len(selected) > 1 and idx in selected:
+            self._bulk_menu(menu, selected)
+        elif kind is None or kind == "placeholder":
             menu.addAction("➕ Add Template", self._add_template)
-        else:
-            kind = item.data(0, ROLE_TYPE)
-            idx  = item.data(0, ROLE_IDX)
-            if kind == "template":
-                menu.addAction("✏️  Edit Template", lambda: self._edit_template(idx[0]))
-                menu.addAction("➕ Add Subject",    lambda: self._add_subject_to(idx[0]))
-                menu.addSeparator()
-                menu.addAction("⬆  Move Up",   lambda: self._move_template(idx[0], -1))
-                menu.addAction("⬇  Move Down", lambda: self._move_template(idx[0],  1))
-                menu.addSeparator()
-                menu.addAction("🗑  Delete Template", lambda: self._delete_template(idx[0]))
-            elif kind == "subject":
-                menu.addAction("✏️  Edit Subject", lambda: self._edit_subject(idx[0], idx[1]))
-                menu.addAction("➕ Add Chapter",   lambda: self._add_chapter_to(idx[0], idx[1]))
-                menu.addSeparator()
-                menu.addAction("⬆  Move Up",   lambda: self._move_subject(idx[0], idx[1], -1))
-                menu.addAction("⬇  Move Down", lambda: self._move_subject(idx[0], idx[1],  1))
-                menu.addSeparator()
-                menu.addAction("🗑  Delete Subject", lambda: self._delete_subject(idx[0], idx[1]))
-            elif kind == "chapter":
-                menu.addAction("✏️  Edit Chapter", lambda: self._edit_chapter(idx[0], idx[1], idx[2]))
-                menu.addSeparator()
-                menu.addAction("⬆  Move Up",   lambda: self._move_chapter(idx[0], idx[1], idx[2], -1))
-                menu.addAction("⬇  Move Down", lambda: self._move_chapter(idx[0], idx[1], idx[2],  1))
-                menu.addSeparator()
-                menu.addAction("🗑  Delete Chapter", lambda: self._delete_chapter(idx[0], idx[1], idx[2]))
+            menu.addAction("🔁 Find / Replace URLs…", self._find_replace_urls)
+        elif kind == "template":
+            menu.addAction("✏️  Edit Template", lambda: self._edit_template(idx[0]))
+            menu.addAction("➕ Add Subject",    lambda: self._add_subject_to(idx[0]))
+            menu.addSeparator()
+            menu.addAction("⬆  Move Up",   lambda: self._move_template(idx[0], -1))
+            menu.addAction("⬇  Move Down", lambda: self._move_template(idx[0],  1))
+            menu.addSeparator()
+            menu.addAction("🔁 Find / Replace URLs…", self._find_replace_urls)
+            menu.addSeparator()
+            menu.addAction("🗑  Delete Template", lambda: self._delete_template(idx[0]))
+        elif kind == "subject":
+            menu.addAction("✏️  Edit Subject", lambda: self._edit_subject(idx[0], idx[1]))
+            menu.addAction("➕ Add Chapter",   lambda: self._add_chapter_to(idx[0], idx[1]))
+            menu.addAction("📋 Paste Chapter List…", self._paste_chapters)
+            menu.addSeparator()
+            menu.addAction("⬆  Move Up",   lambda: self._move_subject(idx[0], idx[1], -1))
+            menu.addAction("⬇  Move Down", lambda: self._move_subject(idx[0], idx[1],  1))
+            menu.addAction("↪  Move to Template…", self._bulk_move_to)
+            menu.addSeparator()
+            menu.addAction("🔁 Find / Replace URLs…", self._find_replace_urls)
+            menu.addSeparator()
+            menu.addAction("🗑  Delete Subject", lambda: self._delete_subject(idx[0], idx[1]))
+        elif kind == "chapter":
+            menu.addAction("✏️  Edit Chapter", lambda: self._edit_chapter(idx[0], idx[1], idx[2]))
+            menu.addAction("📋 Paste Chapter List…", self._paste_chapters)
+            menu.addSeparator()
+            menu.addAction("⬆  Move Up",   lambda: self._move_chapter(idx[0], idx[1], idx[2], -1))
+            menu.addAction("⬇  Move Down", lambda: self._move_chapter(idx[0], idx[1], idx[2],  1))
+            menu.addAction("↪  Move to Subject…", self._bulk_move_to)
+            menu.addSeparator()
+            menu.addAction("🗑  Delete Chapter", lambda: self._delete_chapter(idx[0], idx[1], idx[2]))
         menu.exec_(self._tree.viewport().mapToGlobal(pos))
 
+    def _bulk_menu(self, menu, paths):
+        kinds = {len(p) for p in paths}
+        if len(kinds) == 1:
+            menu.addAction("⬆  Move Up",   lambda: self._bulk_move(-1))
+            menu.addAction("⬇  Move Down", lambda: self._bulk_move(1))
+            depth = kinds.pop()
+            if depth > 1:
+                menu.addAction("↪  Move to Template…" if depth == 2 else "↪  Move to Subject…", self._bulk_move_to)
+            menu.addSeparator()
+        menu.addAction("🔁 Find / Replace URLs…", self._find_replace_urls)
+        menu.addSeparator()
+        menu.addAction(f"🗑  Delete {len(paths)} Items", self._delete_selected)
+
+    def _move_row(self, parent_path, row, direction):
+        count = self._model.child_count(parent_path)
+        target = row + direction
+        if 0 <= target < count:
+            # Qt's destination is the row *before* the move
+            self._push_move(parent_path, row, 1, parent_path, target + (1 if direction > 0 else 0))
+
+    # ── Bulk actions ──────────────────────────
+
+    def _bulk_move(self, direction):
+        """Shift every selected run of siblings one row up or down."""
+        paths = self._selected_paths()
+        if not paths or len({len(p) for p in paths}) != 1:
+            return
+        runs = self._runs(paths)
+        with self._transaction("Move Up" if direction < 0 else "Move Down"):
+            if direction < 0:
+                # Move the row above each run to just below it
+                for parent, row, count in runs:
+                    if row > 0:
+                        self._push_move(parent, row - 1, 1, parent, row + count)
+            else:
+                for parent, row, count in reversed(runs):
+                    if row + count < self._model.child_count(parent):
+                        self._push_move(parent, row + count, 1, parent, row)
+
+    def _bulk_move_to(self):
+        paths = self._selected_paths()
+        depths = {len(p) for p in paths}
+        if len(depths) != 1 or depths == {1}:
+            return
+        depth = depths.pop()
+        if depth == 2:
+            targets = [((ti,), t.get("name", "")) for ti, t in enumerate(self._templates)]
+        else:
+            targets = [((ti, si), f"{t.get('name', '')}  ›  {s.get('name', '')}")
+                       for ti, t in enumerate(self._templates)
+                       for si, s in enumerate(t.get("subjects", []))]
+        labels = [label for _, label in targets]
+        title = "Move to Template" if depth == 2 else "Move to Subject"
+        label, ok = QInputDialog.getItem(self, title, f"Move {len(paths)} item(s) to:", labels, 0, False)
+        if not ok:
+            return
+        dst = targets[labels.index(label)][0]
+        end = self._model.child_count(dst)
+        with self._transaction(title):
+            # Reverse order keeps earlier paths valid and the block order intact
+            for parent, row, count in reversed(self._runs(paths)):
+                if parent != dst:
+                    self._push_move(parent, row, count, dst, end)
+
+    def _paste_chapters(self):
+        kind, idx = self._selected()
+        if kind not in ("subject", "chapter"):
+            QMessageBox.information(self, "Select Subject", "Please select a subject (or a chapter to paste after).")
+            return
+        parent = idx[:2]
+        row = idx[2] + 1 if kind == "chapter" else None
+        dlg = PasteChaptersDialog(self, QApplication.clipboard().text())
+        if dlg.exec_() != QDialog.Accepted:
+            return
+        chapters = dlg.get_chapters()
+        if chapters:
+            with self._transaction(f"Paste {len(chapters)} Chapters"):
+                self._undo.push(InsertRowsCommand(self._model, parent, row, chapters))
+            self._tree.expand(self._proxy.mapFromSource(self._model.index_for_path(parent)))
+
+    def _find_replace_urls(self):
+        paths = self._selected_paths() or [()]
+        scope = "Scope: whole file" if paths == [()] else f"Scope: {len(paths)} selected item(s)"
+        dlg = FindReplaceUrlsDialog(self, scope)
+        if dlg.exec_() != QDialog.Accepted:
+            return
+        replace = dlg.get_replacer()
+        if replace is None:
+            QMessageBox.warning(self, "Find / Replace", "Enter text (or a valid regular expression) to find.")
+            return
+        changes = []
+        for path in paths:
+            for node in self._model.walk(self._model.node_for_path(path)):
+                if node.kind != "chapter":
+                    continue
+                ch = self._model.value(node)
+                if not isinstance(ch, dict):
+                    continue
+                new = dict(ch)
+                if ch.get("url"):
+                    new["url"] = replace(ch["url"])
+                if ch.get("resources"):
+                    new["resources"] = [dict(r, url=replace(r.get("url", ""))) for r in ch["resources"]]
+                if new != ch:
+                    changes.append((self._model.path(node), new))
+        if not changes:
+            self._status.showMessage("Find / Replace: no matching URLs")
+            return
+        with self._transaction(f"Replace URLs in {len(changes)} Chapters"):
+            for path, new in changes:
+                self._undo.push(SetValueCommand(self._model, path, new))
+        self._status.showMessage(f"🔁 Updated URLs in {len(changes)} chapters")
+
     # ── CRUD: Templates ───────────────────────
 
     def _add_template(self):
         dlg = TemplateDialog(self)
         if dlg.exec_() == QDialog.Accepted:
-            self._templates.append(dlg.get_data())
-            self._mark_unsaved()
-            self._populate_tree(preserve_expansion=True)
+            self._undo.push(InsertRowsCommand(self._model, (), None, [dlg.get_data()], "Add Template"))
 
     def _edit_template(self, ti):
-        dlg = TemplateDialog(self, copy.deepcopy(self._templates[ti]))
+        # The dialog only edits the header, so don't copy the subjects subtree
+        dlg = TemplateDialog(self, {k: v for k, v in self._templates[ti].items() if k != "subjects"})
         if dlg.exec_() == QDialog.Accepted:
             d = dlg.get_data()
-            self._templates[ti]["year"] = d["year"]
-            self._templates[ti]["name"] = d["name"]
-            self._mark_unsaved()
-            self._populate_tree(preserve_expansion=True)
+            self._apply_fields((ti,), {"year": d["year"], "name": d["name"]}, "Edit Template")
 
     def _delete_template(self, ti):
         name = self._templates[ti].get("name", "")
@@ -1100,28 +1838,17 @@ class TemplatesEditorWindow(QMainWindow):
             QMessageBox.Yes | QMessageBox.No
         )
         if reply == QMessageBox.Yes:
-            self._templates.pop(ti)
-            self._mark_unsaved()
-            self._populate_tree()
+            self._undo.push(RemoveRowsCommand(self._model, (), ti, 1, "Delete Template"))
             self._editor._show_welcome()
 
     def _move_template(self, ti, direction):
-        lst = self._templates
-        ni = ti + direction
-        if 0 <= ni < len(lst):
-            lst[ti], lst[ni] = lst[ni], lst[ti]
-            self._mark_unsaved()
-            self._populate_tree(preserve_expansion=True)
+        self._move_row((), ti, direction)
 
     # ── CRUD: Subjects ────────────────────────
 
     def _add_subject(self):
-        items = self._tree.selectedItems()
-        ti = None
-        if items:
-            kind = items[0].data(0, ROLE_TYPE)
-            idx  = items[0].data(0, ROLE_IDX)
-            ti = idx[0]
+        kind, idx = self._selected()
+        ti = idx[0] if kind else None
         if ti is None:
             QMessageBox.information(self, "Select Template", "Please select a template first.")
             return
@@ -1130,21 +1857,15 @@ class TemplatesEditorWindow(QMainWindow):
     def _add_subject_to(self, ti):
         dlg = SubjectDialog(self)
         if dlg.exec_() == QDialog.Accepted:
-            self._templates[ti]["subjects"].append(dlg.get_data())
-            self._mark_unsaved()
-            self._populate_tree(preserve_expansion=True)
+            self._undo.push(InsertRowsCommand(self._model, (ti,), None, [dlg.get_data()], "Add Subject"))
 
     def _edit_subject(self, ti, si):
-        dlg = SubjectDialog(self, copy.deepcopy(self._templates[ti]["subjects"][si]))
+        subj = self._templates[ti]["subjects"][si]
+        dlg = SubjectDialog(self, {k: v for k, v in subj.items() if k != "chapters"})
         if dlg.exec_() == QDialog.Accepted:
             d = dlg.get_data()
-            self._templates[ti]["subjects"][si]["name"] = d["name"]
-            if "has_exercises" in d:
-                self._templates[ti]["subjects"][si]["has_exercises"] = False
-            elif "has_exercises" in self._templates[ti]["subjects"][si]:
-                del self._templates[ti]["subjects"][si]["has_exercises"]
-            self._mark_unsaved()
-            self._populate_tree(preserve_expansion=True)
+            fields = {"name": d["name"], "has_exercises": False if "has_exercises" in d else None}
+            self._apply_fields((ti, si), fields, "Edit Subject")
 
     def _delete_subject(self, ti, si):
         name = self._templates[ti]["subjects"][si].get("name", "")
@@ -1154,33 +1875,21 @@ class TemplatesEditorWindow(QMainWindow):
             QMessageBox.Yes | QMessageBox.No
         )
         if reply == QMessageBox.Yes:
-            self._templates[ti]["subjects"].pop(si)
-            self._mark_unsaved()
-            self._populate_tree(preserve_expansion=True)
+            self._undo.push(RemoveRowsCommand(self._model, (ti,), si, 1, "Delete Subject"))
             self._editor._show_welcome()
 
     def _move_subject(self, ti, si, direction):
-        lst = self._templates[ti]["subjects"]
-        ni = si + direction
-        if 0 <= ni < len(lst):
-            lst[si], lst[ni] = lst[ni], lst[si]
-            self._mark_unsaved()
-            self._populate_tree(preserve_expansion=True)
+        self._move_row((ti,), si, direction)
 
     # ── CRUD: Chapters ────────────────────────
 
     def _add_chapter(self):
-        items = self._tree.selectedItems()
+        kind, idx = self._selected()
         ti = si = None
-        if items:
-            kind = items[0].data(0, ROLE_TYPE)
-            idx  = items[0].data(0, ROLE_IDX)
-            if kind == "subject":
-                ti, si = idx[0], idx[1]
-            elif kind == "chapter":
-                ti, si = idx[0], idx[1]
-            elif kind == "template":
-                ti = idx[0]
+        if kind in ("subject", "chapter"):
+            ti, si = idx[0], idx[1]
+        elif kind == "template":
+            ti = idx[0]
         if ti is None or si is None:
             QMessageBox.information(self, "Select Subject", "Please select a subject first.")
             return
@@ -1191,17 +1900,13 @@ class TemplatesEditorWindow(QMainWindow):
         has_url = any(isinstance(c, dict) for c in chapters)
         dlg = ChapterDialog(self, is_url_type=has_url)
         if dlg.exec_() == QDialog.Accepted:
-            chapters.append(dlg.get_data())
-            self._mark_unsaved()
-            self._populate_tree(preserve_expansion=True)
+            self._undo.push(InsertRowsCommand(self._model, (ti, si), None, [dlg.get_data()], "Add Chapter"))
 
     def _edit_chapter(self, ti, si, ci):
         ch = self._templates[ti]["subjects"][si]["chapters"][ci]
         dlg = ChapterDialog(self, data=copy.deepcopy(ch))
         if dlg.exec_() == QDialog.Accepted:
-            self._templates[ti]["subjects"][si]["chapters"][ci] = dlg.get_data()
-            self._mark_unsaved()
-            self._populate_tree(preserve_expansion=True)
+            self._undo.push(SetValueCommand(self._model, (ti, si, ci), dlg.get_data(), "Edit Chapter"))
 
     def _delete_chapter(self, ti, si, ci):
         ch = self._templates[ti]["subjects"][si]["chapters"][ci]
@@ -1212,26 +1917,18 @@ class TemplatesEditorWindow(QMainWindow):
             QMessageBox.Yes | QMessageBox.No
         )
         if reply == QMessageBox.Yes:
-            self._templates[ti]["subjects"][si]["chapters"].pop(ci)
-            self._mark_unsaved()
-            self._populate_tree(preserve_expansion=True)
+            self._undo.push(RemoveRowsCommand(self._model, (ti, si), ci, 1, "Delete Chapter"))
             self._editor._show_welcome()
 
     def _move_chapter(self, ti, si, ci, direction):
-        lst = self._templates[ti]["subjects"][si]["chapters"]
-        ni = ci + direction
-        if 0 <= ni < len(lst):
-            lst[ci], lst[ni] = lst[ni], lst[ci]
-            self._mark_unsaved()
-            self._populate_tree(preserve_expansion=True)
+        self._move_row((ti, si), ci, direction)
 
     def _delete_selected(self):
-        items = self._tree.selectedItems()
-        if not items:
+        paths = self._selected_paths()
+        if len(paths) > 1:
+            self._bulk_delete(paths)
             return
-        item = items[0]
-        kind = item.data(0, ROLE_TYPE)
-        idx  = item.data(0, ROLE_IDX)
+        kind, idx = self._selected()
         if kind == "template":
             self._delete_template(idx[0])
         elif kind == "subject":
@@ -1239,30 +1936,33 @@ class TemplatesEditorWindow(QMainWindow):
         elif kind == "chapter":
             self._delete_chapter(idx[0], idx[1], idx[2])
 
+    def _bulk_delete(self, paths):
+        reply = QMessageBox.question(
+            self, "Delete Items",
+            f"Delete {len(paths)} selected items?\n\nTemplates and subjects are deleted with their contents.",
+            QMessageBox.Yes | QMessageBox.No
+        )
+        if reply != QMessageBox.Yes:
+            return
+        with self._transaction(f"Delete {len(paths)} Items"):
+            # Bottom-up so earlier paths stay valid
+            for parent, row, count in reversed(self._runs(paths)):
+                self._undo.push(RemoveRowsCommand(self._model, parent, row, count))
+        self._editor._show_welcome()
+
     # ── Search / filter ───────────────────────
 
-    def _filter_tree(self, text):
-        text = text.lower().strip()
-
-        def _set_visible(item, visible):
-            item.setHidden(not visible)
-
-        def _check(item):
-            match = text in item.text(0).lower()
-            child_match = False
-            for i in range(item.childCount()):
-                child = item.child(i)
-                child_vis = _check(child)
-                if child_vis:
-                    child_match = True
-            visible = match or child_match
-            item.setHidden(not visible)
-            if child_match:
-                item.setExpanded(True)
-            return visible
-
-        for i in range(self._tree.topLevelItemCount()):
-            _check(self._tree.topLevelItem(i))
+    def _filter_tree(self):
+        matches = self._index.search(self._search.text())
+        self._proxy.set_matches(matches)
+        # Expand just the rows leading to matches, not the whole tree
+        for node in self._proxy.ancestors:
+            self._tree.expand(self._proxy.mapFromSource(self._model.index_for_node(node)))
+
+    def _refilter(self, *_):
+        # Keep an active search current as rows are added or edited
+        if self._search.text().strip():
+            self._search_timer.start()
 
     # ── File I/O ──────────────────────────────
 
@@ -1276,7 +1976,7 @@ class TemplatesEditorWindow(QMainWindow):
         if not path:
             return
         try:
-            self._templates = parse_js_file(path)
+            self._templates = load_templates(path)
             self._filepath = path
             self._unsaved = False
             self._editor.set_templates(self._templates)
@@ -1285,6 +1985,8 @@ class TemplatesEditorWindow(QMainWindow):
             self._status.showMessage(f"Loaded: {path}  —  {len(self._templates)} templates")
             self.setWindowTitle(f"Templates.js Editor — {path}")
             self._save_config()
+        except TemplatesParseError as e:
+            QMessageBox.critical(self, "Parse Error", f"Could not parse {os.path.basename(path)}:\n{e}")
         except Exception as e:
             QMessageBox.critical(self, "Parse Error", f"Could not parse file:\n{e}")
 
@@ -1295,6 +1997,7 @@ class TemplatesEditorWindow(QMainWindow):
         try:
             write_js_file(self._filepath, self._templates)
             self._unsaved = False
+            self._undo.setClean()
             self._status.showMessage(f"✅ Saved: {self._filepath}")
             self.setWindowTitle(f"Templates.js Editor — {self._filepath}")
             self._save_config()
@@ -1310,6 +2013,19 @@ class TemplatesEditorWindow(QMainWindow):
         self._filepath = path
         self._save_file()
 
+    def _export_minified(self):
+        default = os.path.splitext(self._filepath)[0] + ".min.js" if self._filepath else "templates.min.js"
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export Minified", default, "JavaScript Files (*.js);;All Files (*)"
+        )
+        if not path:
+            return
+        try:
+            write_js_file(path, self._templates, minify=True)
+            self._status.showMessage(f"📦 Exported minified: {path}")
+        except Exception as e:
+            QMessageBox.critical(self, "Export Error", f"Could not export file:\n{e}")
+
     # ── Helpers ───────────────────────────────
 
     def _mark_unsaved(self):
@@ -1387,7 +2103,7 @@ def main():
 
     if path_to_load and os.path.exists(path_to_load):
         try:
-            win._templates = parse_js_file(path_to_load)
+            win._templates = load_templates(path_to_load)
             win._filepath = path_to_load
             win._editor.set_templates(win._templates)
             win._populate_tree()
@@ -0,0 +1,26 @@
+import io
+
+from student_app.templates_js import parse_js, write_js
+
+
+def _write(templates, minify=False):
+    out = io.StringIO()
+    write_js(templates, out, minify)
+    return out.getvalue()
+
+
+def test_write_template_without_year():
+    templates = [
+        {"year": None, "name": "No year", "subjects": [{"name": "Maths", "chapters": ["Limits"]}]},
+        {"name": "Missing year", "subjects": []},
+        {"year": "bachelor", "name": "B1", "subjects": []},
+    ]
+    for minify in (False, True):
+        text = _write(templates, minify)
+        parsed = parse_js(text)
+        assert [t["name"] for t in parsed] == ["No year", "Missing year", "B1"]
+        assert parsed[0]["year"] is None
+        assert parsed[0]["subjects"][0]["chapters"] == ["Limits"]
+    pretty = _write(templates)
+    assert "// ==================== BACHELOR ====================" in pretty
+    assert "NONE" not in pretty